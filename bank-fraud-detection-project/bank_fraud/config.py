@@ -24,9 +24,39 @@ REFERENCES_DIR = PROJECT_ROOT / 'references'
 
 # --- Specific File Paths (add as needed) ---
 RAW_ANONYMIZED_DATASET = RAW_DATA_DIR / 'anonymized_output_dataset.parquet'
+RAW_TRANSACTIONS_DATASET = RAW_DATA_DIR / 'transactions.parquet'
 INTERIM_DATASET_V01 = INTERIM_DATA_DIR / '0.01_dataset.parquet'
 INTERIM_EDA_DATASET = INTERIM_DATA_DIR / '1.0_initial_eda_dataset.parquet'
+FEATURE_SELECTION_DATASET = INTERIM_DATA_DIR / '2.0_prepared_for_feature_selection.parquet'
+WINDOW_FEATURE_STATE = INTERIM_DATA_DIR / 'window_feature_state.parquet'
+TRAINING_CACHE_DIR = INTERIM_DATA_DIR / 'training_cache'
+TRIAL_STORE = INTERIM_DATA_DIR / 'search_trials.sqlite'
+SHAP_CACHE_DIR = INTERIM_DATA_DIR / 'shap_cache'
 DATA_DICTIONARIES_DIR = REFERENCES_DIR
+IV_DETAILS_DIR = REFERENCES_DIR / 'iv_details'
+IV_STORE = REFERENCES_DIR / 'iv_details.arrow'
+FEATURE_SCHEMA = REFERENCES_DIR / 'feature_schema.json'
+COST_SCENARIOS = REFERENCES_DIR / 'cost_scenarios.json'
+TRANSACTION_FEATURES_DATASET = PROCESSED_DATA_DIR / 'transaction_features.parquet'
+WINDOW_FEATURES_DATASET = PROCESSED_DATA_DIR / 'window_features.parquet'
+SELECTED_FEATURES_DATASET = PROCESSED_DATA_DIR / '3.0_selected_features.parquet'
+BEST_AUCPR_MODEL = MODELS_DIR / 'best_xgb_aucpr_model.joblib'
+BEST_PRECISION_MODEL = MODELS_DIR / 'best_xgb_precision_model.joblib'
+
+# --- Modeling ---
+TARGET_COL = 'fraud_status'
+
+# --- Decision Gates ---
+# Gate A auto-blocks an account when the precision-tuned model is confident
+# (notebook 5.0's recommended threshold).
+GATE_A_BLOCK_THRESHOLD = 0.95
+# Gate B routes the remaining high-risk accounts to the analyst review queue. Notebook 5.0
+# sizes it as a daily top-k queue: the k highest-scoring accounts Gate A did not block,
+# k = 1500 (6 analysts x 250 reviews/day). Batch scoring of a day's accounts uses the queue.
+GATE_B_DAILY_QUEUE_SIZE = 1500
+# Online and streamed scoring see one request or chunk at a time and cannot rank a day's
+# accounts, so they fall back to queueing accounts whose score reaches this threshold.
+GATE_B_REVIEW_THRESHOLD = 0.50
 
 # Example of how to use it in a notebook:
 # from bank_fraud.config import RAW_ANONYMIZED_DATASET
@@ -0,0 +1,265 @@
+import os
+from pathlib import Path
+import time
+
+from imblearn.over_sampling import SMOTE, RandomOverSampler
+from imblearn.under_sampling import RandomUnderSampler
+from joblib import Parallel, delayed, parallel_config
+from loguru import logger
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import (
+    average_precision_score,
+    balanced_accuracy_score,
+    brier_score_loss,
+    f1_score,
+    matthews_corrcoef,
+    precision_score,
+    recall_score,
+)
+from sklearn.naive_bayes import GaussianNB
+from sklearn.tree import DecisionTreeClassifier
+from tqdm import tqdm
+import typer
+
+from bank_fraud.config import (
+    FEATURE_SCHEMA,
+    REPORTS_MODEL_EVAL_DIR,
+    SELECTED_FEATURES_DATASET,
+    TRAINING_CACHE_DIR,
+)
+from bank_fraud.modeling.matrix_cache import PreprocessedFold
+from bank_fraud.modeling.resampling import fit_weighted, weighted_resamplers
+from bank_fraud.modeling.train import (
+    RANDOM_STATE,
+    build_folds,
+    load_training_data,
+    split_holdout,
+    xgb_classifier,
+)
+
+app = typer.Typer()
+
+BASELINE_RESULTS = REPORTS_MODEL_EVAL_DIR / "baseline_model_performance.csv"
+RESAMPLING_RESULTS = REPORTS_MODEL_EVAL_DIR / "resampling_model_performance.csv"
+FOLD_RESULTS = REPORTS_MODEL_EVAL_DIR / "benchmark_fold_results.csv"
+
+# Column order of notebook 5.0's `auto_ml` tables. Ratios are shown as percentages; MCC,
+# Brier and the timings as plain numbers.
+METRIC_COLUMNS = ["AP", "BalAcc", "F1_w", "MCC", "Brier", "Precision", "Recall"]
+PLAIN_METRICS = {"MCC", "Brier"}
+RUN_TIME_COLUMN = "Avg Run Time (s)"
+PREDICT_TIME_COLUMN = "Avg Predict Time (s)"
+
+
+def baseline_models(y_train) -> dict:
+    """Notebook 5.0's baseline models."""
+    return {
+        "LogisticRegression": LogisticRegression(
+            max_iter=1000, class_weight="balanced", random_state=RANDOM_STATE
+        ),
+        "GaussianNB": GaussianNB(),
+        "DecisionTreeClassifier": DecisionTreeClassifier(
+            random_state=RANDOM_STATE,
+            class_weight="balanced",
+            max_depth=8,
+            min_samples_leaf=20,
+            ccp_alpha=0.001,
+        ),
+        "XGBoost": xgb_classifier(y_train),
+    }
+
+
+def resamplers() -> dict:
+    """Notebook 5.0's resamplers."""
+    return {
+        "RandomOverSampler": RandomOverSampler(random_state=42),
+        "SMOTE": SMOTE(random_state=42),
+        "RandomUnderSampler": RandomUnderSampler(random_state=42),
+    }
+
+
+def split_metrics(prefix: str, y_true, y_pred, y_proba) -> dict:
+    return {
+        f"{prefix} AP": average_precision_score(y_true, y_proba),
+        f"{prefix} BalAcc": balanced_accuracy_score(y_true, y_pred),
+        f"{prefix} F1_w": f1_score(y_true, y_pred, average="weighted"),
+        f"{prefix} MCC": matthews_corrcoef(y_true, y_pred),
+        f"{prefix} Brier": brier_score_loss(y_true, y_proba),
+        f"{prefix} Precision": precision_score(y_true, y_pred, zero_division=0),
+        f"{prefix} Recall": recall_score(y_true, y_pred),
+    }
+
+
+def evaluate_fold(model, resampler, fold: PreprocessedFold) -> dict:
+    """
+    One `auto_ml` fold on cached matrices: resample the training side (as the
+    `ImbPipeline` step after the preprocessor does), fit, then score both sides.
+
+    Resamplers from `bank_fraud.modeling.resampling` return sample weights alongside the
+    rows and the model is fitted with them. The fit time includes resampling, as the
+    notebook's run time did; prediction covers `predict` and `predict_proba` on both sides.
+    """
+    start = time.perf_counter()
+    X_fit, y_fit, sample_weight = fold.X_train, fold.y_train, None
+    if hasattr(resampler, "resample"):
+        X_fit, y_fit, sample_weight = resampler.resample(X_fit, y_fit)
+    elif resampler is not None:
+        X_fit, y_fit = clone(resampler).fit_resample(X_fit, y_fit)
+    model = fit_weighted(model, X_fit, y_fit, sample_weight)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = {
+        split: (model.predict(X), model.predict_proba(X)[:, 1])
+        for split, X in (("Train", fold.X_train), ("Val", fold.X_val))
+    }
+    predict_time = time.perf_counter() - start
+    metrics = {}
+    for split, y_true in (("Train", fold.y_train), ("Val", fold.y_val)):
+        metrics.update(split_metrics(split, y_true, *predictions[split]))
+    return {**metrics, "fit_time": fit_time, "predict_time": predict_time}
+
+
+def limit_threads(model, threads: int):
+    """Pins estimators with their own thread pool (XGBoost) to `threads`."""
+    if "n_jobs" in model.get_params():
+        model = clone(model).set_params(n_jobs=threads)
+    return model
+
+
+def run_benchmark(
+    folds,
+    models: dict,
+    resampler_options: dict,
+    n_jobs: int = 1,
+    threads_per_job: int | None = None,
+) -> pd.DataFrame:
+    """
+    Evaluates every model x resampler x fold on shared preprocessed folds in a process pool.
+
+    Each job gets `threads_per_job` threads (default: the CPUs divided among the workers)
+    for BLAS/OpenMP and for estimators with their own `n_jobs`, so the pool does not
+    oversubscribe the machine. The largest jobs (XGBoost, SMOTE) are submitted first.
+
+    Returns:
+        pd.DataFrame: One row per (model, resampler, fold) with every metric and timing;
+        `resampler` is None for the baseline.
+    """
+    threads = threads_per_job or max(1, (os.cpu_count() or 1) // max(1, n_jobs))
+    jobs = [
+        (model_name, resampler_name, f)
+        for resampler_name in [None, *resampler_options]
+        for model_name in models
+        for f in range(len(folds))
+    ]
+    # Longest first so a slow combination does not start last and leave workers idle.
+    order = sorted(
+        range(len(jobs)),
+        key=lambda j: (jobs[j][0] != "XGBoost", jobs[j][1] != "SMOTE"),
+    )
+    models = {name: limit_threads(model, threads) for name, model in models.items()}
+    with parallel_config(backend="loky", inner_max_num_threads=threads):
+        outputs = Parallel(n_jobs=n_jobs, return_as="generator")(
+            delayed(evaluate_fold)(
+                models[jobs[j][0]],
+                None if jobs[j][1] is None else resampler_options[jobs[j][1]],
+                folds.folds[jobs[j][2]],
+            )
+            for j in order
+        )
+        rows = [None] * len(jobs)
+        for j, output in zip(order, tqdm(outputs, total=len(jobs), desc="benchmark")):
+            model_name, resampler_name, fold = jobs[j]
+            rows[j] = {"model": model_name, "resampler": resampler_name, "fold": fold, **output}
+    return pd.DataFrame(rows)
+
+
+def summarize(fold_results: pd.DataFrame) -> pd.DataFrame:
+    """Fold means per combination, indexed as `auto_ml` ("Model" or "Model + Resampler")."""
+    metric_columns = [f"{split} {m}" for m in METRIC_COLUMNS for split in ("Train", "Val")]
+    grouped = fold_results.assign(resampler=fold_results["resampler"].fillna("")).groupby(
+        ["resampler", "model"], sort=False
+    )
+    summary = grouped[metric_columns].mean()
+    summary[RUN_TIME_COLUMN] = grouped["fit_time"].mean()
+    summary[PREDICT_TIME_COLUMN] = grouped["predict_time"].mean()
+    summary.index = [
+        model if not resampler else f"{model} + {resampler}" for resampler, model in summary.index
+    ]
+    return summary
+
+
+def format_performance(summary: pd.DataFrame) -> pd.DataFrame:
+    """Notebook 5.0's display formatting: percentages to two places, MCC/Brier to four."""
+    formatted = pd.DataFrame(index=summary.index)
+    for column in summary.columns:
+        if column in (RUN_TIME_COLUMN, PREDICT_TIME_COLUMN):
+            formatted[column] = summary[column].map("{:.2f}".format)
+        elif column.split(" ", 1)[1] in PLAIN_METRICS:
+            formatted[column] = summary[column].map("{:.4f}".format)
+        else:
+            formatted[column] = summary[column].map(lambda v: f"{v * 100:.2f}%")
+    return formatted
+
+
+@app.command()
+def main(
+    features_path: Path = SELECTED_FEATURES_DATASET,
+    n_jobs: int = 1,
+    threads_per_job: int = typer.Option(
+        0, help="Threads per job; 0 divides the CPUs evenly among the jobs."
+    ),
+    resampling: bool = typer.Option(True, help="Also run every resampler with every model."),
+    weighted_resampling: bool = typer.Option(
+        False, help="Use the index/sample-weight resamplers instead of imblearn's copies."
+    ),
+    cache_dir: Path = TRAINING_CACHE_DIR,
+    in_memory: bool = typer.Option(
+        False, help="Keep the preprocessed fold matrices in memory instead of on disk."
+    ),
+    schema_path: Path = FEATURE_SCHEMA,
+):
+    """
+    Runs notebook 5.0's baseline and resampling comparison on shared cached folds and writes
+    baseline_model_performance.csv, resampling_model_performance.csv and the per-fold
+    metrics and timings.
+    """
+    X, y, numerical_features, categorical_features, passthrough_features = load_training_data(
+        features_path, schema_path
+    )
+    X_train, _, _, y_train, _, _ = split_holdout(X, y)
+    folds = build_folds(
+        X_train,
+        y_train,
+        numerical_features,
+        categorical_features,
+        passthrough_features,
+        cache_dir=None if in_memory else cache_dir,
+        n_jobs=n_jobs,
+    )
+
+    start = time.perf_counter()
+    fold_results = run_benchmark(
+        folds,
+        baseline_models(y_train),
+        (weighted_resamplers() if weighted_resampling else resamplers()) if resampling else {},
+        n_jobs=n_jobs,
+        threads_per_job=threads_per_job or None,
+    )
+    logger.info(f"Benchmark finished in {time.perf_counter() - start:.1f}s")
+
+    REPORTS_MODEL_EVAL_DIR.mkdir(parents=True, exist_ok=True)
+    fold_results.to_csv(FOLD_RESULTS, index=False)
+    summary = format_performance(summarize(fold_results))
+    is_baseline = ~summary.index.str.contains(" + ", regex=False)
+    summary[is_baseline].to_csv(BASELINE_RESULTS, index=True)
+    logger.success(f"Saved {BASELINE_RESULTS.name}")
+    if resampling:
+        summary[~is_baseline].to_csv(RESAMPLING_RESULTS, index=True)
+        logger.success(f"Saved {RESAMPLING_RESULTS.name}")
+
+
+if __name__ == "__main__":
+    app()
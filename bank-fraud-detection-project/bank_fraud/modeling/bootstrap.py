@@ -0,0 +1,242 @@
+from pathlib import Path
+import time
+
+from joblib import Parallel, delayed
+from loguru import logger
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+import typer
+
+from bank_fraud.config import (
+    BEST_AUCPR_MODEL,
+    BEST_PRECISION_MODEL,
+    FEATURE_SCHEMA,
+    GATE_A_BLOCK_THRESHOLD,
+    REPORTS_MODEL_EVAL_DIR,
+    SELECTED_FEATURES_DATASET,
+)
+from bank_fraud.modeling.predict import load_model
+from bank_fraud.modeling.train import RANDOM_STATE, load_training_data, split_holdout
+
+app = typer.Typer()
+
+HOLDOUT_CI_RESULTS = REPORTS_MODEL_EVAL_DIR / "holdout_metrics_ci.csv"
+HOLDOUT_REPLICATES = REPORTS_MODEL_EVAL_DIR / "holdout_bootstrap_replicates.csv"
+
+# Metrics of notebook 5.0's `evaluate_model_on_holdout`, under its names.
+METRICS = [
+    "Precision",
+    "Recall",
+    "F1-Weighted",
+    "Balanced Accuracy",
+    "MCC",
+    "Average Precision (AUC-PR)",
+    "Brier Score",
+]
+
+
+class SortedHoldout:
+    """
+    Holdout labels, decisions and scores sorted once by descending score.
+
+    Bootstrap replicates are drawn over these sorted positions, so every replicate's
+    average precision reads its cumulative counts along the same order instead of sorting
+    its own resample.
+
+    Attributes:
+        y_true, y_pred (np.ndarray): Labels and decisions as 0/1 floats, in score order.
+        y_proba (np.ndarray): Scores, descending.
+        group_ends (np.ndarray): Last position of each run of tied scores.
+    """
+
+    def __init__(self, y_true, y_pred, y_proba):
+        y_proba = np.asarray(y_proba, dtype=np.float64)
+        order = np.argsort(y_proba, kind="stable")[::-1]
+        self.y_true = np.asarray(y_true)[order].astype(np.float64)
+        self.y_pred = np.asarray(y_pred)[order].astype(np.float64)
+        self.y_proba = y_proba[order]
+        self.group_ends = np.r_[np.flatnonzero(np.diff(self.y_proba)), len(order) - 1]
+
+    def __len__(self) -> int:
+        return len(self.y_proba)
+
+
+def replicate_indices(n_rows: int, n_replicates: int, seed) -> np.ndarray:
+    """(n_replicates, n_rows) matrix of row positions, one bootstrap resample per row."""
+    return np.random.default_rng(seed).integers(n_rows, size=(n_replicates, n_rows))
+
+
+def replicate_counts(indices: np.ndarray, n_rows: int) -> np.ndarray:
+    """How many times each row appears in each resample, as a (replicates, rows) matrix."""
+    offsets = np.arange(len(indices))[:, None] * n_rows
+    counts = np.bincount((indices + offsets).ravel(), minlength=len(indices) * n_rows)
+    return counts.reshape(len(indices), n_rows).astype(np.float64)
+
+
+def replicate_metrics(holdout: SortedHoldout, counts: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Every metric for every replicate at once, from its row counts.
+
+    The confusion matrix and the Brier score are count-weighted sums. Average precision is
+    sklearn's step-wise sum of precision x recall increments: cumulative sums of the counts
+    along the shared score order, read at the end of each tied-score run. Ties are handled
+    as in `average_precision_score`, and scores a replicate did not draw add nothing.
+    Metrics with an empty denominator are 0, as sklearn returns with `zero_division=0`.
+    """
+    y, pred = holdout.y_true, holdout.y_pred
+    n = counts.sum(axis=1)
+    positives = counts @ y
+    predicted = counts @ pred
+    tp = counts @ (y * pred)
+    fp = predicted - tp
+    fn = positives - tp
+    tn = n - positives - fp
+
+    def ratio(num, den):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(den > 0, num / den, 0.0)
+
+    precision = ratio(tp, tp + fp)
+    recall = ratio(tp, positives)
+    specificity = ratio(tn, tn + fp)
+    f1_positive = ratio(2 * tp, 2 * tp + fp + fn)
+    f1_negative = ratio(2 * tn, 2 * tn + fn + fp)
+    mcc = ratio(tp * tn - fp * fn, np.sqrt((tp + fp) * (tp + fn) * (tn + fp) * (tn + fn)))
+
+    ends = holdout.group_ends
+    tp_at = np.cumsum(counts * y, axis=1)[:, ends]
+    alerts_at = np.cumsum(counts, axis=1)[:, ends]
+    recall_steps = np.diff(tp_at, axis=1, prepend=0)
+    average_precision = ratio((recall_steps * ratio(tp_at, alerts_at)).sum(axis=1), positives)
+
+    return {
+        "Precision": precision,
+        "Recall": recall,
+        "F1-Weighted": (positives * f1_positive + (n - positives) * f1_negative) / n,
+        "Balanced Accuracy": (recall + specificity) / 2,
+        "MCC": mcc,
+        "Average Precision (AUC-PR)": average_precision,
+        "Brier Score": counts @ (holdout.y_proba - y) ** 2 / n,
+    }
+
+
+def bootstrap_batch(holdout: SortedHoldout, n_replicates: int, seed) -> pd.DataFrame:
+    indices = replicate_indices(len(holdout), n_replicates, seed)
+    counts = replicate_counts(indices, len(holdout))
+    return pd.DataFrame(replicate_metrics(holdout, counts))
+
+
+def bootstrap_metrics(
+    y_true,
+    y_pred,
+    y_proba,
+    n_replicates: int = 2000,
+    batch_size: int = 100,
+    n_jobs: int = 1,
+    random_state: int = RANDOM_STATE,
+) -> pd.DataFrame:
+    """
+    Holdout metrics on `n_replicates` bootstrap resamples, one row per replicate.
+
+    Replicates are computed `batch_size` at a time, so the count matrix stays at
+    batch_size x holdout rows; batches run in a process pool of `n_jobs`. Each batch has
+    its own seed spawned from `random_state`, so the replicates do not depend on `n_jobs`.
+    """
+    holdout = SortedHoldout(y_true, y_pred, y_proba)
+    sizes = [min(batch_size, n_replicates - start) for start in range(0, n_replicates, batch_size)]
+    seeds = np.random.SeedSequence(random_state).spawn(len(sizes))
+    batches = Parallel(n_jobs=n_jobs, return_as="generator")(
+        delayed(bootstrap_batch)(holdout, size, seed) for size, seed in zip(sizes, seeds)
+    )
+    return pd.concat(list(tqdm(batches, total=len(sizes), desc="bootstrap")), ignore_index=True)
+
+
+def point_metrics(y_true, y_pred, y_proba) -> dict[str, float]:
+    """The metrics on the holdout itself (every row counted once)."""
+    holdout = SortedHoldout(y_true, y_pred, y_proba)
+    metrics = replicate_metrics(holdout, np.ones((1, len(holdout))))
+    return {name: float(values[0]) for name, values in metrics.items()}
+
+
+def confidence_intervals(
+    replicates: pd.DataFrame, estimates: dict[str, float], confidence: float = 0.95
+) -> pd.DataFrame:
+    """Percentile intervals of each metric next to its holdout estimate."""
+    tail = (1 - confidence) / 2
+    return pd.DataFrame(
+        {
+            "Metric": list(estimates),
+            "Estimate": list(estimates.values()),
+            "CI Lower": replicates[list(estimates)].quantile(tail).to_numpy(),
+            "CI Upper": replicates[list(estimates)].quantile(1 - tail).to_numpy(),
+            "Bootstrap Std": replicates[list(estimates)].std().to_numpy(),
+        }
+    )
+
+
+@app.command()
+def main(
+    features_path: Path = SELECTED_FEATURES_DATASET,
+    block_model_path: Path = BEST_PRECISION_MODEL,
+    review_model_path: Path = BEST_AUCPR_MODEL,
+    n_replicates: int = 2000,
+    batch_size: int = typer.Option(100, help="Replicates per count matrix and per pool job."),
+    n_jobs: int = 1,
+    confidence: float = 0.95,
+    block_threshold: float = typer.Option(
+        GATE_A_BLOCK_THRESHOLD, help="Gate A threshold for the block-policy rows."
+    ),
+    save_replicates: bool = typer.Option(False, help="Also write every replicate's metrics."),
+    schema_path: Path = FEATURE_SCHEMA,
+):
+    """
+    Bootstrap confidence intervals for notebook 5.0's holdout metrics. It covers both
+    models' own predictions plus Gate A's block decisions (precision model at
+    `block_threshold`).
+    """
+    X, y, _, _, _ = load_training_data(features_path, schema_path)
+    _, _, X_holdout, _, _, y_holdout = split_holdout(X, y)
+    block_model = load_model(block_model_path)
+    review_model = load_model(review_model_path)
+    block_proba = block_model.predict_proba(X_holdout)[:, 1]
+    evaluations = {
+        "Precision-Optimized XGBoost": (block_model.predict(X_holdout), block_proba),
+        "AUC-PR-Optimized XGBoost": (
+            review_model.predict(X_holdout),
+            review_model.predict_proba(X_holdout)[:, 1],
+        ),
+        f"Gate A Block (tau={block_threshold:.2f})": (
+            block_proba >= block_threshold,
+            block_proba,
+        ),
+    }
+
+    intervals, replicates = [], []
+    for name, (y_pred, y_proba) in evaluations.items():
+        start = time.perf_counter()
+        model_replicates = bootstrap_metrics(
+            y_holdout, y_pred, y_proba, n_replicates, batch_size, n_jobs
+        )
+        logger.info(f"{name}: {n_replicates:,} replicates in {time.perf_counter() - start:.1f}s")
+        estimates = point_metrics(y_holdout, y_pred, y_proba)
+        model_intervals = confidence_intervals(model_replicates, estimates, confidence)
+        model_intervals.insert(0, "Model", name)
+        intervals.append(model_intervals)
+        replicates.append(model_replicates.assign(Model=name))
+        for row in model_intervals.to_dict("records"):
+            logger.info(
+                f"  {row['Metric']}: {row['Estimate']:.4f} "
+                f"[{row['CI Lower']:.4f}, {row['CI Upper']:.4f}]"
+            )
+
+    REPORTS_MODEL_EVAL_DIR.mkdir(parents=True, exist_ok=True)
+    pd.concat(intervals, ignore_index=True).to_csv(HOLDOUT_CI_RESULTS, index=False)
+    logger.success(f"Saved {HOLDOUT_CI_RESULTS.name}")
+    if save_replicates:
+        pd.concat(replicates, ignore_index=True).to_csv(HOLDOUT_REPLICATES, index=False)
+        logger.success(f"Saved {HOLDOUT_REPLICATES.name}")
+
+
+if __name__ == "__main__":
+    app()
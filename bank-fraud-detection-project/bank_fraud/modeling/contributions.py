@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import FunctionTransformer
+import xgboost as xgb
+
+
+def is_passthrough(transformer) -> bool:
+    """
+    Whether a fitted `ColumnTransformer` entry passes its columns through unchanged: the
+    'passthrough' remainder, or a 'passthrough' transformer, which sklearn stores fitted as
+    an identity `FunctionTransformer`.
+    """
+    if isinstance(transformer, str):
+        return transformer == "passthrough"
+    return isinstance(transformer, FunctionTransformer) and transformer.func is None
+
+
+def shap_contributions(classifier, X_transformed) -> tuple[np.ndarray, float]:
+    """
+    (SHAP values, base value) of an XGBoost classifier in log-odds, from the booster's own
+    TreeSHAP (`pred_contribs`).
+
+    These are the values `shap.TreeExplainer(classifier).shap_values` returns for XGBoost
+    models, but computed on the sparse input directly instead of a dense DataFrame.
+    """
+    if not hasattr(classifier, "get_booster"):
+        raise TypeError(f"SHAP explanations need an XGBoost classifier; got {type(classifier)}.")
+    dmatrix = xgb.DMatrix(X_transformed, missing=classifier.missing)
+    contributions = classifier.get_booster().predict(dmatrix, pred_contribs=True)
+    return contributions[:, :-1].astype(np.float32), float(contributions[0, -1])
+
+
+def source_features(preprocessor) -> list[str]:
+    """
+    The input column behind each of a fitted `ColumnTransformer`'s output columns, in
+    `get_feature_names_out()` order: a scaled or passed-through column maps to itself and
+    each one-hot column to the categorical column it encodes.
+
+    Raises:
+        ValueError: For transformers whose outputs cannot be traced to single input columns
+            (one-hot encoders with `drop` or infrequent categories, anything else custom).
+    """
+    feature_names_in = list(preprocessor.feature_names_in_)
+    sources = np.empty(len(preprocessor.get_feature_names_out()), dtype=object)
+    for name, transformer, columns in preprocessor.transformers_:
+        out = preprocessor.output_indices_[name]
+        if transformer == "drop" or out.start == out.stop:
+            continue
+        if is_passthrough(transformer):
+            if isinstance(columns[0], (int, np.integer)):
+                columns = [feature_names_in[i] for i in columns]
+            repeated = list(columns)
+        elif hasattr(transformer, "scale_") or hasattr(transformer, "mean_"):
+            repeated = list(columns)
+        elif hasattr(transformer, "categories_"):
+            if transformer.drop_idx_ is not None or getattr(
+                transformer, "_infrequent_enabled", False
+            ):
+                raise ValueError(
+                    f"Cannot map '{name}' outputs back: drop/infrequent categories are in use."
+                )
+            repeated = np.repeat(columns, [len(c) for c in transformer.categories_])
+        else:
+            raise ValueError(f"Cannot map '{name}' outputs of {type(transformer).__name__} back.")
+        if len(repeated) != out.stop - out.start:
+            raise ValueError(
+                f"'{name}' has {out.stop - out.start} output columns; expected {len(repeated)}."
+            )
+        sources[out] = repeated
+    return list(sources)
+
+
+def grouping_matrix(sources: list[str]) -> tuple[sparse.csr_matrix, list[str]]:
+    """
+    (0/1 matrix summing transformed columns into their source columns, source names in
+    first-appearance order). Contributions @ matrix gives one contribution per source column.
+    """
+    group, names = pd.factorize(np.asarray(sources, dtype=object))
+    matrix = sparse.csr_matrix(
+        (np.ones(len(sources), dtype=np.float32), (np.arange(len(sources)), group)),
+        shape=(len(sources), len(names)),
+    )
+    return matrix, list(names)
+
+
+def top_reasons(values, feature_names, top_k: int, index=None) -> pd.DataFrame:
+    """
+    The `top_k` features with the largest positive contributions in each row of a SHAP
+    matrix, as reason_1..top_k and reason_k_shap columns; a row with fewer features pushing
+    it towards fraud gets fewer reasons (missing values for the rest).
+    """
+    values = np.asarray(values)
+    feature_names = np.asarray(feature_names, dtype=object)
+    top_k = min(top_k, values.shape[1])
+    top = np.argpartition(-values, top_k - 1, axis=1)[:, :top_k]
+    order = np.argsort(-np.take_along_axis(values, top, axis=1), axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    contributions = np.take_along_axis(values, top, axis=1)
+    reasons = {}
+    for k in range(top_k):
+        pushes_up = contributions[:, k] > 0
+        reasons[f"reason_{k + 1}"] = pd.array(
+            np.where(pushes_up, feature_names[top[:, k]], None), dtype="string"
+        )
+        reasons[f"reason_{k + 1}_shap"] = np.where(pushes_up, contributions[:, k], np.nan)
+    return pd.DataFrame(reasons, index=index)
@@ -0,0 +1,224 @@
+import json
+import os
+from pathlib import Path
+import shutil
+import time
+
+import joblib
+from loguru import logger
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.model_selection import train_test_split
+import typer
+
+from bank_fraud.config import (
+    BEST_AUCPR_MODEL,
+    BEST_PRECISION_MODEL,
+    FEATURE_SCHEMA,
+    PROJECT_ROOT,
+    REPORTS_FIGURES_DIR,
+    REPORTS_MODEL_EVAL_DIR,
+    SELECTED_FEATURES_DATASET,
+    SHAP_CACHE_DIR,
+)
+from bank_fraud.modeling.contributions import (
+    grouping_matrix,
+    shap_contributions,
+    source_features,
+    top_reasons,
+)
+from bank_fraud.modeling.matrix_cache import load_matrix, save_matrix, to_float32
+from bank_fraud.modeling.predict import load_model, split_pipeline
+from bank_fraud.modeling.train import RANDOM_STATE, load_training_data, split_holdout
+
+app = typer.Typer()
+
+# Bump when the on-disk layout below changes so stale caches are recomputed, not misread.
+SHAP_CACHE_VERSION = 2
+
+# Accounts explained by default, sampled stratified on the label when one is given.
+DEFAULT_SAMPLE_ROWS = 20_000
+
+# Rows transformed and explained at once.
+DEFAULT_CHUNK_ROWS = 10_000
+
+# Reason codes kept per account.
+DEFAULT_TOP_REASONS = 3
+
+
+def sample_rows(n_rows: int, sample_size: int, y=None, random_state: int = RANDOM_STATE):
+    """
+    Sorted row positions of a `sample_size` sample, stratified on `y` when given; every row
+    when `sample_size` is 0 or covers the data.
+    """
+    if sample_size <= 0 or sample_size >= n_rows:
+        return np.arange(n_rows)
+    rows, _ = train_test_split(
+        np.arange(n_rows), train_size=sample_size, stratify=y, random_state=random_state
+    )
+    return np.sort(rows)
+
+
+class ShapExplanation:
+    """
+    SHAP values of a fitted preprocessor + XGBoost pipeline on a sample of accounts, cached.
+
+    Only the sampled rows are transformed, chunk by chunk, and explained on the
+    preprocessor's (sparse) output; nothing is densified. With `cache_dir` the SHAP matrix,
+    the transformed sample and the feature names are written as .npy files under a key
+    derived from the model, the data, the labels and the sampling settings, and re-opened
+    memory-mapped, so plots, importance tables and reason codes are read from the cache
+    instead of recomputed.
+
+    Attributes:
+        values (np.ndarray): float32 SHAP values (sampled rows x transformed features).
+        base_value (float): Expected log-odds the values add up from.
+        data: Transformed sample (float32 CSR or dense), aligned with `values`.
+        feature_names (list[str]): Column names of the transformed matrix.
+        source_features (list[str]): Input column behind each transformed column.
+        index (pd.Index): Labels of the sampled rows in the explained frame.
+        key (str): Content hash identifying this explanation.
+    """
+
+    def __init__(
+        self,
+        model,
+        X: pd.DataFrame,
+        y=None,
+        sample_size: int = DEFAULT_SAMPLE_ROWS,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        cache_dir: Path | None = SHAP_CACHE_DIR,
+        random_state: int = RANDOM_STATE,
+    ):
+        y = None if y is None else np.asarray(y)
+        self.key = joblib.hash(
+            [SHAP_CACHE_VERSION, model, X, y, sample_size, random_state], hash_name="sha1"
+        )
+        self.cache_path = None if cache_dir is None else cache_dir / self.key
+        if self.cache_path is not None and (self.cache_path / "meta.json").exists():
+            self._load()
+            logger.info(f"Reusing SHAP values from {self.cache_path}")
+            return
+
+        start = time.perf_counter()
+        preprocessor, classifier = split_pipeline(model)
+        rows = sample_rows(len(X), sample_size, y, random_state)
+        values, data = [], []
+        for chunk_start in range(0, len(rows), chunk_rows):
+            chunk = X.iloc[rows[chunk_start : chunk_start + chunk_rows]]
+            X_transformed = to_float32(preprocessor.transform(chunk))
+            chunk_values, self.base_value = shap_contributions(classifier, X_transformed)
+            values.append(chunk_values)
+            data.append(X_transformed)
+        self.values = np.concatenate(values)
+        self.data = (
+            sparse.vstack(data, format="csr") if sparse.issparse(data[0]) else np.concatenate(data)
+        )
+        self.feature_names = list(preprocessor.get_feature_names_out())
+        self.source_features = source_features(preprocessor)
+        self.index = X.index[rows]
+        logger.info(
+            f"Computed SHAP values for {len(rows):,} of {len(X):,} rows in "
+            f"{time.perf_counter() - start:.2f}s"
+        )
+        if self.cache_path is not None:
+            self._save()
+
+    def _save(self) -> None:
+        tmp_path = self.cache_path.with_name(f"{self.key}.tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        meta = {
+            "base_value": self.base_value,
+            "feature_names": self.feature_names,
+            "source_features": self.source_features,
+            "data": save_matrix(self.data, tmp_path / "data"),
+        }
+        np.save(tmp_path / "values.npy", self.values)
+        pd.Series(self.index).to_frame("index").to_parquet(tmp_path / "index.parquet")
+        # meta.json marks a complete cache, so it is written last.
+        (tmp_path / "meta.json").write_text(json.dumps(meta))
+        shutil.rmtree(self.cache_path, ignore_errors=True)
+        os.replace(tmp_path, self.cache_path)
+        self._load()
+        logger.info(f"Cached SHAP values in {self.cache_path}")
+
+    def _load(self) -> None:
+        meta = json.loads((self.cache_path / "meta.json").read_text())
+        self.base_value = meta["base_value"]
+        self.feature_names = meta["feature_names"]
+        self.source_features = meta["source_features"]
+        self.values = np.load(self.cache_path / "values.npy", mmap_mode="r")
+        self.data = load_matrix(self.cache_path / "data", meta["data"])
+        self.index = pd.Index(pd.read_parquet(self.cache_path / "index.parquet")["index"])
+
+    def mean_abs(self) -> pd.DataFrame:
+        """Notebook 5.0's SHAP importance table: mean |SHAP| per feature, descending."""
+        return pd.DataFrame(
+            {
+                "feature": self.feature_names,
+                "mean_abs_shap_value": np.abs(self.values).mean(axis=0),
+            }
+        ).sort_values(by="mean_abs_shap_value", ascending=False)
+
+    def reason_codes(self, top_k: int = DEFAULT_TOP_REASONS) -> pd.DataFrame:
+        """
+        Each sampled account's model score and the `top_k` input columns pushing it towards
+        fraud the most. One-hot contributions are summed back into their categorical column.
+        """
+        grouping, sources = grouping_matrix(self.source_features)
+        margin = self.base_value + np.asarray(self.values).sum(axis=1, dtype=np.float64)
+        codes = top_reasons(self.values @ grouping, sources, top_k, index=self.index)
+        codes.insert(0, "fraud_proba", 1 / (1 + np.exp(-margin)))
+        return codes
+
+
+@app.command()
+def main(
+    features_path: Path = SELECTED_FEATURES_DATASET,
+    sample_size: int = typer.Option(
+        DEFAULT_SAMPLE_ROWS, help="Holdout accounts to explain, stratified; 0 for all."
+    ),
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    top_n: int = typer.Option(20, help="Features shown in the beeswarm plots."),
+    top_reasons: int = DEFAULT_TOP_REASONS,
+    cache_dir: Path = SHAP_CACHE_DIR,
+    schema_path: Path = FEATURE_SCHEMA,
+):
+    """
+    SHAP beeswarm plots, mean-|SHAP| tables and per-account reason codes for both models
+    on the holdout, all from one cached SHAP computation per model.
+    """
+    from bank_fraud.utils.visualizations import plot_shap_summary
+
+    X, y, _, _, _ = load_training_data(features_path, schema_path)
+    _, _, X_holdout, _, _, y_holdout = split_holdout(X, y)
+    REPORTS_MODEL_EVAL_DIR.mkdir(parents=True, exist_ok=True)
+    REPORTS_FIGURES_DIR.mkdir(parents=True, exist_ok=True)
+    for suffix, model_path, model_name in (
+        ("precision_model", BEST_PRECISION_MODEL, "Precision-Optimized XGBoost"),
+        ("aucpr_model", BEST_AUCPR_MODEL, "AUC-PR-Optimized XGBoost"),
+    ):
+        explanation = ShapExplanation(
+            load_model(model_path), X_holdout, y_holdout, sample_size, chunk_rows, cache_dir
+        )
+        plot_shap_summary(
+            explanation,
+            model_name,
+            REPORTS_FIGURES_DIR / f"shap_beeswarm_{suffix}.png",
+            PROJECT_ROOT,
+            top_n=top_n,
+            show=False,
+        )
+        explanation.mean_abs().to_csv(
+            REPORTS_MODEL_EVAL_DIR / f"shap_values_{suffix}.csv", index=False
+        )
+        explanation.reason_codes(top_reasons).to_csv(
+            REPORTS_MODEL_EVAL_DIR / f"shap_reason_codes_{suffix}.csv", index=True
+        )
+        logger.success(f"Saved SHAP plot, importance and reason codes for {model_name}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,245 @@
+from pathlib import Path
+
+import joblib
+from loguru import logger
+import numpy as np
+import pandas as pd
+from scipy import sparse
+import typer
+
+from bank_fraud.config import BEST_AUCPR_MODEL, SELECTED_FEATURES_DATASET
+from bank_fraud.modeling.contributions import is_passthrough
+
+app = typer.Typer()
+
+
+class FusedPreprocessor:
+    """
+    Flat, precomputed form of a fitted `ColumnTransformer` for inference.
+
+    Supports the notebook 5.0 layout: a `StandardScaler` over the numerical columns, a
+    `OneHotEncoder(handle_unknown='ignore')` over the categorical columns and passthrough
+    blocks (bool columns, the remainder). Fitting state is reduced to mean/scale arrays and one
+    category index per categorical column. A dense `transform` writes every block straight
+    into a single preallocated matrix instead of building per-transformer intermediates and
+    an hstack.
+
+    When the fitted transformer outputs CSR (`sparse_output_`, sklearn's default whenever the
+    output density is below `sparse_threshold`), `transform` builds the CSR arrays directly
+    from the nonzero numeric cells and the one-hot hits, without a dense block. The
+    representation matters to XGBoost: implicit CSR zeros are missing values while dense
+    0.0 is a value, so a dense block would be scored differently from the training matrices.
+    """
+
+    def __init__(self, preprocessor):
+        self.feature_names_in = list(preprocessor.feature_names_in_)
+        self.feature_names_out = list(preprocessor.get_feature_names_out())
+        self.n_features_out = len(self.feature_names_out)
+        self.sparse_output = bool(getattr(preprocessor, "sparse_output_", False))
+
+        self.numeric_columns: list[str] = []
+        self.numeric_offset = 0
+        self.mean = None
+        self.scale = None
+        # (column, non-missing categories, their output columns, output column for missing
+        # values or None)
+        self.category_index: list[tuple[str, pd.Index, np.ndarray, int | None]] = []
+        # (columns, first output column) per passthrough block
+        self.passthrough_blocks: list[tuple[list[str], int]] = []
+
+        for name, transformer, columns in preprocessor.transformers_:
+            out = preprocessor.output_indices_[name]
+            if transformer == "drop" or out.start == out.stop:
+                continue
+            if is_passthrough(transformer):
+                if isinstance(columns[0], (int, np.integer)):
+                    columns = [self.feature_names_in[i] for i in columns]
+                self.passthrough_blocks.append((list(columns), out.start))
+            elif hasattr(transformer, "scale_") or hasattr(transformer, "mean_"):
+                self._compile_scaler(transformer, columns, out.start)
+            elif hasattr(transformer, "categories_"):
+                self._compile_one_hot(transformer, columns, out.start)
+            else:
+                raise ValueError(
+                    f"Cannot fuse transformer '{name}' of type {type(transformer).__name__}."
+                )
+
+    def _compile_scaler(self, scaler, columns, offset: int) -> None:
+        self.numeric_columns = list(columns)
+        self.numeric_offset = offset
+        self.mean = scaler.mean_ if scaler.with_mean else None
+        self.scale = scaler.scale_ if scaler.with_std else None
+
+    def _compile_one_hot(self, encoder, columns, offset: int) -> None:
+        if encoder.drop_idx_ is not None or getattr(encoder, "_infrequent_enabled", False):
+            raise ValueError(
+                "Only OneHotEncoder without drop or infrequent categories can be fused."
+            )
+        for column, categories in zip(columns, encoder.categories_):
+            is_missing = pd.isna(categories)
+            out_cols = offset + np.flatnonzero(~is_missing)
+            missing = offset + int(np.flatnonzero(is_missing)[0]) if is_missing.any() else None
+            self.category_index.append(
+                (column, pd.Index(categories[~is_missing]), out_cols, missing)
+            )
+            offset += len(categories)
+
+    @property
+    def category_maps(self) -> dict[str, dict]:
+        """{column: {category: output column}} for every one-hot encoded column."""
+        return {
+            column: dict(zip(categories, out_cols.tolist()))
+            for column, categories, out_cols, _ in self.category_index
+        }
+
+    def _numeric_blocks(self, df: pd.DataFrame):
+        """(float64 values, first output column) of the scaled and passthrough blocks."""
+        if self.numeric_columns:
+            X = df[self.numeric_columns].to_numpy(dtype=np.float64, copy=True)
+            if self.mean is not None:
+                X -= self.mean
+            if self.scale is not None:
+                X /= self.scale
+            yield X, self.numeric_offset
+        for columns, offset in self.passthrough_blocks:
+            yield df[columns].to_numpy(dtype=np.float64), offset
+
+    def _one_hot_columns(self, df: pd.DataFrame):
+        """Output column hit by each row, or -1 for unseen values, per categorical column."""
+        for column, categories, out_cols, missing in self.category_index:
+            values = df[column].to_numpy()
+            codes = categories.get_indexer(values)
+            cols = np.where(codes >= 0, out_cols[codes], -1)
+            if missing is not None:
+                cols[(codes < 0) & pd.isna(values)] = missing
+            yield cols
+
+    def transform(self, df: pd.DataFrame, dtype=np.float32, out: np.ndarray | None = None):
+        """
+        Transforms a feature frame into an (n_rows, n_features_out) matrix: CSR when the
+        fitted transformer outputs CSR, dense otherwise.
+
+        The scaler arithmetic runs in float64 exactly as `StandardScaler.transform` does and is
+        only then written into the `dtype` output, so the result equals
+        `preprocessor.transform(df).astype(dtype)` bit for bit, including which entries a CSR
+        result stores (exact zeros are implicit, NaNs are stored, as in sklearn's hstack).
+        Pass `out` to reuse the fill buffer across calls when the output is dense.
+        """
+        if self.sparse_output:
+            return self._transform_csr(df, dtype)
+        n_rows = len(df)
+        if out is None:
+            out = np.zeros((n_rows, self.n_features_out), dtype=dtype)
+        else:
+            out = out[:n_rows]
+            out[:] = 0
+
+        for X, offset in self._numeric_blocks(df):
+            out[:, offset : offset + X.shape[1]] = X
+        rows = np.arange(n_rows)
+        for cols in self._one_hot_columns(df):
+            hit = cols >= 0
+            out[rows[hit], cols[hit]] = 1
+        return out
+
+    def _transform_csr(self, df: pd.DataFrame, dtype) -> sparse.csr_matrix:
+        """
+        CSR output assembled from (row, column, value) triplets: the numeric cells that are
+        not exactly zero in float64 and a 1 for every one-hot hit.
+        """
+        n_rows = len(df)
+        rows, cols, data = [], [], []
+        for X, offset in self._numeric_blocks(df):
+            r, c = np.nonzero(X != 0)
+            rows.append(r)
+            cols.append(c + offset)
+            data.append(X[r, c].astype(dtype))
+        for hit_cols in self._one_hot_columns(df):
+            hit = hit_cols >= 0
+            rows.append(np.flatnonzero(hit))
+            cols.append(hit_cols[hit])
+            data.append(np.ones(hit.sum(), dtype=dtype))
+
+        rows, cols, data = np.concatenate(rows), np.concatenate(cols), np.concatenate(data)
+        # Each (row, column) appears at most once; order by row, then column, for sorted
+        # indices as sklearn's hstack returns them.
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        return sparse.csr_matrix(
+            (data[order], cols[order], indptr), shape=(n_rows, self.n_features_out)
+        )
+
+
+def verify_fused_transform(model, df: pd.DataFrame, dtype=np.float32) -> None:
+    """
+    Checks that `FusedPreprocessor` reproduces the pipeline's `preprocessor.transform` exactly
+    on `df` (matrix type, stored entries and values) and that the classifier's
+    `predict_proba` on the fused matrix equals the pipeline's own.
+
+    Raises:
+        AssertionError: If the matrices or the probabilities differ (NaN compares equal).
+    """
+    preprocessor, classifier = model.named_steps["preprocessor"], model.named_steps["classifier"]
+    frame = df[list(preprocessor.feature_names_in_)]
+    expected = preprocessor.transform(frame)
+    actual = FusedPreprocessor(preprocessor).transform(df, dtype=dtype)
+
+    if sparse.issparse(actual) != sparse.issparse(expected):
+        raise AssertionError(
+            f"Matrix type mismatch: fused {type(actual).__name__} vs sklearn "
+            f"{type(expected).__name__}"
+        )
+    if actual.shape != expected.shape:
+        raise AssertionError(f"Shape mismatch: fused {actual.shape} vs sklearn {expected.shape}")
+    if sparse.issparse(expected):
+        expected = sparse.csr_matrix(expected, dtype=dtype)
+        expected.sort_indices()
+        actual.sort_indices()
+        if not (
+            np.array_equal(actual.indptr, expected.indptr)
+            and np.array_equal(actual.indices, expected.indices)
+        ):
+            raise AssertionError("Fused CSR stores different entries than sklearn.")
+        actual, expected = actual.data, expected.data
+    else:
+        expected = np.asarray(expected).astype(dtype)
+    mismatched = ~((actual == expected) | (np.isnan(actual) & np.isnan(expected)))
+    if mismatched.any():
+        raise AssertionError(f"{int(mismatched.sum()):,} mismatched values.")
+
+    proba = model.predict_proba(frame)[:, 1]
+    fused_proba = classifier.predict_proba(
+        FusedPreprocessor(preprocessor).transform(df, dtype=np.float64)
+    )[:, 1]
+    if not np.array_equal(proba, fused_proba):
+        raise AssertionError(
+            f"predict_proba differs by up to {np.abs(proba - fused_proba).max():.3g}."
+        )
+
+
+@app.command()
+def main(
+    features_path: Path = SELECTED_FEATURES_DATASET,
+    model_path: Path = BEST_AUCPR_MODEL,
+    n_rows: int = 100_000,
+):
+    """Verifies the fused transform against the saved pipeline's preprocessor."""
+    model = joblib.load(model_path)
+    preprocessor = model.named_steps["preprocessor"]
+    df = pd.read_parquet(features_path, columns=list(preprocessor.feature_names_in_))
+    df = df.head(n_rows)
+
+    # Unseen and missing categories must fall into the all-zero / NaN handling paths too.
+    probe = df.head(2).copy()
+    for column, _, _ in FusedPreprocessor(preprocessor).category_index:
+        probe[column] = ["__unseen__", None]
+    df = pd.concat([df, probe], ignore_index=True)
+
+    for dtype in (np.float32, np.float64):
+        verify_fused_transform(model, df, dtype=dtype)
+    logger.success(f"Fused transform and predict_proba match the pipeline on {len(df):,} rows.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,180 @@
+import json
+import os
+from pathlib import Path
+import shutil
+import time
+
+import joblib
+from loguru import logger
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import clone
+
+from bank_fraud.config import TRAINING_CACHE_DIR
+
+# Bump when the on-disk layout below changes so stale caches are rebuilt, not misread.
+CACHE_FORMAT_VERSION = 1
+
+
+def to_float32(X):
+    """CSR float32 for sparse transformer output, C-contiguous float32 otherwise."""
+    if sparse.issparse(X):
+        return sparse.csr_matrix(X, dtype=np.float32)
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+def save_matrix(X, path: Path) -> dict:
+    """Writes a matrix as .npy arrays next to `path` and returns its metadata."""
+    if sparse.issparse(X):
+        for part in ("data", "indices", "indptr"):
+            np.save(path.with_name(f"{path.name}.{part}.npy"), getattr(X, part))
+        return {"format": "csr", "shape": list(X.shape)}
+    np.save(path.with_name(f"{path.name}.npy"), X)
+    return {"format": "dense", "shape": list(X.shape)}
+
+
+def load_matrix(path: Path, meta: dict, mmap_mode: str | None = "r"):
+    """Re-opens a matrix written by `save_matrix`, memory-mapped by default."""
+    if meta["format"] == "csr":
+        data, indices, indptr = (
+            np.load(path.with_name(f"{path.name}.{part}.npy"), mmap_mode=mmap_mode)
+            for part in ("data", "indices", "indptr")
+        )
+        return sparse.csr_matrix((data, indices, indptr), shape=tuple(meta["shape"]), copy=False)
+    return np.load(path.with_name(f"{path.name}.npy"), mmap_mode=mmap_mode)
+
+
+class PreprocessedFold:
+    """
+    Transformed matrices of one training split.
+
+    Attributes:
+        X_train, X_val: float32 CSR or dense matrices (`X_val` is None for the full refit).
+        y_train, y_val (np.ndarray): int8 labels.
+        train_index, val_index (np.ndarray): Row positions in the frame the folds came from.
+        preprocessor: The preprocessor fitted on this split's training rows; folds re-opened
+            from disk keep only the full refit's.
+    """
+
+    def __init__(self, X_train, y_train, X_val, y_val, train_index, val_index, preprocessor=None):
+        self.X_train = X_train
+        self.y_train = y_train
+        self.X_val = X_val
+        self.y_val = y_val
+        self.train_index = train_index
+        self.val_index = val_index
+        self.preprocessor = preprocessor
+
+
+def fit_fold(preprocessor, X: pd.DataFrame, y: np.ndarray, train_index, val_index=None):
+    fitted = clone(preprocessor).fit(X.iloc[train_index], y[train_index])
+    X_train = to_float32(fitted.transform(X.iloc[train_index]))
+    X_val = None if val_index is None else to_float32(fitted.transform(X.iloc[val_index]))
+    y_val = None if val_index is None else y[val_index]
+    return PreprocessedFold(
+        X_train, y[train_index], X_val, y_val, train_index, val_index, preprocessor=fitted
+    )
+
+
+class PreprocessedFolds:
+    """
+    Preprocessing fitted once per CV fold, shared by every model and trial on those folds.
+
+    Each fold's preprocessor is fitted on its training rows and both sides are transformed
+    once into float32 matrices (CSR when the transformer output is sparse). `full` holds the
+    same for every row, for the final refit. With `cache_dir` the matrices are written as .npy
+    files under a key derived from the data, labels, preprocessor and splitter and re-opened
+    memory-mapped, so later runs skip preprocessing and parallel trial workers share pages
+    instead of copies; without it they stay in memory.
+
+    Attributes:
+        folds (list[PreprocessedFold]): One entry per CV split.
+        full (PreprocessedFold): Every row as training data, no validation side.
+        feature_names_out (list[str]): Column names of the transformed matrices.
+        key (str): Content hash identifying these matrices.
+    """
+
+    def __init__(
+        self,
+        preprocessor,
+        X: pd.DataFrame,
+        y,
+        cv,
+        cache_dir: Path | None = TRAINING_CACHE_DIR,
+        n_jobs: int = 1,
+    ):
+        y = np.asarray(y, dtype=np.int8)
+        self.key = joblib.hash(
+            [CACHE_FORMAT_VERSION, X, y, clone(preprocessor), repr(cv)], hash_name="sha1"
+        )
+        self.cache_path = None if cache_dir is None else cache_dir / self.key
+        if self.cache_path is not None and (self.cache_path / "meta.json").exists():
+            self._load()
+            logger.info(f"Reusing preprocessed folds from {self.cache_path}")
+            return
+
+        start = time.perf_counter()
+        splits = [(train, val) for train, val in cv.split(X, y)]
+        splits.append((np.arange(len(X)), None))
+        fitted = joblib.Parallel(n_jobs=n_jobs)(
+            joblib.delayed(fit_fold)(preprocessor, X, y, train, val) for train, val in splits
+        )
+        self.folds, self.full = fitted[:-1], fitted[-1]
+        self.feature_names_out = list(self.full.preprocessor.get_feature_names_out())
+        logger.info(
+            f"Preprocessed {len(self.folds)} folds + full refit in "
+            f"{time.perf_counter() - start:.2f}s"
+        )
+        if self.cache_path is not None:
+            self._save()
+
+    def __len__(self) -> int:
+        return len(self.folds)
+
+    def __iter__(self):
+        return iter(self.folds)
+
+    def _save(self) -> None:
+        tmp_path = self.cache_path.with_name(f"{self.key}.tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        meta = {"feature_names_out": self.feature_names_out, "folds": []}
+        for i, fold in enumerate([*self.folds, self.full]):
+            entry = {"X_train": save_matrix(fold.X_train, tmp_path / f"fold{i}_X_train")}
+            np.save(tmp_path / f"fold{i}_y_train.npy", fold.y_train)
+            np.save(tmp_path / f"fold{i}_train_index.npy", fold.train_index)
+            if fold.X_val is not None:
+                entry["X_val"] = save_matrix(fold.X_val, tmp_path / f"fold{i}_X_val")
+                np.save(tmp_path / f"fold{i}_y_val.npy", fold.y_val)
+                np.save(tmp_path / f"fold{i}_val_index.npy", fold.val_index)
+            meta["folds"].append(entry)
+        joblib.dump(self.full.preprocessor, tmp_path / "full_preprocessor.joblib")
+        # meta.json marks a complete cache, so it is written last.
+        (tmp_path / "meta.json").write_text(json.dumps(meta))
+        shutil.rmtree(self.cache_path, ignore_errors=True)
+        os.replace(tmp_path, self.cache_path)
+        self._load()
+        logger.info(f"Cached preprocessed folds in {self.cache_path}")
+
+    def _load(self) -> None:
+        meta = json.loads((self.cache_path / "meta.json").read_text())
+        self.feature_names_out = meta["feature_names_out"]
+        folds = []
+        for i, entry in enumerate(meta["folds"]):
+            prefix = self.cache_path / f"fold{i}"
+            fold = PreprocessedFold(
+                load_matrix(prefix.with_name(f"fold{i}_X_train"), entry["X_train"]),
+                np.load(prefix.with_name(f"fold{i}_y_train.npy")),
+                None,
+                None,
+                np.load(prefix.with_name(f"fold{i}_train_index.npy")),
+                None,
+            )
+            if "X_val" in entry:
+                fold.X_val = load_matrix(prefix.with_name(f"fold{i}_X_val"), entry["X_val"])
+                fold.y_val = np.load(prefix.with_name(f"fold{i}_y_val.npy"))
+                fold.val_index = np.load(prefix.with_name(f"fold{i}_val_index.npy"))
+            folds.append(fold)
+        folds[-1].preprocessor = joblib.load(self.cache_path / "full_preprocessor.joblib")
+        self.folds, self.full = folds[:-1], folds[-1]
@@ -1,29 +1,490 @@
 from pathlib import Path
+import time
 
+import joblib
 from loguru import logger
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from tqdm import tqdm
 import typer
 
-from bank_fraud.config import MODELS_DIR, PROCESSED_DATA_DIR
+from bank_fraud.config import (
+    BEST_AUCPR_MODEL,
+    BEST_PRECISION_MODEL,
+    FEATURE_SCHEMA,
+    GATE_A_BLOCK_THRESHOLD,
+    GATE_B_DAILY_QUEUE_SIZE,
+    GATE_B_REVIEW_THRESHOLD,
+    PROCESSED_DATA_DIR,
+    SELECTED_FEATURES_DATASET,
+)
+from bank_fraud.modeling.contributions import (
+    grouping_matrix,
+    is_passthrough,
+    shap_contributions,
+    source_features,
+    top_reasons,
+)
+from bank_fraud.modeling.fused import FusedPreprocessor
+from bank_fraud.utils.feature_schema import frame_dtypes, load_feature_schema
+from bank_fraud.utils.parquet_chunks import parquet_dtypes
 
 app = typer.Typer()
 
+# Rows pushed through the preprocessor and booster per call. Large enough to amortise the
+# per-call overhead of ColumnTransformer and XGBoost, small enough to keep the transformed
+# block in cache-friendly territory.
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Identifier columns carried through to the predictions file when present in the input.
+ID_COLUMNS = ["profile_id", "account_no"]
+
+DECISION_BLOCK = "BLOCK"
+DECISION_REVIEW = "REVIEW"
+DECISION_PASS = "PASS"
+
+
+def load_model(model_path: Path):
+    """Loads a fitted preprocessor + classifier pipeline saved with joblib."""
+    start = time.perf_counter()
+    model = joblib.load(model_path)
+    logger.info(f"Loaded model from {model_path} in {time.perf_counter() - start:.2f}s")
+    return model
+
+
+def split_pipeline(model):
+    """Returns the (preprocessor, classifier) steps of a fitted pipeline."""
+    return model.named_steps["preprocessor"], model.named_steps["classifier"]
+
+
+def table_columns(path: Path) -> list[str]:
+    """Column names of a parquet or CSV table without reading its rows."""
+    if path.suffix == ".parquet":
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def table_dtypes(path: Path, sample_rows: int = 1_000) -> dict[str, str]:
+    """Pandas dtype names of a parquet table (from its schema) or of a CSV's first rows."""
+    if path.suffix == ".parquet" or path.is_dir():
+        return parquet_dtypes(path)
+    return frame_dtypes(pd.read_csv(path, nrows=sample_rows))
+
+
+def read_table(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """Reads a parquet or CSV table, restricted to `columns` when given."""
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def write_table(df: pd.DataFrame, path: Path) -> None:
+    """Writes a parquet or CSV table depending on the file suffix."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def predict_proba_transformed(classifier, X_transformed) -> np.ndarray:
+    """Fraud probabilities for an already-transformed NumPy/CSR block."""
+    return classifier.predict_proba(X_transformed)[:, 1].astype(np.float32)
+
+
+def apply_gates(
+    block_proba: np.ndarray,
+    review_proba: np.ndarray,
+    block_threshold: float = GATE_A_BLOCK_THRESHOLD,
+    review_threshold: float = GATE_B_REVIEW_THRESHOLD,
+    review_queue_size: int = 0,
+) -> pd.DataFrame:
+    """
+    Applies the two-gate decision policy to a batch of scores.
+
+    Gate A blocks accounts whose precision-model score reaches `block_threshold`. Gate B
+    queues the remaining accounts whose AUC-PR-model score reaches `review_threshold`, or,
+    with `review_queue_size` > 0, the `review_queue_size` highest-scoring remaining accounts
+    (notebook 5.0's daily top-k queue, with the batch taken as one day).
+    """
+    gate_a = block_proba >= block_threshold
+    if review_queue_size > 0:
+        remaining = np.flatnonzero(~gate_a)
+        ranked = remaining[np.argsort(-review_proba[remaining], kind="stable")]
+        gate_b = np.zeros(len(review_proba), dtype=bool)
+        gate_b[ranked[:review_queue_size]] = True
+    else:
+        gate_b = ~gate_a & (review_proba >= review_threshold)
+    decision = np.where(gate_a, DECISION_BLOCK, np.where(gate_b, DECISION_REVIEW, DECISION_PASS))
+    return pd.DataFrame(
+        {
+            "block_proba": block_proba,
+            "review_proba": review_proba,
+            "gate_a_block": gate_a,
+            "gate_b_review": gate_b,
+            "decision": decision,
+        }
+    )
+
+
+class BatchScorer:
+    """
+    Scores account feature tables in fixed-size chunks with one or two fitted pipelines.
+
+    The pipelines are split into their preprocessor and classifier steps so that every chunk
+    is transformed into a single NumPy/CSR block and scored with one `predict_proba` call per
+    model. When Gate A and Gate B share the same pipeline the transform is done only once.
+    With `fused=True` the preprocessors are replaced by their `FusedPreprocessor` form, which
+    writes straight into a float32 block (CSR when the fitted preprocessor outputs CSR).
+
+    With `reason_codes=N` the decisions also carry the N input columns contributing most
+    towards fraud for each account whose Gate B score reaches the review threshold. These
+    come from the review booster's native SHAP contributions on the already-transformed
+    chunk, restricted to those rows, with one-hot contributions summed back into their
+    categorical column. Every other row gets missing reasons.
+    """
+
+    def __init__(
+        self,
+        review_model,
+        block_model=None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        fused: bool = False,
+        reason_codes: int = 0,
+    ):
+        self.review_preprocessor, self.review_classifier = split_pipeline(review_model)
+        self.shared = block_model is None or block_model is review_model
+        if self.shared:
+            self.block_preprocessor, self.block_classifier = (
+                self.review_preprocessor,
+                self.review_classifier,
+            )
+        else:
+            self.block_preprocessor, self.block_classifier = split_pipeline(block_model)
+        self.chunk_size = chunk_size
+        self.fused = fused
+        self.review_transform = self._make_transform(self.review_preprocessor)
+        self.block_transform = (
+            self.review_transform if self.shared else self._make_transform(self.block_preprocessor)
+        )
+        self.feature_names = list(
+            dict.fromkeys(
+                list(self.review_preprocessor.feature_names_in_)
+                + list(self.block_preprocessor.feature_names_in_)
+            )
+        )
+        self.reason_codes = reason_codes
+        if reason_codes > 0:
+            self.reason_grouping, self.reason_sources = grouping_matrix(
+                source_features(self.review_preprocessor)
+            )
+
+    def _make_transform(self, preprocessor):
+        if self.fused:
+            return FusedPreprocessor(preprocessor).transform
+        return lambda chunk: preprocessor.transform(chunk[preprocessor.feature_names_in_])
+
+    def score_chunk(self, chunk: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """Returns (block_proba, review_proba) for one chunk of feature rows."""
+        block_proba, review_proba, _ = self._score_chunk(chunk)
+        return block_proba, review_proba
+
+    def _score_chunk(self, chunk: pd.DataFrame):
+        """(block_proba, review_proba, transformed Gate B block) for one chunk."""
+        X_review = self.review_transform(chunk)
+        review_proba = predict_proba_transformed(self.review_classifier, X_review)
+        if self.shared:
+            return review_proba, review_proba, X_review
+
+        X_block = self.block_transform(chunk)
+        block_proba = predict_proba_transformed(self.block_classifier, X_block)
+        return block_proba, review_proba, X_review
+
+    def explain_chunk(
+        self,
+        X_review,
+        review_proba: np.ndarray,
+        review_threshold: float = GATE_B_REVIEW_THRESHOLD,
+    ) -> pd.DataFrame:
+        """
+        Reason-code columns for one transformed chunk: contributions are computed only for
+        the rows whose `review_proba` reaches `review_threshold`; the rest stay missing.
+        """
+        flagged = np.flatnonzero(review_proba >= review_threshold)
+        if len(flagged):
+            values, _ = shap_contributions(self.review_classifier, X_review[flagged])
+            values = values @ self.reason_grouping
+        else:
+            values = np.zeros((0, len(self.reason_sources)), dtype=np.float32)
+        reasons = top_reasons(values, self.reason_sources, self.reason_codes, index=flagged)
+        return reasons.reindex(range(len(review_proba)))
+
+    def decide_chunk(
+        self,
+        chunk: pd.DataFrame,
+        block_threshold: float = GATE_A_BLOCK_THRESHOLD,
+        review_threshold: float = GATE_B_REVIEW_THRESHOLD,
+    ) -> pd.DataFrame:
+        """Scores one chunk and returns its identifiers, scores and gate decisions."""
+        block_proba, review_proba, X_review = self._score_chunk(chunk)
+        scores = apply_gates(block_proba, review_proba, block_threshold, review_threshold)
+        ids = chunk[[c for c in ID_COLUMNS if c in chunk.columns]].reset_index(drop=True)
+        if self.reason_codes > 0:
+            reasons = self.explain_chunk(X_review, review_proba, review_threshold)
+            return pd.concat([ids, scores, reasons], axis=1)
+        return pd.concat([ids, scores], axis=1)
+
+    def explain_rows(self, df: pd.DataFrame, rows: np.ndarray) -> pd.DataFrame:
+        """Reason-code columns for every row of `df`, computed only for `rows`."""
+        reasons = []
+        for lo in range(0, len(rows), self.chunk_size):
+            chunk_rows = rows[lo : lo + self.chunk_size]
+            X_review = self.review_transform(df.iloc[chunk_rows])
+            reasons.append(
+                self.explain_chunk(X_review, np.ones(len(chunk_rows)), review_threshold=0.0)
+            )
+        if not reasons:
+            return self.explain_chunk(None, np.zeros(0)).reindex(range(len(df)))
+        reasons = pd.concat(reasons, ignore_index=True)
+        reasons.index = rows
+        return reasons.reindex(range(len(df)))
+
+    def score_frame(
+        self,
+        df: pd.DataFrame,
+        block_threshold: float = GATE_A_BLOCK_THRESHOLD,
+        review_threshold: float = GATE_B_REVIEW_THRESHOLD,
+        review_queue_size: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Scores a full feature table chunk by chunk and returns scores plus gate decisions.
+
+        With `review_queue_size` > 0 Gate B is the top-k queue of `apply_gates` and reason
+        codes are computed for the queued accounts once the whole table has been ranked.
+        """
+        n_rows = len(df)
+        block_proba = np.empty(n_rows, dtype=np.float32)
+        review_proba = np.empty(n_rows, dtype=np.float32)
+
+        reasons = []
+        start = time.perf_counter()
+        starts = range(0, n_rows, self.chunk_size)
+        for lo in tqdm(starts, total=len(starts), desc="Scoring chunks"):
+            hi = min(lo + self.chunk_size, n_rows)
+            block_proba[lo:hi], review_proba[lo:hi], X_review = self._score_chunk(df.iloc[lo:hi])
+            if self.reason_codes > 0 and review_queue_size <= 0:
+                reasons.append(self.explain_chunk(X_review, review_proba[lo:hi], review_threshold))
+        log_throughput(n_rows, time.perf_counter() - start)
+
+        scores = apply_gates(
+            block_proba, review_proba, block_threshold, review_threshold, review_queue_size
+        )
+        if self.reason_codes > 0 and review_queue_size > 0:
+            reasons = [self.explain_rows(df, np.flatnonzero(scores["gate_b_review"]))]
+        ids = df[[c for c in ID_COLUMNS if c in df.columns]].reset_index(drop=True)
+        if reasons:
+            return pd.concat([ids, scores, pd.concat(reasons, ignore_index=True)], axis=1)
+        return pd.concat([ids, scores], axis=1)
+
+    def score_parquet_stream(
+        self,
+        input_path: Path,
+        output_path: Path,
+        block_threshold: float = GATE_A_BLOCK_THRESHOLD,
+        review_threshold: float = GATE_B_REVIEW_THRESHOLD,
+    ) -> int:
+        """
+        Streams parquet input to a parquet predictions file in bounded memory.
+
+        `input_path` may be a single parquet file or a directory of parquet files. Row groups
+        are read `chunk_size` rows at a time, restricted to the identifier and model columns,
+        scored, and appended to a single `ParquetWriter`, so at most one batch and its
+        transformed block are held in memory regardless of the input size.
+
+        Returns:
+            int: The number of rows scored.
+        """
+        files = sorted(input_path.glob("*.parquet")) if input_path.is_dir() else [input_path]
+        if not files:
+            raise FileNotFoundError(f"No parquet files found under {input_path}")
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        writer = None
+        n_rows = 0
+        start = time.perf_counter()
+        try:
+            for file_path in files:
+                parquet_file = pq.ParquetFile(file_path)
+                available = set(parquet_file.schema_arrow.names)
+                columns = [c for c in ID_COLUMNS + self.feature_names if c in available]
+                batches = parquet_file.iter_batches(batch_size=self.chunk_size, columns=columns)
+                n_batches = -(-parquet_file.metadata.num_rows // self.chunk_size)
+                for batch in tqdm(batches, total=n_batches, desc=f"Streaming {file_path.name}"):
+                    decisions = self.decide_chunk(
+                        batch.to_pandas(), block_threshold, review_threshold
+                    )
+                    table = pa.Table.from_pandas(decisions, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_path, table.schema)
+                    writer.write_table(table)
+                    n_rows += len(decisions)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        log_throughput(n_rows, time.perf_counter() - start)
+        return n_rows
+
+
+def log_throughput(n_rows: int, elapsed: float) -> None:
+    rate = n_rows / elapsed if elapsed > 0 else float("inf")
+    logger.info(f"Scored {n_rows:,} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+
+
+def check_feature_schema(
+    scorer: BatchScorer, schema_path: Path = FEATURE_SCHEMA, features_path: Path | None = None
+) -> None:
+    """
+    Start-up check of the scorer, and of `features_path` when given, against the feature
+    schema. Only dtype metadata is read, so drifted inputs fail before any row is scored.
+    Skipped with a warning when no schema has been built.
+
+    Raises:
+        ValueError: If the model's numeric/categorical/passthrough split disagrees with the
+            schema or the input's dtypes do not match it.
+    """
+    schema = load_feature_schema(schema_path)
+    if schema is None:
+        return
+    problems = [f"{c}: not in the feature schema" for c in scorer.feature_names if c not in schema]
+    numerical, categorical, passthrough = schema.model_feature_split(scorer.feature_names)
+    preprocessor = scorer.review_preprocessor
+    fitted = {"passthrough": set()}
+    for name, transformer, columns in preprocessor.transformers_:
+        if len(columns) and isinstance(columns[0], (int, np.integer)):
+            columns = [preprocessor.feature_names_in_[i] for i in columns]
+        if transformer == "drop":
+            continue
+        if is_passthrough(transformer):
+            fitted["passthrough"] |= set(columns)
+        else:
+            fitted[name] = set(columns)
+    for name, expected in (("num", numerical), ("cat", categorical), ("passthrough", passthrough)):
+        if name in fitted and fitted[name] != set(expected):
+            drifted = sorted(fitted[name] ^ set(expected))
+            problems.append(f"'{name}' transformer columns differ from the schema: {drifted}")
+    if features_path is not None:
+        problems += schema.dtype_mismatches(table_dtypes(features_path), scorer.feature_names)
+    if problems:
+        raise ValueError("Feature schema check failed:\n  " + "\n  ".join(problems))
+    logger.info(f"{len(scorer.feature_names)} model features match the feature schema.")
+
+
+def load_scorer(
+    model_path: Path,
+    block_model_path: Path | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fused: bool = False,
+    reason_codes: int = 0,
+    shared_gate_model: bool = False,
+) -> BatchScorer:
+    """
+    Builds a `BatchScorer` from saved pipelines.
+
+    Gate A uses `block_model_path` when given, otherwise the precision-tuned model.
+    Auto-blocking with the recall-oriented Gate B model is only allowed with
+    `shared_gate_model=True`.
+
+    Raises:
+        FileNotFoundError: If no Gate A model is given or saved and `shared_gate_model` is
+            not set.
+    """
+    if block_model_path is None and not shared_gate_model:
+        if not BEST_PRECISION_MODEL.exists():
+            raise FileNotFoundError(
+                f"No Gate A model at {BEST_PRECISION_MODEL}. Pass --block-model-path, or "
+                "--shared-gate-model to auto-block with the Gate B model."
+            )
+        block_model_path = BEST_PRECISION_MODEL
+    review_model = load_model(model_path)
+    if block_model_path is None or block_model_path == model_path:
+        logger.warning("Using the Gate B model for both gates.")
+        block_model = None
+    else:
+        block_model = load_model(block_model_path)
+    return BatchScorer(
+        review_model, block_model, chunk_size=chunk_size, fused=fused, reason_codes=reason_codes
+    )
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    features_path: Path = PROCESSED_DATA_DIR / "test_features.csv",
-    model_path: Path = MODELS_DIR / "model.pkl",
-    predictions_path: Path = PROCESSED_DATA_DIR / "test_predictions.csv",
-    # -----------------------------------------
+    features_path: Path = SELECTED_FEATURES_DATASET,
+    model_path: Path = BEST_AUCPR_MODEL,
+    block_model_path: Path | None = None,
+    predictions_path: Path = PROCESSED_DATA_DIR / "predictions.parquet",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    block_threshold: float = GATE_A_BLOCK_THRESHOLD,
+    review_threshold: float = typer.Option(
+        GATE_B_REVIEW_THRESHOLD, help="Gate B score cut, used when --review-queue-size is 0."
+    ),
+    review_queue_size: int = typer.Option(
+        GATE_B_DAILY_QUEUE_SIZE,
+        help="Gate B queue: the top-k accounts Gate A did not block, treating the input as "
+        "one day; 0 queues by --review-threshold instead.",
+    ),
+    schema_path: Path = FEATURE_SCHEMA,
+    stream: bool = typer.Option(
+        False, help="Stream parquet row groups straight to a parquet writer in bounded memory."
+    ),
+    fused: bool = typer.Option(
+        False, help="Transform with the fused NumPy preprocessor instead of sklearn."
+    ),
+    reason_codes: int = typer.Option(
+        0, help="Top reason codes per account in the review queue; 0 for none."
+    ),
+    shared_gate_model: bool = typer.Option(
+        False, help="Auto-block with the Gate B model when no Gate A model is available."
+    ),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Performing inference for model...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Inference complete.")
-    # -----------------------------------------
+    logger.info("Performing batch inference...")
+    scorer = load_scorer(
+        model_path,
+        block_model_path,
+        chunk_size=chunk_size,
+        fused=fused,
+        reason_codes=reason_codes,
+        shared_gate_model=shared_gate_model,
+    )
+    check_feature_schema(scorer, schema_path, features_path)
+
+    if stream:
+        if predictions_path.suffix != ".parquet":
+            raise typer.BadParameter("Streaming mode writes parquet predictions only.")
+        if review_queue_size > 0:
+            raise typer.BadParameter(
+                "Streaming scores chunk by chunk and cannot rank the whole input; pass "
+                "--review-queue-size 0 to queue by --review-threshold."
+            )
+        n_rows = scorer.score_parquet_stream(
+            features_path, predictions_path, block_threshold, review_threshold
+        )
+        logger.success(f"Streamed {n_rows:,} rows. Predictions saved to {predictions_path}")
+        return
+
+    available = set(table_columns(features_path))
+    columns = [c for c in ID_COLUMNS + scorer.feature_names if c in available]
+    df = read_table(features_path, columns=columns)
+    logger.info(f"Loaded {len(df):,} rows from {features_path}")
+
+    predictions = scorer.score_frame(df, block_threshold, review_threshold, review_queue_size)
+    write_table(predictions, predictions_path)
+
+    counts = predictions["decision"].value_counts().to_dict()
+    logger.info(f"Decisions: {counts}")
+    logger.success(f"Inference complete. Predictions saved to {predictions_path}")
 
 
 if __name__ == "__main__":
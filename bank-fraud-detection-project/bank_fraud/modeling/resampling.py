@@ -0,0 +1,178 @@
+import math
+
+import numpy as np
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.utils import check_random_state
+
+# Rows of the minority distance block computed at once in `minority_neighbors`.
+DEFAULT_CHUNK_ROWS = 2048
+
+
+def class_counts(y) -> tuple[int, int, np.ndarray, np.ndarray]:
+    """(minority label, majority label, minority row positions, majority row positions)."""
+    labels, counts = np.unique(y, return_counts=True)
+    minority, majority = labels[np.argmin(counts)], labels[np.argmax(counts)]
+    return minority, majority, np.flatnonzero(y == minority), np.flatnonzero(y == majority)
+
+
+class WeightedRandomOverSampler:
+    """
+    `RandomOverSampler` as sample weights.
+
+    Draws the same bootstrap of minority rows as imblearn's sampler with the same
+    `random_state`, but returns each row's number of copies as its weight instead of
+    stacking the copies onto the matrix. The training matrix is returned as is.
+    """
+
+    def __init__(self, random_state=None):
+        self.random_state = random_state
+
+    def resample(self, X, y):
+        """Returns (X, y, sample_weight)."""
+        _, _, minority_rows, majority_rows = class_counts(y)
+        random_state = check_random_state(self.random_state)
+        bootstrap = random_state.choice(
+            minority_rows, size=len(majority_rows) - len(minority_rows), replace=True
+        )
+        weights = 1.0 + np.bincount(bootstrap, minlength=len(y))
+        return X, y, weights
+
+
+class IndexRandomUnderSampler:
+    """
+    `RandomUnderSampler` as a row subset: the same draw as imblearn's sampler with the same
+    `random_state`, in the same row order, so only the kept rows are copied.
+    """
+
+    def __init__(self, random_state=None):
+        self.random_state = random_state
+
+    def resample(self, X, y):
+        """Returns (X[rows], y[rows], None)."""
+        _, majority, minority_rows, majority_rows = class_counts(y)
+        random_state = check_random_state(self.random_state)
+        rows = []
+        for label in np.unique(y):
+            if label == majority:
+                keep = random_state.choice(
+                    range(len(majority_rows)), size=len(minority_rows), replace=False
+                )
+                rows.append(majority_rows[keep])
+            else:
+                rows.append(np.flatnonzero(y == label))
+        rows = np.concatenate(rows)
+        return X[rows], y[rows], None
+
+
+def minority_neighbors(
+    X_minority: np.ndarray, k: int, chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> np.ndarray:
+    """
+    Each minority row's `k` nearest other minority rows by Euclidean distance, nearest
+    first.
+
+    Distances come from one BLAS product per block of `chunk_rows` rows against the whole
+    minority class (|a|^2 - 2ab + |b|^2), so memory stays at chunk_rows x n_minority
+    rather than n_minority^2, and the majority class is never touched.
+    """
+    n = len(X_minority)
+    if n <= k:
+        raise ValueError(f"SMOTE needs more than k_neighbors={k} minority rows; got {n}.")
+    X_minority = np.asarray(X_minority, dtype=np.float64)
+    squared_norms = np.einsum("ij,ij->i", X_minority, X_minority)
+    neighbors = np.empty((n, k), dtype=np.intp)
+    for start in range(0, n, chunk_rows):
+        stop = min(start + chunk_rows, n)
+        distances = X_minority[start:stop] @ X_minority.T
+        distances *= -2
+        distances += squared_norms[start:stop, None]
+        distances += squared_norms[None, :]
+        distances[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1, kind="stable")
+        neighbors[start:stop] = np.take_along_axis(nearest, order, axis=1)
+    return neighbors
+
+
+class WeightedSMOTE:
+    """
+    SMOTE that generates a fraction of the synthetic rows and weights them up.
+
+    Full SMOTE adds (n_majority - n_minority) interpolated rows, roughly doubling the
+    training matrix when the classes are as skewed as the fraud labels. This generates
+    `synthetic_ratio` x n_minority rows instead (never more than SMOTE would) and gives each
+    the weight that makes their total equal SMOTE's synthetic mass, so the class balance the
+    model sees is the same. Interpolation follows SMOTE: a random minority row, one of its
+    `k_neighbors` nearest minority neighbours, and a uniform gap between them.
+    """
+
+    def __init__(
+        self,
+        k_neighbors: int = 5,
+        synthetic_ratio: float = 4.0,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        random_state=None,
+    ):
+        self.k_neighbors = k_neighbors
+        self.synthetic_ratio = synthetic_ratio
+        self.chunk_rows = chunk_rows
+        self.random_state = random_state
+
+    def resample(self, X, y):
+        """Returns (X with the synthetic rows appended, y, sample_weight)."""
+        minority, _, minority_rows, majority_rows = class_counts(y)
+        n_needed = len(majority_rows) - len(minority_rows)
+        n_synthetic = min(n_needed, math.ceil(self.synthetic_ratio * len(minority_rows)))
+        if n_synthetic == 0:
+            return X, y, None
+
+        X_minority = X[minority_rows]
+        if sparse.issparse(X_minority):
+            X_minority = X_minority.toarray()
+        X_minority = np.asarray(X_minority, dtype=np.float32)
+        neighbors = minority_neighbors(X_minority, self.k_neighbors, self.chunk_rows)
+
+        rng = np.random.default_rng(self.random_state)
+        base = rng.integers(len(minority_rows), size=n_synthetic)
+        partner = neighbors[base, rng.integers(self.k_neighbors, size=n_synthetic)]
+        gaps = rng.random(n_synthetic, dtype=np.float32)[:, None]
+        synthetic = X_minority[base]
+        synthetic += gaps * (X_minority[partner] - synthetic)
+
+        if sparse.issparse(X):
+            X_resampled = sparse.vstack([X, sparse.csr_matrix(synthetic)], format="csr")
+        else:
+            X_resampled = np.concatenate([X, synthetic.astype(X.dtype, copy=False)])
+        y_resampled = np.concatenate([y, np.full(n_synthetic, minority, dtype=y.dtype)])
+        weights = np.ones(len(y_resampled))
+        weights[len(y) :] = n_needed / n_synthetic
+        return X_resampled, y_resampled, weights
+
+
+def weighted_resamplers() -> dict:
+    """Memory-efficient stand-ins for notebook 5.0's resamplers, under the same names."""
+    return {
+        "RandomOverSampler": WeightedRandomOverSampler(random_state=42),
+        "SMOTE": WeightedSMOTE(random_state=42),
+        "RandomUnderSampler": IndexRandomUnderSampler(random_state=42),
+    }
+
+
+def fit_weighted(model, X, y, sample_weight=None):
+    """
+    Fits a clone of `model` with `sample_weight`.
+
+    `class_weight="balanced"` counts rows, not weights, so with weights it would balance
+    the classes a second time; it is applied to the weighted class totals instead, which is
+    what the estimator computes on the equivalent materialized (duplicated) rows.
+    """
+    model = clone(model)
+    if sample_weight is None:
+        return model.fit(X, y)
+    if getattr(model, "class_weight", None) == "balanced":
+        labels, inverse = np.unique(y, return_inverse=True)
+        totals = np.bincount(inverse, weights=sample_weight)
+        sample_weight = sample_weight * (sample_weight.sum() / (len(labels) * totals))[inverse]
+        model.set_params(class_weight=None)
+    return model.fit(X, y, sample_weight=sample_weight)
@@ -0,0 +1,379 @@
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import queue
+import threading
+import time
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import typer
+
+from bank_fraud.config import (
+    BEST_AUCPR_MODEL,
+    FEATURE_SCHEMA,
+    GATE_A_BLOCK_THRESHOLD,
+    GATE_B_REVIEW_THRESHOLD,
+    SELECTED_FEATURES_DATASET,
+)
+from bank_fraud.modeling.fused import FusedPreprocessor
+from bank_fraud.modeling.predict import (
+    DECISION_BLOCK,
+    DECISION_PASS,
+    DECISION_REVIEW,
+    ID_COLUMNS,
+    check_feature_schema,
+    load_scorer,
+)
+
+app = typer.Typer()
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Requests arriving within this window of the first queued request share one predict_proba call.
+DEFAULT_MAX_WAIT_MS = 2.0
+DEFAULT_MAX_BATCH_ROWS = 512
+
+# JSON scalars accepted in categorical fields; anything else is rejected with its request.
+CATEGORY_VALUE_TYPES = (str, int, float, bool)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests into a single model call.
+
+    A background thread takes the first queued request, keeps collecting requests for up to
+    `max_wait_ms` (or until `max_batch_rows` rows are queued), scores them together with one
+    `predict_proba` call per model and resolves each request's `Future` with its own slice of
+    the returned score arrays. If a coalesced batch fails, its requests are re-scored one
+    by one so an error only reaches the request that caused it.
+    """
+
+    def __init__(
+        self,
+        score_fn,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        max_batch_rows: int = DEFAULT_MAX_BATCH_ROWS,
+    ):
+        self.score_fn = score_fn
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_rows = max_batch_rows
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame: pd.DataFrame) -> Future:
+        future: Future = Future()
+        self._queue.put((frame, future))
+        return future
+
+    def _collect(self) -> list[tuple[pd.DataFrame, Future]]:
+        pending = [self._queue.get()]
+        n_rows = len(pending[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch_rows:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            pending.append(item)
+            n_rows += len(item[0])
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            pending = self._collect()
+            frames = [frame for frame, _ in pending]
+            try:
+                scored = self.score_fn(pd.concat(frames, ignore_index=True))
+            except Exception:  # noqa: BLE001 - isolate the failing request(s) below
+                for frame, future in pending:
+                    self._score_one(frame, future)
+                continue
+            bounds = np.cumsum([0] + [len(frame) for frame in frames])
+            for (_, future), lo, hi in zip(pending, bounds[:-1], bounds[1:]):
+                future.set_result(tuple(array[lo:hi] for array in scored))
+
+    def _score_one(self, frame: pd.DataFrame, future: Future) -> None:
+        try:
+            future.set_result(self.score_fn(frame))
+        except Exception as exc:  # noqa: BLE001 - surface the error to this request only
+            future.set_exception(exc)
+
+
+class ScoringService:
+    """
+    Warm, in-process scoring for single accounts and micro-batches.
+
+    The pipelines, their input column order and the one-hot category maps are loaded once at
+    start-up; each request only builds a small frame and waits on the shared micro-batcher.
+    """
+
+    def __init__(
+        self,
+        scorer,
+        block_threshold: float = GATE_A_BLOCK_THRESHOLD,
+        review_threshold: float = GATE_B_REVIEW_THRESHOLD,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        max_batch_rows: int = DEFAULT_MAX_BATCH_ROWS,
+    ):
+        self.scorer = scorer
+        self.block_threshold = block_threshold
+        self.review_threshold = review_threshold
+        self.feature_names = scorer.feature_names
+        self.category_maps = FusedPreprocessor(scorer.review_preprocessor).category_maps
+        self.batcher = MicroBatcher(self._score, max_wait_ms, max_batch_rows)
+
+    def _score(self, frame: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        return self.scorer.score_chunk(frame)
+
+    def records_to_frame(self, records: list[dict]) -> pd.DataFrame:
+        """
+        Builds the model input frame column by column from request records.
+
+        Missing fields arrive as None: numeric columns become float NaN for the scaler and
+        categorical columns stay object dtype for the encoder. Building each column as one
+        array is several times cheaper than coercing a frame built with `from_records`.
+
+        Every value is validated here, before the frame reaches the shared micro-batcher, so
+        a malformed request fails on its own instead of inside a coalesced batch.
+
+        Raises:
+            TypeError: If `records` is not a list of JSON objects.
+            ValueError: If there are no records, a numeric field is not a number (or numeric
+                string) or null, or a categorical field is not a JSON scalar or null.
+        """
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise TypeError("Expected an account object or a list of account objects.")
+        if not records:
+            raise ValueError("No accounts to score.")
+        columns = {}
+        for col in self.feature_names:
+            values = [record.get(col) for record in records]
+            if col in self.category_maps:
+                invalid = [
+                    value
+                    for value in values
+                    if value is not None and not isinstance(value, CATEGORY_VALUE_TYPES)
+                ]
+                if invalid:
+                    raise ValueError(
+                        f"'{col}' must be a string, number or null; "
+                        f"got {type(invalid[0]).__name__}."
+                    )
+                columns[col] = np.array(values, dtype=object)
+                continue
+            try:
+                column = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                column = None
+            if column is None or column.ndim != 1:
+                raise ValueError(f"'{col}' must be a number or null.")
+            columns[col] = column
+        return pd.DataFrame(columns)
+
+    def unknown_categories(self, records: list[dict]) -> list[list[str]]:
+        """
+        Per record, the categorical columns whose value was not seen during training.
+
+        Missing values (absent, null or NaN) are not unseen categories: the encoder maps them
+        to its learned missing category or, without one, to all zeros like any other gap.
+        """
+        return [
+            [
+                col
+                for col, known in self.category_maps.items()
+                if not pd.isna(record.get(col)) and record.get(col) not in known
+            ]
+            for record in records
+        ]
+
+    def score_records(self, records: list[dict], timeout: float = 5.0) -> list[dict]:
+        """
+        Scores a list of account feature dicts and returns one result dict per account.
+
+        Gates are applied per record in plain Python: for the handful of rows in a request this
+        is cheaper than building the `apply_gates` DataFrame and converting it back to dicts.
+        """
+        frame = self.records_to_frame(records)
+        block_proba, review_proba = self.batcher.submit(frame).result(timeout=timeout)
+        results = []
+        for record, block, review, unknown in zip(
+            records, block_proba.tolist(), review_proba.tolist(), self.unknown_categories(records)
+        ):
+            gate_a = block >= self.block_threshold
+            gate_b = not gate_a and review >= self.review_threshold
+            decision = DECISION_BLOCK if gate_a else DECISION_REVIEW if gate_b else DECISION_PASS
+            result = {col: record[col] for col in ID_COLUMNS if col in record}
+            result.update(
+                block_proba=block,
+                review_proba=review,
+                gate_a_block=gate_a,
+                gate_b_review=gate_b,
+                decision=decision,
+                unknown_categories=unknown,
+            )
+            results.append(result)
+        return results
+
+
+def make_handler(service: ScoringService):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        # Keep-alive connections avoid a TCP handshake per request, and TCP_NODELAY stops
+        # Nagle's algorithm from holding the response body behind a delayed ACK (~40ms).
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _send_json(self, status: int, payload) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok", "features": len(service.feature_names)})
+            else:
+                self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/score":
+                self._send_json(404, {"error": f"Unknown path {self.path}"})
+                return
+            # Every failure gets a JSON response; an escaping exception would drop the
+            # keep-alive connection without one.
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                records = payload["accounts"] if isinstance(payload, dict) else payload
+                if isinstance(records, dict):
+                    records = [records]
+                results = service.score_records(records)
+            except (KeyError, ValueError, TypeError) as exc:
+                self._send_json(400, {"error": str(exc)})
+            except FutureTimeoutError:
+                self._send_json(503, {"error": "Scoring timed out; retry later."})
+            except Exception:  # noqa: BLE001 - report, log and keep serving
+                logger.exception("Scoring request failed")
+                self._send_json(500, {"error": "Internal scoring error."})
+            else:
+                self._send_json(200, {"results": results})
+
+        def log_message(self, format, *args):
+            # Per-request access logs would dominate latency at this request rate.
+            pass
+
+    return ScoringHandler
+
+
+@app.command()
+def serve(
+    model_path: Path = BEST_AUCPR_MODEL,
+    block_model_path: Path | None = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+    max_batch_rows: int = DEFAULT_MAX_BATCH_ROWS,
+    block_threshold: float = GATE_A_BLOCK_THRESHOLD,
+    review_threshold: float = GATE_B_REVIEW_THRESHOLD,
+    schema_path: Path = FEATURE_SCHEMA,
+    shared_gate_model: bool = typer.Option(
+        False, help="Auto-block with the Gate B model when no Gate A model is available."
+    ),
+):
+    """Runs the HTTP scoring service (POST /score, GET /health)."""
+    scorer = load_scorer(
+        model_path,
+        block_model_path,
+        chunk_size=max_batch_rows,
+        fused=True,
+        shared_gate_model=shared_gate_model,
+    )
+    check_feature_schema(scorer, schema_path)
+    service = ScoringService(
+        scorer, block_threshold, review_threshold, max_wait_ms, max_batch_rows
+    )
+    # Warm-up call so the first real request does not pay lazy initialisation costs.
+    service.score_records([{}])
+
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    logger.info(f"Scoring service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down scoring service.")
+    finally:
+        server.server_close()
+
+
+def _client_worker(
+    host: str, port: int, payloads: list[bytes], n_requests: int, latencies: list[float]
+) -> None:
+    conn = http.client.HTTPConnection(host, port)
+    headers = {"Content-Type": "application/json"}
+    for i in range(n_requests):
+        start = time.perf_counter()
+        conn.request("POST", "/score", body=payloads[i % len(payloads)], headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+@app.command()
+def benchmark(
+    features_path: Path = SELECTED_FEATURES_DATASET,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    concurrency: int = 8,
+    requests_per_client: int = 500,
+    accounts_per_request: int = 1,
+    sample_rows: int = 1_000,
+):
+    """Load-generates against a running service and reports p50/p95/p99 latency."""
+    parquet_file = pq.ParquetFile(features_path)
+    sample = next(parquet_file.iter_batches(batch_size=sample_rows)).to_pandas()
+    records = json.loads(sample.to_json(orient="records"))
+    payloads = [
+        json.dumps({"accounts": records[i : i + accounts_per_request]}).encode()
+        for i in range(0, len(records), accounts_per_request)
+    ]
+
+    latencies: list[float] = []
+    threads = [
+        threading.Thread(
+            target=_client_worker,
+            args=(host, port, payloads, requests_per_client, latencies),
+        )
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latency_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latency_ms, [50, 95, 99])
+    logger.info(
+        f"{len(latency_ms):,} requests x {accounts_per_request} account(s), "
+        f"concurrency={concurrency}: {len(latency_ms) / elapsed:,.0f} req/sec"
+    )
+    logger.success(
+        f"Latency p50={p50:.2f}ms p95={p95:.2f}ms p99={p99:.2f}ms max={latency_ms.max():.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,510 @@
+import json
+from pathlib import Path
+import time
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from bank_fraud.config import (
+    BEST_AUCPR_MODEL,
+    BEST_PRECISION_MODEL,
+    COST_SCENARIOS,
+    FEATURE_SCHEMA,
+    GATE_A_BLOCK_THRESHOLD,
+    GATE_B_REVIEW_THRESHOLD,
+    REPORTS_MODEL_EVAL_DIR,
+    SELECTED_FEATURES_DATASET,
+)
+from bank_fraud.modeling.predict import load_model
+from bank_fraud.modeling.train import load_training_data, split_holdout
+
+app = typer.Typer()
+
+# Days covered by the holdout, used to turn holdout counts into daily volumes.
+HOLDOUT_DAYS = 20
+
+# Daily queue sizes of notebook 5.0's Gate B top-k table.
+GATE_B_KS = [250, 500, 1000, 1500, 2000, 2500, 3500]
+
+GATE_A_RESULTS = REPORTS_MODEL_EVAL_DIR / "gate_a_simulation_results.csv"
+GATE_B_RESULTS = REPORTS_MODEL_EVAL_DIR / "gate_b_simulation_results.csv"
+GATE_A_SWEEP = REPORTS_MODEL_EVAL_DIR / "gate_a_threshold_sweep.csv"
+GATE_B_SWEEP = REPORTS_MODEL_EVAL_DIR / "gate_b_threshold_sweep.csv"
+POLICY_FRONTIER = REPORTS_MODEL_EVAL_DIR / "gate_policy_frontier.csv"
+POLICY_RECOMMENDATION = REPORTS_MODEL_EVAL_DIR / "gate_policy_recommendation.csv"
+
+
+class CostScenario:
+    """
+    Unit costs and analyst capacity for the gate simulations; the defaults are notebook
+    5.0's (₱).
+
+    Attributes:
+        name (str): Label carried into the sweep tables.
+        cost_fp_gate_a (float): Cost of one false auto-decline.
+        cost_fp_gate_b (float): Cost of reviewing one legitimate account.
+        cost_fn_gate_b (float): Loss from one fraud account that is not caught.
+        reviews_per_analyst_per_day (int): Queue items one analyst clears per day.
+        salary_per_analyst_month (float): Monthly cost of one analyst.
+        business_days_per_month (int): Working days the salary is spread over.
+    """
+
+    def __init__(
+        self,
+        name: str = "notebook_5.0",
+        cost_fp_gate_a: float = 150,
+        cost_fp_gate_b: float = 100,
+        cost_fn_gate_b: float = 8333,
+        reviews_per_analyst_per_day: int = 250,
+        salary_per_analyst_month: float = 40000,
+        business_days_per_month: int = 22,
+    ):
+        self.name = name
+        self.cost_fp_gate_a = cost_fp_gate_a
+        self.cost_fp_gate_b = cost_fp_gate_b
+        self.cost_fn_gate_b = cost_fn_gate_b
+        self.reviews_per_analyst_per_day = reviews_per_analyst_per_day
+        self.salary_per_analyst_month = salary_per_analyst_month
+        self.business_days_per_month = business_days_per_month
+
+    @property
+    def salary_per_analyst_day(self) -> float:
+        return self.salary_per_analyst_month / self.business_days_per_month
+
+
+def load_cost_scenarios(path: Path = COST_SCENARIOS) -> list[CostScenario]:
+    """Scenarios from a JSON list of CostScenario keyword arguments; the default if absent."""
+    if not path.exists():
+        logger.warning(f"No cost scenarios at {path}; using notebook 5.0's costs.")
+        return [CostScenario()]
+    return [CostScenario(**entry) for entry in json.loads(path.read_text())]
+
+
+class ThresholdCurve:
+    """
+    Confusion counts of `scores >= threshold` at every distinct score, from a single sort.
+
+    Scores are sorted once in descending order; cumulative sums of the labels along that
+    order give TP and FP for every prefix, and the last position of each run of tied
+    scores gives the counts at that score as a threshold. Any threshold then maps to its
+    counts with one binary search, so a sweep costs O(n log n) once plus O(log n) per
+    threshold instead of a confusion matrix per threshold.
+
+    Attributes:
+        thresholds (np.ndarray): Distinct scores, descending.
+        tp, fp (np.ndarray): Predicted-positive counts at each distinct score.
+        tp_by_rank (np.ndarray): TP among the top 1, 2, ... rows, in notebook 5.0's
+            `np.argsort(scores)[::-1]` order (for top-k queues).
+        positives, negatives (int): Class totals.
+    """
+
+    def __init__(self, y_true, scores):
+        y_true = np.asarray(y_true).astype(np.int64)
+        scores = np.asarray(scores, dtype=np.float64)
+        order = np.argsort(scores)[::-1]
+        sorted_scores = scores[order]
+        self.tp_by_rank = np.cumsum(y_true[order])
+        fp_by_rank = np.arange(1, len(order) + 1) - self.tp_by_rank
+        group_ends = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(order) - 1]
+        self.thresholds = sorted_scores[group_ends]
+        self.tp = self.tp_by_rank[group_ends]
+        self.fp = fp_by_rank[group_ends]
+        self.positives = int(self.tp_by_rank[-1])
+        self.negatives = len(order) - self.positives
+
+    def counts(self, thresholds) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(tp, fp, fn, tn) of `scores >= threshold` for each threshold."""
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        # Number of distinct scores >= each threshold; the counts sit at the last of them.
+        n_above = np.searchsorted(-self.thresholds, -thresholds, side="right")
+        last = np.maximum(n_above - 1, 0)
+        tp = np.where(n_above > 0, self.tp[last], 0)
+        fp = np.where(n_above > 0, self.fp[last], 0)
+        return tp, fp, self.positives - tp, self.negatives - fp
+
+
+def threshold_grid(step: float) -> np.ndarray:
+    """Thresholds from 0 to 1 in `step`s, built as notebook 5.0's `np.arange(0.0, 1.01, 0.05)`."""
+    return np.arange(0.0, 1.0 + step / 5, step)
+
+
+def gate_a_sweep(
+    curve: ThresholdCurve, thresholds, scenario: CostScenario, days: float = HOLDOUT_DAYS
+) -> pd.DataFrame:
+    """Gate A (auto-block) volumes and cost per day at each threshold, unrounded."""
+    tp, fp, fn, tn = curve.counts(thresholds)
+    alerts_day = (tp + fp) / days
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+    # Split the daily alerts by precision as notebook 5.0 does, so its rounding is reproduced.
+    tp_day = alerts_day * precision
+    fp_day = alerts_day * (1 - precision)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tp_to_fp = np.where(fp_day > 0, tp_day / fp_day, np.inf)
+    return pd.DataFrame(
+        {
+            "scenario": scenario.name,
+            "threshold": thresholds,
+            "tp": tp,
+            "fp": fp,
+            "fn": fn,
+            "tn": tn,
+            "precision": precision,
+            "recall": tp / max(curve.positives, 1),
+            "blocks_per_day": alerts_day,
+            "tp_per_day": tp_day,
+            "fp_per_day": fp_day,
+            "tp_to_fp": tp_to_fp,
+            "cost_fp_per_day": fp_day * scenario.cost_fp_gate_a,
+            "total_cost_per_day": fp_day * scenario.cost_fp_gate_a,
+        }
+    )
+
+
+def format_gate_a(sweep: pd.DataFrame) -> pd.DataFrame:
+    """Notebook 5.0's gate_a_simulation_results.csv layout and rounding."""
+    return pd.DataFrame(
+        {
+            "threshold": sweep["threshold"],
+            "precision (%)": (sweep["precision"] * 100).round(1),
+            "alerts/day": sweep["blocks_per_day"].round(1),
+            "TP/day": sweep["tp_per_day"].round(1),
+            "FP/day": sweep["fp_per_day"].round(1),
+            "TP/day to FP/day (%)": (sweep["tp_to_fp"] * 100).round(1),
+            "Cost_FP/day (₱)": sweep["cost_fp_per_day"].astype(np.int64),
+            "Total_Cost/day (₱)": sweep["total_cost_per_day"].astype(np.int64),
+        }
+    )
+
+
+def gate_b_costs(tp_day, fp_day, fn_day, queue_day, scenario: CostScenario) -> dict:
+    cost_fp_day = fp_day * scenario.cost_fp_gate_b
+    cost_fn_day = fn_day * scenario.cost_fn_gate_b
+    analysts = np.ceil(queue_day / scenario.reviews_per_analyst_per_day).astype(np.int64)
+    salary_day = analysts * scenario.salary_per_analyst_day
+    return {
+        "cost_fp_per_day": cost_fp_day,
+        "cost_fn_per_day": cost_fn_day,
+        "analysts_needed": analysts,
+        "salary_cost_per_day": salary_day,
+        "total_cost_per_day": cost_fp_day + cost_fn_day + salary_day,
+    }
+
+
+def gate_b_sweep(
+    curve: ThresholdCurve, thresholds, scenario: CostScenario, days: float = HOLDOUT_DAYS
+) -> pd.DataFrame:
+    """
+    Gate B (review queue) volumes, costs and analysts per day when every account scoring at
+    or above the threshold is queued, unrounded.
+    """
+    tp, fp, fn, tn = curve.counts(thresholds)
+    queue_day = (tp + fp) / days
+    tp_day, fp_day, fn_day = tp / days, fp / days, fn / days
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+    return pd.DataFrame(
+        {
+            "scenario": scenario.name,
+            "threshold": thresholds,
+            "tp": tp,
+            "fp": fp,
+            "fn": fn,
+            "tn": tn,
+            "precision": precision,
+            "recall": tp / max(curve.positives, 1),
+            "queue_per_day": queue_day,
+            "tp_per_day": tp_day,
+            "fp_per_day": fp_day,
+            "fn_per_day": fn_day,
+            **gate_b_costs(tp_day, fp_day, fn_day, queue_day, scenario),
+        }
+    )
+
+
+def gate_b_top_k(
+    curve: ThresholdCurve, ks, scenario: CostScenario, days: float = HOLDOUT_DAYS
+) -> pd.DataFrame:
+    """
+    Notebook 5.0's Gate B table: the top `k` holdout scores set precision@k and recall@k,
+    and `k` is read as the daily queue size.
+    """
+    ks = np.asarray(ks, dtype=np.int64)
+    tp = curve.tp_by_rank[np.minimum(ks, len(curve.tp_by_rank)) - 1]
+    precision = tp / ks
+    recall = tp / curve.positives if curve.positives > 0 else np.zeros(len(ks))
+    daily_frauds = curve.positives / days
+    tp_day = daily_frauds * recall
+    fp_day = ks - tp_day
+    fn_day = daily_frauds - tp_day
+    costs = gate_b_costs(tp_day, fp_day, fn_day, ks, scenario)
+    # The notebook sums the unrounded costs and truncates each money column to int.
+    return pd.DataFrame(
+        {
+            "k (daily)": ks,
+            "Recall@k (%)": (recall * 100).round(1),
+            "Precision@k (%)": (precision * 100).round(1),
+            "TP/day": tp_day.round(1),
+            "FP/day": fp_day.round(1),
+            "FN/day": fn_day.round(1),
+            "Cost_FP/day (₱)": costs["cost_fp_per_day"].astype(np.int64),
+            "Cost_FN/day (₱)": costs["cost_fn_per_day"].astype(np.int64),
+            "Analysts needed": costs["analysts_needed"],
+            "Salary cost/day (₱)": costs["salary_cost_per_day"].astype(np.int64),
+            "Total Cost+Salary/day (₱)": costs["total_cost_per_day"].astype(np.int64),
+        }
+    )
+
+
+def suffix_sum(counts: np.ndarray, axis: int) -> np.ndarray:
+    """counts[i:] summed along `axis` for every i."""
+    return np.flip(np.cumsum(np.flip(counts, axis), axis=axis), axis)
+
+
+class PolicyGrid:
+    """
+    Outcome counts of the two-gate policy (`predict.apply_gates`) for every pair of grid
+    thresholds.
+
+    Gate A blocks accounts with `block_proba >= tau_block`; Gate B queues the rest with
+    `review_proba >= tau_review`. Each account is binned once by the grid thresholds its two
+    scores reach. Suffix sums of the binned counts then give, for every (tau_block,
+    tau_review) cell:
+    - the accounts blocked;
+    - the accounts reaching the review threshold;
+    - the accounts that reach both and so are blocked rather than reviewed.
+
+    The whole grid therefore costs one pass over the holdout plus a few array sums over the
+    cells.
+
+    Attributes:
+        thresholds (np.ndarray): Grid thresholds shared by both gates.
+        blocked (dict): {label: counts blocked at each tau_block}.
+        reviewed (dict): {label: counts queued at each (tau_block, tau_review) cell}.
+        positives (int): Fraud accounts in the holdout.
+    """
+
+    def __init__(self, y_true, block_proba, review_proba, thresholds):
+        y_true = np.asarray(y_true).astype(np.int64)
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        n = len(self.thresholds)
+        # Index of the highest grid threshold each score reaches; -1 if it reaches none.
+        block_bin = np.searchsorted(self.thresholds, block_proba, side="right") - 1
+        review_bin = np.searchsorted(self.thresholds, review_proba, side="right") - 1
+        self.blocked, self.reviewed = {}, {}
+        for label in (0, 1):
+            rows = y_true == label
+            blocks = block_bin[rows & (block_bin >= 0)]
+            reviews = review_bin[rows & (review_bin >= 0)]
+            both = rows & (block_bin >= 0) & (review_bin >= 0)
+            joint = np.bincount(block_bin[both] * n + review_bin[both], minlength=n * n)
+            reach_both = suffix_sum(suffix_sum(joint.reshape(n, n), 0), 1)
+            self.blocked[label] = suffix_sum(np.bincount(blocks, minlength=n), 0)
+            reach_review = suffix_sum(np.bincount(reviews, minlength=n), 0)
+            self.reviewed[label] = reach_review[None, :] - reach_both
+        self.positives = int(y_true.sum())
+
+
+def evaluate_policies(
+    grid: PolicyGrid, scenario: CostScenario, days: float = HOLDOUT_DAYS
+) -> dict[str, np.ndarray]:
+    """
+    Daily volumes and costs of every policy on the grid, as (tau_block, tau_review) arrays.
+
+    Blocked and reviewed fraud counts as caught; fraud that passes both gates is the missed
+    fraud. The operating cost is everything but the missed fraud: false declines, reviews of
+    legitimate accounts and the analysts the queue needs.
+    """
+    blocked_tp = grid.blocked[1][:, None] / days
+    blocked_fp = grid.blocked[0][:, None] / days
+    reviewed_tp = grid.reviewed[1] / days
+    reviewed_fp = grid.reviewed[0] / days
+    queue_day = reviewed_tp + reviewed_fp
+    missed_day = grid.positives / days - blocked_tp - reviewed_tp
+    analysts = np.ceil(queue_day / scenario.reviews_per_analyst_per_day)
+    cost_fp_block = blocked_fp * scenario.cost_fp_gate_a
+    cost_fp_review = reviewed_fp * scenario.cost_fp_gate_b
+    cost_fn = missed_day * scenario.cost_fn_gate_b
+    salary = analysts * scenario.salary_per_analyst_day
+    operating = cost_fp_block + cost_fp_review + salary
+    shape = queue_day.shape
+    return {
+        "blocks_per_day": np.broadcast_to(blocked_tp + blocked_fp, shape),
+        "blocked_fraud_per_day": np.broadcast_to(blocked_tp, shape),
+        "false_declines_per_day": np.broadcast_to(blocked_fp, shape),
+        "queue_per_day": queue_day,
+        "reviewed_fraud_per_day": reviewed_tp,
+        "missed_fraud_per_day": missed_day,
+        "analysts_needed": analysts,
+        "cost_fp_block_per_day": np.broadcast_to(cost_fp_block, shape),
+        "cost_fp_review_per_day": cost_fp_review,
+        "cost_fn_per_day": cost_fn,
+        "salary_cost_per_day": salary,
+        "operating_cost_per_day": operating,
+        "total_cost_per_day": operating + cost_fn,
+    }
+
+
+def pareto_front(missed: np.ndarray, operating: np.ndarray) -> np.ndarray:
+    """
+    Flat indices of the policies no other policy beats on both missed fraud and operating
+    cost, from least to most missed fraud.
+    """
+    missed, operating = missed.ravel(), operating.ravel()
+    order = np.lexsort((operating, missed))
+    # A policy is on the front when it is cheaper than every policy that misses less fraud.
+    cheaper = np.r_[True, operating[order[1:]] < np.minimum.accumulate(operating[order])[:-1]]
+    return order[cheaper]
+
+
+def policy_frame(
+    grid: PolicyGrid, metrics: dict, cells: np.ndarray, scenario: CostScenario
+) -> pd.DataFrame:
+    """One row per flat grid cell in `cells`, with its thresholds and metrics."""
+    block_index, review_index = np.unravel_index(cells, metrics["queue_per_day"].shape)
+    return pd.DataFrame(
+        {
+            "scenario": scenario.name,
+            "tau_block": grid.thresholds[block_index],
+            "tau_review": grid.thresholds[review_index],
+            **{name: values.ravel()[cells] for name, values in metrics.items()},
+        }
+    )
+
+
+def holdout_scores(
+    features_path: Path = SELECTED_FEATURES_DATASET,
+    block_model_path: Path = BEST_PRECISION_MODEL,
+    review_model_path: Path = BEST_AUCPR_MODEL,
+    schema_path: Path = FEATURE_SCHEMA,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(y_holdout, block_proba, review_proba) on notebook 5.0's holdout split."""
+    X, y, _, _, _ = load_training_data(features_path, schema_path)
+    _, _, X_holdout, _, _, y_holdout = split_holdout(X, y)
+    block_proba = load_model(block_model_path).predict_proba(X_holdout)[:, 1]
+    review_proba = load_model(review_model_path).predict_proba(X_holdout)[:, 1]
+    return y_holdout.to_numpy(), block_proba, review_proba
+
+
+@app.command()
+def main(
+    features_path: Path = SELECTED_FEATURES_DATASET,
+    block_model_path: Path = BEST_PRECISION_MODEL,
+    review_model_path: Path = BEST_AUCPR_MODEL,
+    scenarios_path: Path = COST_SCENARIOS,
+    step: float = typer.Option(0.001, help="Threshold resolution of the sweep tables."),
+    days: float = typer.Option(HOLDOUT_DAYS, help="Days covered by the holdout."),
+    schema_path: Path = FEATURE_SCHEMA,
+):
+    """
+    Gate A and Gate B business simulations on the holdout: notebook 5.0's two tables (first
+    scenario) plus threshold sweeps at `step` resolution for every cost scenario.
+    """
+    y_holdout, block_proba, review_proba = holdout_scores(
+        features_path, block_model_path, review_model_path, schema_path
+    )
+    scenarios = load_cost_scenarios(scenarios_path)
+
+    start = time.perf_counter()
+    block_curve = ThresholdCurve(y_holdout, block_proba)
+    review_curve = ThresholdCurve(y_holdout, review_proba)
+    gate_a = format_gate_a(gate_a_sweep(block_curve, threshold_grid(0.05), scenarios[0], days))
+    gate_b = gate_b_top_k(review_curve, GATE_B_KS, scenarios[0], days)
+    thresholds = threshold_grid(step)
+    sweep_a = pd.concat(
+        [gate_a_sweep(block_curve, thresholds, s, days) for s in scenarios], ignore_index=True
+    )
+    sweep_b = pd.concat(
+        [gate_b_sweep(review_curve, thresholds, s, days) for s in scenarios], ignore_index=True
+    )
+    logger.info(
+        f"Swept {len(thresholds):,} thresholds x {len(scenarios)} scenarios in "
+        f"{time.perf_counter() - start:.3f}s"
+    )
+
+    REPORTS_MODEL_EVAL_DIR.mkdir(parents=True, exist_ok=True)
+    gate_a.to_csv(GATE_A_RESULTS, index=False)
+    gate_b.to_csv(GATE_B_RESULTS, index=False)
+    sweep_a.to_csv(GATE_A_SWEEP, index=False)
+    sweep_b.to_csv(GATE_B_SWEEP, index=False)
+    for name, scenario_sweep in sweep_b.groupby("scenario", sort=False):
+        cheapest = scenario_sweep.loc[scenario_sweep["total_cost_per_day"].idxmin()]
+        logger.info(
+            f"{name}: cheapest Gate B threshold {cheapest['threshold']:.3f} "
+            f"(₱{cheapest['total_cost_per_day']:,.0f}/day, "
+            f"{cheapest['analysts_needed']:.0f} analysts)"
+        )
+    logger.success(
+        f"Saved {GATE_A_RESULTS.name}, {GATE_B_RESULTS.name}, {GATE_A_SWEEP.name} and "
+        f"{GATE_B_SWEEP.name}"
+    )
+
+
+@app.command()
+def optimize(
+    features_path: Path = SELECTED_FEATURES_DATASET,
+    block_model_path: Path = BEST_PRECISION_MODEL,
+    review_model_path: Path = BEST_AUCPR_MODEL,
+    scenarios_path: Path = COST_SCENARIOS,
+    step: float = typer.Option(0.001, help="Threshold resolution of both gates."),
+    max_analysts: int = typer.Option(
+        0, help="Analysts available for the review queue; 0 for no limit."
+    ),
+    days: float = typer.Option(HOLDOUT_DAYS, help="Days covered by the holdout."),
+    schema_path: Path = FEATURE_SCHEMA,
+):
+    """
+    Searches Gate A and Gate B thresholds jointly on the holdout. For every cost scenario it
+    writes the missed-fraud vs operating-cost Pareto frontier and recommends the cheapest
+    policy within the analyst capacity, next to the configured thresholds.
+    """
+    y_holdout, block_proba, review_proba = holdout_scores(
+        features_path, block_model_path, review_model_path, schema_path
+    )
+    scenarios = load_cost_scenarios(scenarios_path)
+
+    start = time.perf_counter()
+    grid = PolicyGrid(y_holdout, block_proba, review_proba, threshold_grid(step))
+    current = np.ravel_multi_index(
+        (
+            np.abs(grid.thresholds - GATE_A_BLOCK_THRESHOLD).argmin(),
+            np.abs(grid.thresholds - GATE_B_REVIEW_THRESHOLD).argmin(),
+        ),
+        (len(grid.thresholds), len(grid.thresholds)),
+    )
+    frontiers, policies = [], []
+    for scenario in scenarios:
+        metrics = evaluate_policies(grid, scenario, days)
+        total = metrics["total_cost_per_day"]
+        if max_analysts > 0:
+            total = np.where(metrics["analysts_needed"] <= max_analysts, total, np.inf)
+        recommended = int(np.argmin(total))
+        if not np.isfinite(total.ravel()[recommended]):
+            raise ValueError(f"No policy needs {max_analysts} analysts or fewer.")
+        front = pareto_front(metrics["missed_fraud_per_day"], metrics["operating_cost_per_day"])
+        frontiers.append(policy_frame(grid, metrics, front, scenario))
+        policy = policy_frame(grid, metrics, np.array([recommended, current]), scenario)
+        policy.insert(1, "policy", ["recommended", "configured"])
+        policies.append(policy)
+    logger.info(
+        f"Evaluated {len(grid.thresholds) ** 2:,} policies x {len(scenarios)} scenarios in "
+        f"{time.perf_counter() - start:.3f}s"
+    )
+
+    REPORTS_MODEL_EVAL_DIR.mkdir(parents=True, exist_ok=True)
+    pd.concat(frontiers, ignore_index=True).to_csv(POLICY_FRONTIER, index=False)
+    policies = pd.concat(policies, ignore_index=True)
+    policies.to_csv(POLICY_RECOMMENDATION, index=False)
+    for row in policies.itertuples():
+        logger.info(
+            f"{row.scenario} {row.policy}: tau_block={row.tau_block:.3f}, "
+            f"tau_review={row.tau_review:.3f}, ₱{row.total_cost_per_day:,.0f}/day, "
+            f"{row.analysts_needed:.0f} analysts, {row.missed_fraud_per_day:.1f} missed/day"
+        )
+    logger.success(f"Saved {POLICY_FRONTIER.name} and {POLICY_RECOMMENDATION.name}")
+
+
+if __name__ == "__main__":
+    app()
@@ -1,29 +1,643 @@
+import math
 from pathlib import Path
+import time
 
+import joblib
+from joblib import Parallel, delayed
 from loguru import logger
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.metrics import average_precision_score, get_scorer, precision_score
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from tqdm import tqdm
 import typer
+import xgboost as xgb
+from xgboost import XGBClassifier
 
-from bank_fraud.config import MODELS_DIR, PROCESSED_DATA_DIR
+from bank_fraud.config import (
+    FEATURE_SCHEMA,
+    MODELS_DIR,
+    REPORTS_MODEL_EVAL_DIR,
+    SELECTED_FEATURES_DATASET,
+    TARGET_COL,
+    TRAINING_CACHE_DIR,
+    TRIAL_STORE,
+)
+from bank_fraud.modeling.matrix_cache import PreprocessedFold, PreprocessedFolds
+from bank_fraud.modeling.trial_store import TrialStore, params_key, search_key
+from bank_fraud.utils.feature_schema import FeatureSchema, frame_dtypes, load_feature_schema
 
 app = typer.Typer()
 
+RANDOM_STATE = 143
+CV_SPLITS = 5
+
+# Tuning objective -> sklearn scoring name; the key is the tag used in notebook 5.0's file names.
+OBJECTIVES = {"precision": "precision", "aucpr": "average_precision"}
+
+# Search spaces of notebook 5.0's two RandomizedSearchCV stages, keyed as in the saved results.
+PARAM_DISTRIBUTIONS = {
+    1: {
+        "classifier__n_estimators": [100, 200, 300, 400, 500],
+        "classifier__learning_rate": [0.01, 0.05, 0.1, 0.2],
+        "classifier__max_depth": [3, 5, 7, 9],
+        "classifier__subsample": [0.6, 0.7, 0.8, 0.9, 1.0],
+        "classifier__colsample_bytree": [0.6, 0.7, 0.8, 0.9, 1.0],
+        "classifier__gamma": [0, 0.1, 0.2, 0.3],
+        "classifier__reg_alpha": [0, 0.001, 0.01, 0.1],
+        "classifier__reg_lambda": [0, 0.001, 0.01, 0.1],
+    },
+    2: {
+        "classifier__n_estimators": [200, 300, 400, 500, 600],
+        "classifier__learning_rate": [0.01, 0.025, 0.05, 0.075, 0.1],
+        "classifier__max_depth": [5, 7, 9, 11],
+        "classifier__subsample": [0.7, 0.8, 0.9],
+        "classifier__colsample_bytree": [0.7, 0.8, 0.9],
+        "classifier__gamma": [0.0, 0.1, 0.2, 0.3],
+        "classifier__reg_alpha": [0, 0.01, 0.1, 1],
+        "classifier__reg_lambda": [0.01, 0.1, 1, 10],
+    },
+}
+N_ITER = {1: 50, 2: 250}
+
+PARAM_PREFIX = "classifier__"
+N_ESTIMATORS_KEY = f"{PARAM_PREFIX}n_estimators"
+
+# Validation metric XGBoost tracks for early stopping, whichever objective ranks the rungs;
+# precision at a fixed threshold is too jumpy from one round to the next to stop on.
+EARLY_STOPPING_METRIC = "aucpr"
+
+
+def stage_results_path(stage: int, objective: str) -> Path:
+    return REPORTS_MODEL_EVAL_DIR / f"random_search_stage{stage}_{objective}_results.csv"
+
+
+def stage_model_path(stage: int, objective: str) -> Path:
+    return MODELS_DIR / f"random_search_stage{stage}_{objective}_model.joblib"
+
+
+def final_model_path(objective: str) -> Path:
+    return MODELS_DIR / f"best_xgb_{objective}_model.joblib"
+
+
+def load_training_data(
+    features_path: Path = SELECTED_FEATURES_DATASET, schema_path: Path = FEATURE_SCHEMA
+) -> tuple[pd.DataFrame, pd.Series, list[str], list[str], list[str]]:
+    """
+    Loads the selected features and splits them as notebook 5.0 does.
+
+    Identifiers are dropped and the numerical/categorical/passthrough (bool) split is read
+    from the feature schema, which the input is validated against; without a schema the
+    columns are classified on the fly with the same rules.
+
+    Returns:
+        (X, y, numerical_features, categorical_features, passthrough_features)
+    """
+    df = pd.read_parquet(features_path)
+    column_info = frame_dtypes(df.drop(columns=[TARGET_COL]))
+    schema = load_feature_schema(schema_path)
+    if schema is None:
+        schema = FeatureSchema.from_dtypes(column_info)
+    else:
+        schema.validate(column_info)
+    identifiers = schema.partition(column_info)[2]
+    X = df.drop(columns=[TARGET_COL, *identifiers])
+    y = df[TARGET_COL]
+    numerical_features, categorical_features, passthrough_features = schema.model_feature_split(
+        X.columns
+    )
+    logger.info(
+        f"Loaded {len(X):,} rows; dropped {len(identifiers)} identifiers; "
+        f"{len(numerical_features)} numerical, {len(categorical_features)} categorical, "
+        f"{len(passthrough_features)} passthrough features"
+    )
+    return X, y, numerical_features, categorical_features, passthrough_features
+
+
+def split_holdout(X: pd.DataFrame, y: pd.Series):
+    """
+    Notebook 5.0's unshuffled split: the last 30% is the holdout and the rest is halved into
+    training and validation.
+
+    Returns:
+        (X_train, X_val, X_holdout, y_train, y_val, y_holdout)
+    """
+    X_trainval, X_holdout, y_trainval, y_holdout = train_test_split(
+        X, y, test_size=0.30, random_state=RANDOM_STATE, shuffle=False
+    )
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_trainval, y_trainval, test_size=0.50, random_state=RANDOM_STATE, shuffle=False
+    )
+    return X_train, X_val, X_holdout, y_train, y_val, y_holdout
+
+
+def build_preprocessor(
+    numerical_features: list[str],
+    categorical_features: list[str],
+    passthrough_features: list[str] | None = None,
+):
+    transformers = [
+        ("num", StandardScaler(), numerical_features),
+        ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
+    ]
+    if passthrough_features:
+        transformers.append(("passthrough", "passthrough", passthrough_features))
+    return ColumnTransformer(transformers=transformers, remainder="passthrough")
+
+
+def cv_splitter() -> StratifiedKFold:
+    return StratifiedKFold(n_splits=CV_SPLITS, shuffle=True, random_state=RANDOM_STATE)
+
+
+def xgb_classifier(y_train) -> XGBClassifier:
+    """Notebook 5.0's XGBoost baseline, weighted by the training class imbalance."""
+    y_train = np.asarray(y_train)
+    return XGBClassifier(
+        scale_pos_weight=(len(y_train) - y_train.sum()) / y_train.sum(),
+        eval_metric="logloss",
+        random_state=RANDOM_STATE,
+    )
+
+
+def classifier_params(params: dict) -> dict:
+    return {key.removeprefix(PARAM_PREFIX): value for key, value in params.items()}
+
+
+def fit_and_score(estimator, params: dict, fold: PreprocessedFold, scoring: str) -> tuple:
+    """Fits one candidate on a fold's cached matrices; returns (score, fit_time, score_time)."""
+    model = clone(estimator).set_params(**classifier_params(params))
+    start = time.perf_counter()
+    model.fit(fold.X_train, fold.y_train)
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    score = get_scorer(scoring)(model, fold.X_val, fold.y_val)
+    return score, fit_time, time.perf_counter() - start
+
+
+def search_results(candidates: list[dict], scores, fit_times, score_times) -> pd.DataFrame:
+    """Results in the layout of `RandomizedSearchCV.cv_results_` (one row per candidate)."""
+    results = {
+        "mean_fit_time": fit_times.mean(axis=1),
+        "std_fit_time": fit_times.std(axis=1),
+        "mean_score_time": score_times.mean(axis=1),
+        "std_score_time": score_times.std(axis=1),
+    }
+    for key in candidates[0]:
+        results[f"param_{key}"] = [candidate[key] for candidate in candidates]
+    results["params"] = candidates
+    for split in range(scores.shape[1]):
+        results[f"split{split}_test_score"] = scores[:, split]
+    results["mean_test_score"] = scores.mean(axis=1)
+    results["std_test_score"] = scores.std(axis=1)
+    results["rank_test_score"] = (
+        pd.Series(-results["mean_test_score"]).rank(method="min").astype(np.int32).to_numpy()
+    )
+    return pd.DataFrame(results)
+
+
+def random_search(
+    estimator,
+    param_distributions: dict,
+    folds: PreprocessedFolds,
+    scoring: str,
+    n_iter: int,
+    random_state: int = RANDOM_STATE,
+    n_jobs: int = 1,
+    store: TrialStore | None = None,
+    stage: int | None = None,
+    warm_start: int = 0,
+) -> pd.DataFrame:
+    """
+    Randomized search over cached fold matrices.
+
+    Candidates come from the same `ParameterSampler` draw as `RandomizedSearchCV`, so a given
+    seed evaluates the same parameter sets, but no trial re-runs the preprocessing.
+
+    With a `store`, every finished (candidate, fold) is committed to it and trials already
+    there are read back instead of refitted, so an interrupted search resumes where it
+    stopped. `warm_start` adds the best candidates the store already holds for these folds
+    (e.g. stage 1's) ahead of the new draw.
+    """
+    candidates = list(ParameterSampler(param_distributions, n_iter, random_state=random_state))
+    key = search_key(folds, estimator, scoring, "random")
+    done = {}
+    if store is not None:
+        candidates = store.best_candidates(key, len(folds), warm_start, candidates) + candidates
+        done = store.completed(key)
+
+    shape = (len(candidates), len(folds))
+    scores, fit_times, score_times = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    jobs = []
+    for c, candidate in enumerate(candidates):
+        for f in range(len(folds)):
+            record = done.get((params_key(candidate), f))
+            if record is None:
+                jobs.append((c, f))
+            else:
+                scores[c, f], fit_times[c, f], score_times[c, f] = record[:3]
+    if done:
+        logger.info(f"Resuming: {shape[0] * shape[1] - len(jobs)} trials read from the store")
+
+    outputs = Parallel(n_jobs=n_jobs, return_as="generator")(
+        delayed(fit_and_score)(estimator, candidates[c], folds.folds[f], scoring) for c, f in jobs
+    )
+    for (c, f), (score, fit_time, score_time) in tqdm(
+        zip(jobs, outputs), total=len(jobs), desc=f"{scoring} trials"
+    ):
+        scores[c, f], fit_times[c, f], score_times[c, f] = score, fit_time, score_time
+        if store is not None:
+            store.append(
+                key, candidates[c], f, score, fit_time, score_time, stage=stage, objective=scoring
+            )
+    return search_results(candidates, scores, fit_times, score_times)
+
+
+def booster_params(estimator, params: dict) -> dict:
+    """Native `xgb.train` parameters of the estimator with one candidate's settings applied."""
+    model = clone(estimator).set_params(**classifier_params(params))
+    xgb_params = {k: v for k, v in model.get_xgb_params().items() if v is not None}
+    xgb_params["eval_metric"] = EARLY_STOPPING_METRIC
+    return xgb_params
+
+
+def objective_score(scoring: str, y_true, proba) -> float:
+    """The search scorers on raw probabilities: precision at XGBClassifier's 0.5 cut, or AP."""
+    if scoring == "precision":
+        return precision_score(y_true, proba > 0.5, zero_division=0)
+    if scoring == "average_precision":
+        return average_precision_score(y_true, proba)
+    raise ValueError(f"Unsupported scoring for halving search: {scoring}")
+
+
+class BoostingTrial(xgb.callback.TrainingCallback):
+    """
+    One candidate's booster on one fold, grown rung by rung.
+
+    Each rung continues the booster from where the previous one stopped rather than
+    retraining it. The trial is also its own training callback: it appends the validation
+    metric after every round and stops training once `patience` rounds pass without a new
+    best, so a converged candidate costs nothing in later rungs.
+    """
+
+    def __init__(self, params: dict, patience: int):
+        super().__init__()
+        self.params = params
+        self.patience = patience
+        self.booster = None
+        self.history: list[float] = []
+
+    @property
+    def rounds(self) -> int:
+        return len(self.history)
+
+    @property
+    def best_iteration(self) -> int:
+        return int(np.argmax(self.history))
+
+    @property
+    def stopped(self) -> bool:
+        return bool(self.history) and self.rounds - 1 - self.best_iteration >= self.patience
+
+    def after_iteration(self, model, epoch, evals_log) -> bool:
+        self.history.append(evals_log["val"][EARLY_STOPPING_METRIC][-1])
+        return self.stopped
+
+    def grow(self, dtrain, dval, rounds: int) -> None:
+        if self.stopped or self.rounds >= rounds:
+            return
+        # XGBoost's sampling RNG lives in the process, not the booster, so each segment is
+        # reseeded from the rounds already trained; a booster restored from the trial store
+        # then continues exactly as the in-memory one would.
+        params = {**self.params, "random_state": self.params["random_state"] + self.rounds}
+        self.booster = xgb.train(
+            params,
+            dtrain,
+            num_boost_round=rounds - self.rounds,
+            evals=[(dval, "val")],
+            xgb_model=self.booster,
+            callbacks=[self],
+            verbose_eval=False,
+        )
+
+    def predict(self, dval) -> np.ndarray:
+        return self.booster.predict(dval, iteration_range=(0, self.best_iteration + 1))
+
+    def state(self) -> tuple[bytes, list[float]]:
+        """Serialized booster and validation history, for the trial store."""
+        return bytes(self.booster.save_raw("ubj")), list(self.history)
+
+    def restore(self, booster: bytes, history: list[float]) -> None:
+        self.booster = xgb.Booster()
+        self.booster.load_model(bytearray(booster))
+        self.history = list(history)
+
+
+def rung_budgets(min_rounds: int, max_rounds: int, factor: int) -> list[int]:
+    """Boosting rounds per rung: `min_rounds` growing by `factor` up to `max_rounds`."""
+    budgets = [min(min_rounds, max_rounds)]
+    while budgets[-1] < max_rounds:
+        budgets.append(min(budgets[-1] * factor, max_rounds))
+    return budgets
+
+
+def rank_halving_results(results: pd.DataFrame) -> np.ndarray:
+    """
+    Ranks as `HalvingRandomSearchCV` does: candidates that reached a later rung rank above
+    all that were pruned earlier, and scores order them within a rung (ties share a rank).
+    """
+    ranked = results.sort_values(["iter", "mean_test_score"], ascending=False, kind="stable")
+    first = ~ranked.duplicated(["iter", "mean_test_score"]).to_numpy()
+    positions = np.where(first, np.arange(1, len(ranked) + 1), np.nan)
+    ranks = pd.Series(positions, index=ranked.index).ffill().astype(np.int32)
+    return ranks.loc[results.index].to_numpy()
+
+
+def halving_search(
+    estimator,
+    param_distributions: dict,
+    folds: PreprocessedFolds,
+    scoring: str,
+    n_candidates: int,
+    factor: int = 3,
+    min_rounds: int = 25,
+    patience: int = 50,
+    random_state: int = RANDOM_STATE,
+    store: TrialStore | None = None,
+    stage: int | None = None,
+    warm_start: int = 0,
+) -> pd.DataFrame:
+    """
+    Successive halving over boosting rounds with early stopping on each fold's validation
+    split.
+
+    The candidates are the same `ParameterSampler` draw the randomized search evaluates.
+    Every candidate first trains `min_rounds` rounds on every fold; the best `1 / factor` by
+    mean fold score move on and continue training to `factor` times as many rounds, until
+    the survivors reach their own `n_estimators`. A candidate's rounds never exceed its
+    sampled `n_estimators`, and a fold stops early once the validation AUC-PR has not
+    improved for `patience` rounds. Scores are taken at each fold's best iteration.
+
+    Each fold's matrices are loaded into XGBoost once and shared by every candidate, so
+    training runs with XGBoost's own threads rather than parallel trial workers.
+
+    With a `store`, each (candidate, fold, rung) result and the fold's booster are committed
+    as they finish; a rerun reads finished rungs back and continues the stored boosters.
+    `warm_start` adds the best candidates the store already holds, as in `random_search`.
+
+    Returns:
+        pd.DataFrame: One row per candidate and rung in the layout of
+        `HalvingRandomSearchCV.cv_results_` (`iter`, `n_resources` and the
+        `RandomizedSearchCV` columns), plus `best_n_estimators`, the median best iteration
+        across folds, which the refit uses.
+    """
+    candidates = list(
+        ParameterSampler(param_distributions, n_candidates, random_state=random_state)
+    )
+    key = search_key(
+        folds,
+        estimator,
+        scoring,
+        "halving",
+        factor=factor,
+        min_rounds=min_rounds,
+        patience=patience,
+    )
+    if store is not None:
+        candidates = store.best_candidates(key, len(folds), warm_start, candidates) + candidates
+    data = []
+    for fold in folds:
+        dtrain = xgb.QuantileDMatrix(fold.X_train, fold.y_train)
+        data.append((dtrain, xgb.QuantileDMatrix(fold.X_val, fold.y_val, ref=dtrain)))
+
+    def rounds_cap(candidate: dict) -> int:
+        return candidate.get(N_ESTIMATORS_KEY, estimator.n_estimators)
+
+    budgets = rung_budgets(min_rounds, max(rounds_cap(c) for c in candidates), factor)
+    trials = {
+        c: [BoostingTrial(booster_params(estimator, candidate), patience) for _ in data]
+        for c, candidate in enumerate(candidates)
+    }
+    alive = list(range(len(candidates)))
+    rungs = []
+    for rung, budget in enumerate(budgets):
+        shape = (len(alive), len(data))
+        scores, fit_times, score_times = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        best_rounds = np.zeros(shape)
+        done = {} if store is None else store.completed(key, budget)
+        for i, c in enumerate(tqdm(alive, desc=f"{scoring} rung {rung} ({budget} rounds)")):
+            rounds = min(budget, rounds_cap(candidates[c]))
+            for f, (trial, (dtrain, dval)) in enumerate(zip(trials[c], data)):
+                record = done.get((params_key(candidates[c]), f))
+                if record is not None:
+                    scores[i, f], fit_times[i, f], score_times[i, f], best_rounds[i, f] = record
+                    continue
+                if store is not None and trial.booster is None:
+                    state = store.load_state(key, candidates[c], f)
+                    if state is not None:
+                        trial.restore(*state)
+                start = time.perf_counter()
+                trial.grow(dtrain, dval, rounds)
+                fit_times[i, f] = time.perf_counter() - start
+                start = time.perf_counter()
+                scores[i, f] = objective_score(scoring, folds.folds[f].y_val, trial.predict(dval))
+                score_times[i, f] = time.perf_counter() - start
+                best_rounds[i, f] = trial.best_iteration + 1
+                if store is not None:
+                    store.append(
+                        key,
+                        candidates[c],
+                        f,
+                        scores[i, f],
+                        fit_times[i, f],
+                        score_times[i, f],
+                        n_resources=budget,
+                        best_n_estimators=int(best_rounds[i, f]),
+                        stage=stage,
+                        objective=scoring,
+                        state=trial.state(),
+                    )
+        results = search_results([candidates[c] for c in alive], scores, fit_times, score_times)
+        results.insert(0, "n_resources", budget)
+        results.insert(0, "iter", rung)
+        results["best_n_estimators"] = np.median(best_rounds, axis=1).round().astype(int)
+        rungs.append(results)
+        if rung == len(budgets) - 1:
+            break
+
+        keep = max(1, math.ceil(len(alive) / factor))
+        order = np.argsort(-scores.mean(axis=1), kind="stable")
+        survivors = [alive[i] for i in order[:keep]]
+        for c in set(alive) - set(survivors):
+            del trials[c]
+        alive = survivors
+
+    results = pd.concat(rungs, ignore_index=True)
+    results["rank_test_score"] = rank_halving_results(results)
+    return results
+
+
+def refit_best(estimator, results: pd.DataFrame, folds: PreprocessedFolds) -> Pipeline:
+    """
+    Refits the best candidate on the full training matrix and wraps it with the preprocessor
+    fitted on the same rows, in the `preprocessor` -> `classifier` layout scoring expects.
+    Halving results refit with the early-stopped number of rounds.
+    """
+    best = results.loc[results["rank_test_score"].idxmin()]
+    params = classifier_params(best["params"])
+    if "best_n_estimators" in best:
+        params["n_estimators"] = int(best["best_n_estimators"])
+    classifier = clone(estimator).set_params(**params)
+    classifier.fit(folds.full.X_train, folds.full.y_train)
+    return Pipeline(steps=[("preprocessor", folds.full.preprocessor), ("classifier", classifier)])
+
+
+def build_folds(
+    X_train: pd.DataFrame,
+    y_train,
+    numerical_features: list[str],
+    categorical_features: list[str],
+    passthrough_features: list[str] | None = None,
+    cache_dir: Path | None = TRAINING_CACHE_DIR,
+    n_jobs: int = 1,
+) -> PreprocessedFolds:
+    preprocessor = build_preprocessor(
+        numerical_features, categorical_features, passthrough_features
+    )
+    return PreprocessedFolds(
+        preprocessor, X_train, y_train, cv_splitter(), cache_dir=cache_dir, n_jobs=n_jobs
+    )
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    features_path: Path = PROCESSED_DATA_DIR / "features.csv",
-    labels_path: Path = PROCESSED_DATA_DIR / "labels.csv",
-    model_path: Path = MODELS_DIR / "model.pkl",
-    # -----------------------------------------
+    features_path: Path = SELECTED_FEATURES_DATASET,
+    objective: str = "all",
+    stage: int = 1,
+    n_iter: int | None = None,
+    n_jobs: int = 1,
+    search: str = typer.Option(
+        "random", help="'random' (full training per candidate) or 'halving' (successive halving)."
+    ),
+    factor: int = typer.Option(3, help="Halving: keep 1/factor of the candidates per rung."),
+    min_rounds: int = typer.Option(25, help="Halving: boosting rounds in the first rung."),
+    patience: int = typer.Option(50, help="Halving: early-stopping rounds on validation AUC-PR."),
+    cache_dir: Path = TRAINING_CACHE_DIR,
+    in_memory: bool = typer.Option(
+        False, help="Keep the preprocessed fold matrices in memory instead of on disk."
+    ),
+    schema_path: Path = FEATURE_SCHEMA,
+    trial_store: Path = TRIAL_STORE,
+    checkpoint: bool = typer.Option(
+        True, help="Log finished trials to the trial store and skip the ones already there."
+    ),
+    warm_start: int = typer.Option(
+        0, help="Also evaluate the N best candidates already in the trial store."
+    ),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Training some model...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Modeling training complete.")
-    # -----------------------------------------
+    """
+    Runs one of notebook 5.0's randomized search stages for Precision, AUC-PR or both,
+    writing the stage's results CSV and best model.
+
+    `--search halving` evaluates the same `n_iter` candidates by successive halving over
+    boosting rounds with early stopping, which prunes weak candidates after a fraction of
+    their rounds; the results CSV then has one row per candidate and rung.
+
+    Finished trials are checkpointed to the trial store, so rerunning an interrupted
+    command resumes it, and `--warm-start` lets stage 2 carry stage 1's best candidates.
+    """
+    if objective != "all" and objective not in OBJECTIVES:
+        raise typer.BadParameter(f"objective must be 'all' or one of {list(OBJECTIVES)}")
+    if stage not in PARAM_DISTRIBUTIONS:
+        raise typer.BadParameter(f"stage must be one of {list(PARAM_DISTRIBUTIONS)}")
+    if search not in ("random", "halving"):
+        raise typer.BadParameter("search must be 'random' or 'halving'")
+    objectives = list(OBJECTIVES) if objective == "all" else [objective]
+
+    X, y, numerical_features, categorical_features, passthrough_features = load_training_data(
+        features_path, schema_path
+    )
+    X_train, _, _, y_train, _, _ = split_holdout(X, y)
+    folds = build_folds(
+        X_train,
+        y_train,
+        numerical_features,
+        categorical_features,
+        passthrough_features,
+        cache_dir=None if in_memory else cache_dir,
+        n_jobs=n_jobs,
+    )
+    estimator = xgb_classifier(y_train)
+    store = TrialStore(trial_store) if checkpoint else None
+
+    for name in objectives:
+        logger.info(f"Stage {stage} {search} search for {name}...")
+        if search == "halving":
+            results = halving_search(
+                estimator,
+                PARAM_DISTRIBUTIONS[stage],
+                folds,
+                OBJECTIVES[name],
+                n_iter or N_ITER[stage],
+                factor=factor,
+                min_rounds=min_rounds,
+                patience=patience,
+                store=store,
+                stage=stage,
+                warm_start=warm_start,
+            )
+        else:
+            results = random_search(
+                estimator,
+                PARAM_DISTRIBUTIONS[stage],
+                folds,
+                OBJECTIVES[name],
+                n_iter or N_ITER[stage],
+                n_jobs=n_jobs,
+                store=store,
+                stage=stage,
+                warm_start=warm_start,
+            )
+        results_path = stage_results_path(stage, name)
+        results_path.parent.mkdir(parents=True, exist_ok=True)
+        results.to_csv(results_path, index=False)
+        best = results.loc[results["rank_test_score"].idxmin()]
+        logger.info(f"Best {name}: {best['mean_test_score']:.4f} with {best['params']}")
+
+        model_path = stage_model_path(stage, name)
+        model_path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(refit_best(estimator, results, folds), model_path)
+        logger.success(f"Saved {results_path.name} and {model_path.name}")
+    if store is not None:
+        store.close()
+
+
+@app.command()
+def select(objective: str = "all"):
+    """Keeps the better of the stage 1 and stage 2 models as the final model, as notebook 5.0."""
+    for name in list(OBJECTIVES) if objective == "all" else [objective]:
+        scores = {}
+        for stage in PARAM_DISTRIBUTIONS:
+            if stage_results_path(stage, name).exists() and stage_model_path(stage, name).exists():
+                results = pd.read_csv(stage_results_path(stage, name))
+                # The saved model is the rank-1 candidate; with halving results a pruned
+                # early-rung row can outscore it.
+                best = results["rank_test_score"].idxmin()
+                scores[stage] = results.loc[best, "mean_test_score"]
+        if not scores:
+            logger.warning(f"No search results for {name}; run the search stages first.")
+            continue
+        # Ties keep the earlier stage, as in the notebook.
+        best_stage = max(scores, key=lambda stage: (scores[stage], -stage))
+        model = joblib.load(stage_model_path(best_stage, name))
+        joblib.dump(model, final_model_path(name))
+        logger.success(
+            f"Stage {best_stage} {name} model ({scores[best_stage]:.4f}) saved to "
+            f"{final_model_path(name)}"
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,194 @@
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import sqlite3
+
+import joblib
+from loguru import logger
+import pandas as pd
+import typer
+
+from bank_fraud.config import TRIAL_STORE
+
+app = typer.Typer()
+
+# Bump when the tables below change; older stores are left alone and a new file is needed.
+TRIAL_STORE_VERSION = 1
+
+# `n_resources` is 0 for trials trained to their full n_estimators (randomized search) and
+# the rung's boosting-round budget for halving trials.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    search_key TEXT NOT NULL,
+    params TEXT NOT NULL,
+    fold INTEGER NOT NULL,
+    n_resources INTEGER NOT NULL,
+    score REAL NOT NULL,
+    fit_time REAL NOT NULL,
+    score_time REAL NOT NULL,
+    best_n_estimators INTEGER,
+    stage INTEGER,
+    objective TEXT,
+    finished_at TEXT NOT NULL,
+    PRIMARY KEY (search_key, params, fold, n_resources)
+);
+CREATE TABLE IF NOT EXISTS trial_states (
+    search_key TEXT NOT NULL,
+    params TEXT NOT NULL,
+    fold INTEGER NOT NULL,
+    booster BLOB NOT NULL,
+    history TEXT NOT NULL,
+    PRIMARY KEY (search_key, params, fold)
+);
+"""
+
+
+def params_key(params: dict) -> str:
+    """Canonical JSON of one candidate's parameters, the candidate's identity in the store."""
+    return json.dumps(params, sort_keys=True)
+
+
+def search_key(folds, estimator, scoring: str, search: str, **settings) -> str:
+    """
+    Identity of a search namespace: the cached folds (data, labels, preprocessing, splitter),
+    the base estimator, the scorer, the search mode and its settings. Stages share it, so a
+    candidate evaluated in stage 1 is not refitted in stage 2.
+    """
+    return joblib.hash(
+        [folds.key, estimator.get_params(), scoring, search, sorted(settings.items())],
+        hash_name="sha1",
+    )
+
+
+class TrialStore:
+    """
+    Append-only SQLite log of finished search trials.
+
+    Every (candidate, fold) result is committed as soon as it finishes, so a search that is
+    killed loses only the trials in flight. A rerun looks its trials up first and fits only
+    the missing ones. Halving searches also keep each fold's latest booster and validation
+    history, so a resumed rung continues training instead of starting over.
+    """
+
+    def __init__(self, path: Path = TRIAL_STORE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, TRIAL_STORE_VERSION):
+            raise ValueError(
+                f"{path} has trial store version {version}; expected {TRIAL_STORE_VERSION}."
+            )
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {TRIAL_STORE_VERSION}")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def completed(self, key: str, n_resources: int = 0) -> dict[tuple[str, int], tuple]:
+        """{(params key, fold): (score, fit_time, score_time, best_n_estimators)}."""
+        rows = self.connection.execute(
+            "SELECT params, fold, score, fit_time, score_time, best_n_estimators FROM trials "
+            "WHERE search_key = ? AND n_resources = ?",
+            (key, n_resources),
+        )
+        return {(params, fold): tuple(values) for params, fold, *values in rows}
+
+    def append(
+        self,
+        key: str,
+        params: dict,
+        fold: int,
+        score: float,
+        fit_time: float,
+        score_time: float,
+        n_resources: int = 0,
+        best_n_estimators: int | None = None,
+        stage: int | None = None,
+        objective: str | None = None,
+        state: tuple[bytes, list[float]] | None = None,
+    ) -> None:
+        """Records one finished trial (and, for halving, its booster state) atomically."""
+        finished_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    params_key(params),
+                    fold,
+                    n_resources,
+                    float(score),
+                    fit_time,
+                    score_time,
+                    best_n_estimators,
+                    stage,
+                    objective,
+                    finished_at,
+                ),
+            )
+            if state is not None:
+                booster, history = state
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO trial_states VALUES (?, ?, ?, ?, ?)",
+                    (key, params_key(params), fold, booster, json.dumps(history)),
+                )
+
+    def load_state(self, key: str, params: dict, fold: int) -> tuple[bytes, list[float]] | None:
+        row = self.connection.execute(
+            "SELECT booster, history FROM trial_states "
+            "WHERE search_key = ? AND params = ? AND fold = ?",
+            (key, params_key(params), fold),
+        ).fetchone()
+        return None if row is None else (row[0], json.loads(row[1]))
+
+    def best_candidates(
+        self, key: str, n_folds: int, k: int, exclude: list[dict] = ()
+    ) -> list[dict]:
+        """
+        The `k` best candidates with every fold finished at their largest resource level,
+        for warm-starting a later stage. Candidates that reached more boosting rounds rank
+        first (halving survivors), then by mean score. Candidates in `exclude` are skipped.
+        """
+        if k <= 0:
+            return []
+        excluded = {params_key(params) for params in exclude}
+        rows = self.connection.execute(
+            "SELECT params, n_resources, AVG(score) AS mean_score FROM trials t "
+            "WHERE search_key = ? AND n_resources = ("
+            "  SELECT MAX(n_resources) FROM trials u "
+            "  WHERE u.search_key = t.search_key AND u.params = t.params"
+            ") GROUP BY params HAVING COUNT(*) = ? "
+            "ORDER BY n_resources DESC, mean_score DESC, params",
+            (key, n_folds),
+        )
+        best = [params for params, _, _ in rows if params not in excluded]
+        return [json.loads(params) for params in best[:k]]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.read_sql_query("SELECT * FROM trials ORDER BY finished_at", self.connection)
+
+
+@app.command()
+def summary(store_path: Path = TRIAL_STORE):
+    """Finished trials per search namespace, stage and objective."""
+    store = TrialStore(store_path)
+    trials = store.to_frame()
+    store.close()
+    if trials.empty:
+        logger.info(f"No trials in {store_path}")
+        return
+    counts = trials.groupby(["search_key", "stage", "objective"], dropna=False).agg(
+        trials=("score", "size"),
+        candidates=("params", "nunique"),
+        best_fold_score=("score", "max"),
+        fit_hours=("fit_time", lambda t: t.sum() / 3600),
+        last_finished=("finished_at", "max"),
+    )
+    logger.info(f"Trials in {store_path}:\n{counts.to_string()}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+from bank_fraud.utils.numerical_binning_definitions import BINNING_DEFINITIONS
+
+OTHER_LABEL = "Other"
+
+
+def map_value_to_bin(value, parsed_rules: list) -> str:
+    """
+    Scalar reference binning used in notebook 3.0: returns the label of the first rule that
+    matches `value`, or 'Other' when none does (including NaN).
+    """
+    for rule in parsed_rules:
+        rule_type = rule["type"]
+        rule_label = rule["label"]
+
+        if rule_type == "text":
+            if rule_label.lower() == "negative accel (<0)" and value < 0:
+                return rule_label
+            if rule_label.lower() == "positive accel (>0)" and value > 0:
+                return rule_label
+        elif rule_type == "exact":
+            if value == rule["value"]:
+                return rule_label
+        elif rule_type == "range_le_lt":  # [low, high)
+            if rule["low"] <= value < rule["high"]:
+                return rule_label
+        elif rule_type == "range_ge":  # [low, inf)
+            if value >= rule["low"]:
+                return rule_label
+        elif rule_type == "range_lt":  # (-inf, high)
+            if value < rule["high"]:
+                return rule_label
+        elif rule_type == "range_gt":  # (low, inf)
+            if value > rule["low"]:
+                return rule_label
+    return OTHER_LABEL
+
+
+def rule_breakpoints(parsed_rules: list) -> np.ndarray:
+    """Sorted distinct values at which the first-matching rule can change."""
+    points = set()
+    for rule in parsed_rules:
+        rule_type = rule["type"]
+        if rule_type == "text":
+            points.add(0.0)
+        elif rule_type == "exact":
+            points.add(float(rule["value"]))
+        elif rule_type == "range_le_lt":
+            points.update((float(rule["low"]), float(rule["high"])))
+        elif rule_type in ("range_ge", "range_gt"):
+            points.add(float(rule["low"]))
+        elif rule_type == "range_lt":
+            points.add(float(rule["high"]))
+    return np.array(sorted(p for p in points if np.isfinite(p)), dtype=np.float64)
+
+
+class CompiledBins:
+    """
+    Vectorized form of one feature's binning rules.
+
+    The rule boundaries split the real line into alternating pieces: open intervals between
+    consecutive breakpoints and the breakpoints themselves (which is where `exact` rules and
+    closed range ends live). No boundary falls inside a piece, so the first matching rule is
+    constant on it and is resolved once at compile time by running `map_value_to_bin` on a
+    representative value. Binning a column is then one `np.searchsorted` against the
+    breakpoints, an equality test for the point pieces and a table lookup, preserving the
+    notebook's first-match semantics exactly, overlapping rules included.
+
+    Attributes:
+        labels (list[str]): Bin labels in rule order, followed by 'Other'.
+        breakpoints (np.ndarray): Sorted distinct rule boundaries.
+        piece_codes (np.ndarray): Label code for piece 2*i (interval just below
+            breakpoints[i], or above the last one) and 2*i + 1 (the point breakpoints[i]).
+    """
+
+    def __init__(self, parsed_rules: list):
+        labels = list(dict.fromkeys(rule["label"] for rule in parsed_rules))
+        if OTHER_LABEL not in labels:
+            labels.append(OTHER_LABEL)
+        self.labels = labels
+        self.breakpoints = rule_breakpoints(parsed_rules)
+
+        code_of = {label: i for i, label in enumerate(labels)}
+        points = self.breakpoints
+        if len(points) == 0:
+            representatives = [0.0]
+        else:
+            span = max(1.0, float(np.abs(points).max()))
+            below = [points[0] - span] + list((points[:-1] + points[1:]) / 2)
+            representatives = []
+            for interval_value, point in zip(below, points):
+                representatives.extend([interval_value, point])
+            representatives.append(points[-1] + span)
+        self.piece_codes = np.array(
+            [code_of[map_value_to_bin(value, parsed_rules)] for value in representatives],
+            dtype=self.code_dtype,
+        )
+        self.other_code = code_of[OTHER_LABEL]
+        self._padded_breakpoints = np.append(self.breakpoints, np.nan)
+
+    @property
+    def code_dtype(self):
+        return np.int8 if len(self.labels) < np.iinfo(np.int8).max else np.int16
+
+    def codes(self, values) -> np.ndarray:
+        """Label codes (indices into `labels`) for an array of values; NaN maps to 'Other'."""
+        values = np.asarray(values, dtype=np.float64)
+        index = np.searchsorted(self.breakpoints, values, side="left")
+        # The NaN sentinel lets values above every breakpoint index past the end safely.
+        on_point = values == self._padded_breakpoints[index]
+        codes = self.piece_codes[2 * index + on_point]
+        missing = np.isnan(values)
+        if missing.any():
+            codes[missing] = self.other_code
+        return codes
+
+    def apply(self, values) -> pd.Categorical:
+        """Bins an array of values into a categorical with `labels` as its categories."""
+        return pd.Categorical.from_codes(self.codes(values), categories=self.labels)
+
+
+def compile_binning_definitions(definitions: dict = BINNING_DEFINITIONS) -> dict:
+    """Compiles every feature's rule list into a `CompiledBins`."""
+    return {feature: CompiledBins(rules) for feature, rules in definitions.items()}
+
+
+def bin_dataframe(
+    df: pd.DataFrame, compiled: dict | None = None, suffix: str = "_binned"
+) -> pd.DataFrame:
+    """
+    Bins every feature of `compiled` (default: all of BINNING_DEFINITIONS) present in `df`.
+
+    Returns:
+        pd.DataFrame: One categorical `<feature><suffix>` column per binned feature, aligned
+        with `df.index`.
+    """
+    if compiled is None:
+        compiled = compile_binning_definitions()
+    binned = {
+        f"{feature}{suffix}": bins.apply(df[feature].to_numpy(dtype=np.float64, na_value=np.nan))
+        for feature, bins in compiled.items()
+        if feature in df.columns
+    }
+    return pd.DataFrame(binned, index=df.index)
+
+
+def verify_compiled_bins(df: pd.DataFrame, definitions: dict = BINNING_DEFINITIONS) -> None:
+    """
+    Checks the compiled bins against `map_value_to_bin` for every distinct value in `df`.
+
+    Raises:
+        AssertionError: If any value is binned differently.
+    """
+    for feature, rules in definitions.items():
+        if feature not in df.columns:
+            continue
+        values = df[feature].dropna().unique().astype(np.float64)
+        values = np.concatenate([values, [np.nan, np.inf, -np.inf]])
+        compiled = CompiledBins(rules).apply(values)
+        for value, label in zip(values, compiled):
+            expected = map_value_to_bin(value, rules)
+            if label != expected:
+                raise AssertionError(
+                    f"{feature}={value!r}: compiled {label!r}, rules {expected!r}"
+                )
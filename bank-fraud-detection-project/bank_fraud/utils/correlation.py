@@ -0,0 +1,441 @@
+from pathlib import Path
+import time
+import warnings
+
+from joblib import Parallel, delayed
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from bank_fraud.config import FEATURE_SELECTION_DATASET, REFERENCES_DIR
+from bank_fraud.utils.feature_schema import ROLE_IDENTIFIER, classify_feature, dtype_family
+from bank_fraud.utils.parquet_chunks import (
+    DEFAULT_BATCH_SIZE,
+    iter_piece_frames,
+    parquet_dtypes,
+    parquet_pieces,
+    split_pieces,
+)
+
+app = typer.Typer()
+
+# Rows per matrix product. Per-chunk float32 sums stay accurate at this size and are folded
+# into float64 accumulators; presence counts stay exact in float32 below 2**24 rows.
+DEFAULT_CHUNK_ROWS = 65_536
+
+# notebook 3.0 screens numerical features with |r| above this.
+HIGH_CORRELATION_THRESHOLD = 0.7
+
+# Same selection as notebook 3.0's `df.select_dtypes(include=["int64", "float64"])`.
+NUMERICAL_DTYPES = ("int64", "float64")
+
+PAIR_COLUMNS = ["Feature 1", "Feature 2", "Correlation"]
+
+
+def numerical_columns(column_info: dict[str, str]) -> list[str]:
+    return [column for column, dtype in column_info.items() if dtype in NUMERICAL_DTYPES]
+
+
+class CorrelationAccumulator:
+    """
+    Pairwise-complete Pearson sufficient statistics, updated one row chunk at a time.
+
+    For every column pair (i, j) it keeps, over the rows where both are present, the count,
+    the sum and sum of squares of column i, and the cross-product sum. Each chunk costs one
+    matrix product X'X, plus three more when it has missing values, run in `dtype` (float32 by
+    default) on values shifted by a per-column offset to avoid cancellation; the per-chunk
+    results are added to float64 accumulators.
+
+    Accumulators with the same columns and shift merge by addition, so chunks can be counted
+    in parallel, and `save`/`load` keep the state between runs so new rows can be added
+    without rescanning the old ones.
+
+    Attributes:
+        columns (list[str]): Column order of the accumulators.
+        shift (np.ndarray | None): Per-column offset, taken from the first chunk's means.
+        n_rows (int): Rows seen so far.
+    """
+
+    def __init__(self, columns: list[str], shift=None, dtype=np.float32):
+        k = len(columns)
+        self.columns = list(columns)
+        self.dtype = np.dtype(dtype)
+        self.shift = None if shift is None else np.asarray(shift, dtype=np.float64)
+        self.n_rows = 0
+        self.count = np.zeros((k, k))
+        self.sum_x = np.zeros((k, k))
+        self.sum_xx = np.zeros((k, k))
+        self.sum_xy = np.zeros((k, k))
+
+    def update(self, values) -> "CorrelationAccumulator":
+        """Adds a DataFrame (with `columns`) or a 2-D array in `columns` order."""
+        if isinstance(values, pd.DataFrame):
+            values = values[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        values = np.asarray(values, dtype=np.float64)
+        if self.shift is None:
+            # All-NaN columns warn on nanmean; their shift is irrelevant.
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                self.shift = np.nan_to_num(np.nanmean(values, axis=0))
+        for start in range(0, len(values), DEFAULT_CHUNK_ROWS):
+            self._update_chunk(values[start : start + DEFAULT_CHUNK_ROWS])
+        return self
+
+    def _update_chunk(self, values: np.ndarray) -> None:
+        x = (values - self.shift).astype(self.dtype)
+        missing = np.isnan(x)
+        self.n_rows += len(x)
+        if missing.any():
+            present = (~missing).astype(self.dtype)
+            x[missing] = 0
+            self.count += present.T @ present
+            self.sum_x += x.T @ present
+            self.sum_xx += np.square(x).T @ present
+        else:
+            self.count += len(x)
+            self.sum_x += x.sum(axis=0, dtype=np.float64)[:, None]
+            self.sum_xx += np.square(x).sum(axis=0, dtype=np.float64)[:, None]
+        self.sum_xy += x.T @ x
+
+    def merge(self, other: "CorrelationAccumulator") -> "CorrelationAccumulator":
+        if other.columns != self.columns or not np.array_equal(other.shift, self.shift):
+            raise ValueError("Only accumulators with the same columns and shift can be merged.")
+        self.n_rows += other.n_rows
+        self.count += other.count
+        self.sum_x += other.sum_x
+        self.sum_xx += other.sum_xx
+        self.sum_xy += other.sum_xy
+        return self
+
+    def correlation(self) -> pd.DataFrame:
+        """
+        Pearson matrix matching `DataFrame.corr()`: NaN where a pair has fewer than two
+        common rows or a column is constant over them.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = self.sum_xy - self.sum_x * self.sum_x.T / self.count
+            var = self.sum_xx - self.sum_x**2 / self.count
+            corr = cov / np.sqrt(var * var.T)
+        corr[(self.count < 2) | ~(var > 0) | ~(var.T > 0)] = np.nan
+        np.clip(corr, -1.0, 1.0, out=corr)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            np.savez(
+                f,
+                columns=np.array(self.columns),
+                dtype=np.array(self.dtype.name),
+                shift=self.shift,
+                n_rows=np.array(self.n_rows),
+                count=self.count,
+                sum_x=self.sum_x,
+                sum_xx=self.sum_xx,
+                sum_xy=self.sum_xy,
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "CorrelationAccumulator":
+        with np.load(path) as state:
+            accumulator = cls(state["columns"].tolist(), state["shift"], str(state["dtype"]))
+            accumulator.n_rows = int(state["n_rows"])
+            for name in ("count", "sum_x", "sum_xx", "sum_xy"):
+                setattr(accumulator, name, state[name])
+        return accumulator
+
+
+def correlation_matrix(
+    df: pd.DataFrame, columns: list[str] | None = None, method: str = "pearson", dtype=np.float32
+) -> pd.DataFrame:
+    """
+    Correlation matrix of `columns` (default: the int64/float64 columns) via
+    `CorrelationAccumulator`.
+
+    Spearman ranks each column once over its non-null values (average ranks for ties) and
+    correlates the ranks; this equals `DataFrame.corr("spearman")` when there are no missing
+    values, whereas pandas re-ranks every pair over their common rows.
+    """
+    if columns is None:
+        columns = numerical_columns({c: str(t) for c, t in df.dtypes.items()})
+    if method == "spearman":
+        df = df[columns].rank()
+    elif method != "pearson":
+        raise ValueError(f"Unsupported correlation method: {method}")
+    return CorrelationAccumulator(columns, dtype=dtype).update(df).correlation()
+
+
+def accumulate_chunk(
+    pieces: list[tuple[Path, int]],
+    columns: list[str],
+    shift: np.ndarray,
+    dtype,
+    batch_size: int,
+) -> CorrelationAccumulator:
+    accumulator = CorrelationAccumulator(columns, shift, dtype)
+    for frame in iter_piece_frames(pieces, columns, batch_size):
+        accumulator.update(frame)
+    return accumulator
+
+
+def correlation_parquet(
+    path: Path,
+    columns: list[str] | None = None,
+    n_jobs: int = -1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dtype=np.float32,
+    shift=None,
+) -> CorrelationAccumulator:
+    """
+    Pearson accumulator over a parquet file or directory, counted in parallel by row group.
+
+    Every worker uses the same shift (`shift`, or the means of the first batch) so their
+    accumulators can be merged.
+    """
+    if columns is None:
+        columns = numerical_columns(parquet_dtypes(path))
+    pieces = parquet_pieces(path)
+    if shift is None:
+        first = next(iter_piece_frames(pieces[:1], columns, batch_size))
+        shift = CorrelationAccumulator(columns, dtype=dtype).update(first).shift
+    chunks = Parallel(n_jobs=n_jobs)(
+        delayed(accumulate_chunk)(chunk, columns, shift, dtype, batch_size)
+        for chunk in split_pieces(pieces, n_jobs)
+    )
+    accumulator = chunks[0]
+    for chunk in chunks[1:]:
+        accumulator.merge(chunk)
+    return accumulator
+
+
+def correlation_pairs(
+    matrix: pd.DataFrame,
+    threshold: float | None = None,
+    absolute: bool = False,
+    top_k: int | None = None,
+) -> pd.DataFrame:
+    """
+    Upper-triangle pairs of a correlation matrix in row-major order.
+
+    Args:
+        matrix (pd.DataFrame): Square correlation matrix.
+        threshold (float | None): Keep only pairs with |r| strictly above this.
+        absolute (bool): Report |r| instead of the signed correlation.
+        top_k (int | None): Keep only the `top_k` pairs with the largest |r|, strongest first.
+    """
+    values = matrix.to_numpy()
+    rows, cols = np.triu_indices(len(matrix), k=1)
+    corr = values[rows, cols]
+    strength = np.abs(corr)
+    if threshold is not None:
+        keep = np.flatnonzero(strength > threshold)
+        rows, cols, corr, strength = rows[keep], cols[keep], corr[keep], strength[keep]
+    if top_k is not None and top_k < len(corr):
+        # NaN pairs sort last.
+        order = np.argsort(-np.nan_to_num(strength, nan=-1.0), kind="stable")[:top_k]
+        rows, cols, corr, strength = rows[order], cols[order], corr[order], strength[order]
+    names = matrix.columns.to_numpy()
+    columns = [names[rows], names[cols], strength if absolute else corr]
+    return pd.DataFrame(dict(zip(PAIR_COLUMNS, columns)))
+
+
+# Contingency tables with at most this many cells are counted densely with `np.bincount`;
+# larger ones (high-cardinality pairs) only materialise their non-zero cells.
+DENSE_TABLE_CELLS = 1 << 22
+
+
+def categorical_columns(column_info: dict[str, str]) -> list[str]:
+    """
+    Text columns that are not identifiers; notebook 3.0's `select_dtypes("object")` minus
+    profile_id and account_no, independent of the pandas string dtype.
+    """
+    return [
+        column
+        for column, dtype in column_info.items()
+        if dtype_family(dtype) == "text" and classify_feature(column, dtype) != ROLE_IDENTIFIER
+    ]
+
+
+def factorize_columns(df: pd.DataFrame, columns: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """(n_rows, n_columns) int64 codes, -1 for missing, and each column's category count."""
+    codes = np.empty((len(df), len(columns)), dtype=np.int64)
+    n_categories = np.empty(len(columns), dtype=np.int64)
+    for i, column in enumerate(columns):
+        codes[:, i], uniques = pd.factorize(df[column])
+        n_categories[i] = len(uniques)
+    return codes, n_categories
+
+
+def cramers_v_pair(x: np.ndarray, y: np.ndarray, n_x: int, n_y: int, yates: bool = True) -> float:
+    """
+    Cramer's V of two code arrays, as notebook 3.0's `cramers_v` computes it from
+    `pd.crosstab` and `chi2_contingency`: rows missing either value are dropped, Yates'
+    correction applies to 2x2 tables, and V is 0 when either side has a single category.
+    """
+    valid = (x >= 0) & (y >= 0)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+    n = len(x)
+    if n == 0:
+        return np.nan
+    combined = x * n_y + y
+    if n_x * n_y <= DENSE_TABLE_CELLS:
+        table = np.bincount(combined, minlength=n_x * n_y).reshape(n_x, n_y)
+        table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+        n_rows, n_cols = table.shape
+        row_totals, col_totals = table.sum(axis=1), table.sum(axis=0)
+        cell_rows, cell_cols = np.nonzero(table)
+        observed = table[cell_rows, cell_cols].astype(np.float64)
+    else:
+        cells, observed = np.unique(combined, return_counts=True)
+        row_codes, row_index = np.unique(cells // n_y, return_inverse=True)
+        col_codes, col_index = np.unique(cells % n_y, return_inverse=True)
+        n_rows, n_cols = len(row_codes), len(col_codes)
+        row_totals = np.bincount(row_index, weights=observed, minlength=n_rows)
+        col_totals = np.bincount(col_index, weights=observed, minlength=n_cols)
+        cell_rows, cell_cols = row_index, col_index
+        observed = observed.astype(np.float64)
+    min_dim = min(n_rows, n_cols) - 1
+    if min_dim == 0:
+        return 0.0
+    if yates and n_rows == 2 and n_cols == 2:
+        # chi2_contingency's continuity correction for one degree of freedom: every cell moves
+        # up to 0.5 towards its expected count. The 2x2 table is tiny, so work on it densely.
+        table = np.zeros((2, 2))
+        table[cell_rows, cell_cols] = observed
+        expected = np.outer(row_totals, col_totals) / n
+        diff = expected - table
+        table = table + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+        chi2 = float(np.sum((table - expected) ** 2 / expected))
+    else:
+        expected = row_totals[cell_rows] * col_totals[cell_cols] / n
+        chi2 = float(n + np.sum((observed - expected) ** 2 / expected - expected))
+    return float(np.sqrt(max(chi2, 0.0) / (n * min_dim)))
+
+
+def cramers_v_row(
+    codes: np.ndarray, n_categories: np.ndarray, i: int, yates: bool = True
+) -> list[tuple[int, int, float]]:
+    """Cramer's V of column i with every column j >= i."""
+    return [
+        (i, j, cramers_v_pair(codes[:, i], codes[:, j], n_categories[i], n_categories[j], yates))
+        for j in range(i, codes.shape[1])
+    ]
+
+
+def cramers_v_matrix(
+    df: pd.DataFrame, columns: list[str] | None = None, n_jobs: int = 1, yates: bool = True
+) -> pd.DataFrame:
+    """
+    Symmetric Cramer's V matrix of `columns` (default: `categorical_columns`).
+
+    Each column is factorized once to integer codes; every unordered pair (and the diagonal)
+    is counted once with `np.bincount` on the combined codes. With `n_jobs` other than 1 the
+    rows of the upper triangle are spread over a process pool.
+    """
+    if columns is None:
+        columns = categorical_columns({c: str(t) for c, t in df.dtypes.items()})
+    codes, n_categories = factorize_columns(df, columns)
+    # Row i holds the len(columns) - i pairs with j >= i, so the longest tasks go first.
+    tasks = (delayed(cramers_v_row)(codes, n_categories, i, yates) for i in range(len(columns)))
+    rows = Parallel(n_jobs=n_jobs)(tasks)
+    matrix = np.full((len(columns), len(columns)), np.nan)
+    for row in rows:
+        for i, j, value in row:
+            matrix[i, j] = matrix[j, i] = value
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+
+def write_correlation_outputs(
+    matrix: pd.DataFrame,
+    output_dir: Path = REFERENCES_DIR,
+    threshold: float = HIGH_CORRELATION_THRESHOLD,
+) -> None:
+    """Writes the three notebook 3.0 correlation references."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    matrix.to_csv(output_dir / "numerical_correlation_matrix.csv")
+    high_pairs = correlation_pairs(matrix, threshold=threshold)
+    high_pairs.to_csv(output_dir / "highly_correlated_feature_pairs.csv", index=False)
+    all_pairs = correlation_pairs(matrix, absolute=True)
+    all_pairs.to_csv(output_dir / "all_numerical_correlation_pairs.csv", index=False)
+    logger.info(
+        f"{len(high_pairs)} of {len(all_pairs)} pairs have |r| > {threshold}; saved to {output_dir}"
+    )
+
+
+@app.command()
+def main(
+    input_path: Path = FEATURE_SELECTION_DATASET,
+    output_dir: Path = REFERENCES_DIR,
+    method: str = "pearson",
+    threshold: float = HIGH_CORRELATION_THRESHOLD,
+    float64: bool = typer.Option(False, help="Run the matrix products in float64."),
+    chunked: bool = typer.Option(
+        False, help="Stream parquet row groups in parallel instead of loading the table."
+    ),
+    state_path: Path | None = None,
+    n_jobs: int = -1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+):
+    """
+    Screens the numerical features for correlated pairs.
+
+    With `--state-path`, the Pearson accumulators are saved there; when the file already
+    exists the input is treated as new rows and added to the saved state instead of
+    rescanning the full table.
+    """
+    start = time.perf_counter()
+    dtype = np.float64 if float64 else np.float32
+    if method == "spearman":
+        if chunked or state_path is not None:
+            raise typer.BadParameter(
+                "Spearman ranks need every row at once; drop --chunked/--state-path."
+            )
+        columns = numerical_columns(parquet_dtypes(input_path))
+        df = pd.read_parquet(input_path, columns=columns)
+        matrix = correlation_matrix(df, columns, method="spearman", dtype=dtype)
+    else:
+        previous = None
+        if state_path is not None and state_path.exists():
+            previous = CorrelationAccumulator.load(state_path)
+            logger.info(f"Adding rows to {previous.n_rows:,} rows already in {state_path}")
+        columns = previous.columns if previous else numerical_columns(parquet_dtypes(input_path))
+        shift = previous.shift if previous else None
+        if chunked:
+            accumulator = correlation_parquet(
+                input_path, columns, n_jobs, batch_size, dtype=dtype, shift=shift
+            )
+        else:
+            df = pd.read_parquet(input_path, columns=columns)
+            accumulator = CorrelationAccumulator(columns, shift, dtype).update(df)
+        if previous:
+            accumulator = previous.merge(accumulator)
+        if state_path is not None:
+            accumulator.save(state_path)
+        matrix = accumulator.correlation()
+    write_correlation_outputs(matrix, output_dir, threshold)
+    logger.success(f"Correlation screen finished in {time.perf_counter() - start:.2f}s")
+
+
+@app.command()
+def cramers_v(
+    input_path: Path = FEATURE_SELECTION_DATASET,
+    output_path: Path = REFERENCES_DIR / "categorical_cramers_v_matrix.csv",
+    n_jobs: int = -1,
+):
+    """Computes the Cramer's V matrix of the categorical features."""
+    start = time.perf_counter()
+    columns = categorical_columns(parquet_dtypes(input_path))
+    df = pd.read_parquet(input_path, columns=columns)
+    matrix = cramers_v_matrix(df, columns, n_jobs=n_jobs)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    matrix.to_csv(output_path)
+    logger.success(
+        f"Cramer's V for {len(columns)} columns saved to {output_path} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -1,6 +1,29 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import time
+
+from joblib import Parallel, delayed
+import typer
+
+from bank_fraud.config import FEATURE_SCHEMA
+from bank_fraud.utils.feature_schema import (
+    ROLE_CATEGORICAL,
+    ROLE_IDENTIFIER,
+    ROLE_NUMERIC,
+    FeatureSchema,
+    classify_feature,
+)
+from bank_fraud.utils.parquet_chunks import (
+    DEFAULT_BATCH_SIZE,
+    iter_piece_frames,
+    parquet_dtypes,
+    parquet_pieces,
+    split_pieces,
+)
+from bank_fraud.utils.sketches import FrequentItems, HyperLogLog, KLLSketch, Moments, hash_values
+
+app = typer.Typer()
 
 # --- Helper Functions ---
 
@@ -190,61 +213,20 @@ def generate_business_description(feature_name, data_type):
     # Final fallback
     return f"Feature {feature_name} providing context for fraud detection and risk assessment"
 
-def partition_features(column_info):
+def partition_features(column_info, schema=None):
     """
     Partitions features into numeric, categorical, and identifier categories using business logic.
-    This function contains specific business logic and patterns.
-    For a truly generic solution, this part would need to be customized or provided by the user.
+    The patterns live in feature_schema, compiled into one regex; columns already in `schema`
+    keep their persisted role and any others are classified on the fly.
     """
-    numeric_features = []
-    categorical_features = []
-    identifier_features = []
-
-    identifier_patterns = [
-        'id', 'account_no', 'account_number', 'source_account_number', 'destination_account_number',
-        'full_name', 'username', 'cellphone', 'gr_card_no'
-    ]
-
-    binary_flag_patterns = [
-        'flag_', '_flag', '_status', 'carded_status', 'card_type', 'origination_type',
-        'origination_sub_type', 'orig_channel', 'orig_os', 'athena_fraud_tag', 'final_tag',
-        'dna_final_tag', 'fraud_types', 'fraud_channel_source', 'matching_level',
-        'imputed', '_imputed'
-    ]
-
-    categorical_patterns = [
-        'date_', 'datetime_', '_date', '_datetime', 'ticket_no', 'ops_comments',
-        'orig_', 'kiosk_', 'fila_', 'acc_mgmt_channel'
-    ]
-
-    explicit_numeric_features = [
-        'age_of_person', 'survival_days', 'account_age'
-    ]
-
+    roles = {ROLE_NUMERIC: [], ROLE_CATEGORICAL: [], ROLE_IDENTIFIER: []}
     for col_name, dtype in column_info.items():
-        col_lower = col_name.lower()
-
-        if col_name in explicit_numeric_features:
-            numeric_features.append(col_name)
-        elif any(pattern in col_lower for pattern in identifier_patterns):
-            identifier_features.append(col_name)
-        elif any(pattern in col_lower for pattern in binary_flag_patterns):
-            categorical_features.append(col_name)
-        elif dtype in ['object', 'datetime64[ns]']:
-            categorical_features.append(col_name)
-        elif any(pattern in col_lower for pattern in categorical_patterns):
-            categorical_features.append(col_name)
-        elif dtype in ['int64', 'float64']:
-            if 'txn_days_active_week' in col_lower:
-                numeric_features.append(col_name)
-            elif 'occurence' in col_lower or 'occurrence' in col_lower:
-                numeric_features.append(col_name)
-            else:
-                numeric_features.append(col_name)
+        if schema is not None and col_name in schema:
+            roles[schema.role(col_name)].append(col_name)
         else:
-            categorical_features.append(col_name)
+            roles[classify_feature(col_name, dtype)].append(col_name)
 
-    return numeric_features, categorical_features, identifier_features
+    return roles[ROLE_NUMERIC], roles[ROLE_CATEGORICAL], roles[ROLE_IDENTIFIER]
 
 def compute_numeric_metadata(df, numeric_features, column_info):
     """Compute comprehensive metadata for numeric features."""
@@ -357,6 +339,441 @@ def compute_identifier_metadata(df, identifier_features, column_info):
 
     return pd.DataFrame(metadata_list)
 
+# --- Single-pass Column Statistics ---
+
+DESCRIBE_PERCENTILES = (0.25, 0.5, 0.75)
+TOP_CATEGORIES = 10
+
+def is_object_like(series):
+    """True for text-like columns (object, string or category dtype)."""
+    return pd.api.types.is_object_dtype(series) or isinstance(series.dtype, (pd.StringDtype, pd.CategoricalDtype))
+
+def profile_column(series):
+    """
+    Computes every statistic the data dictionaries need from one full pass over a column.
+
+    Numeric, boolean and datetime columns are sorted once (datetimes through their int64
+    view), which is far cheaper than hashing them: nulls are whatever `dropna` removed,
+    distinct values are the changes along the sorted array, and min, max and quantiles are
+    read off its ends and order statistics. Other columns are hashed once with `nunique`.
+
+    Returns:
+        dict: n_rows, null_count, unique_count and sorted (the sorted non-null values, or
+        None for hashed columns).
+    """
+    n_rows = len(series)
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufM':
+        values = series.dropna().to_numpy()
+        if values.dtype.kind == 'M':
+            ordered = np.sort(values.view(np.int64)).view(values.dtype)
+        else:
+            ordered = np.sort(values)
+        unique_count = int(len(ordered) > 0) + int(np.count_nonzero(ordered[1:] != ordered[:-1]))
+        return {
+            'n_rows': n_rows,
+            'null_count': n_rows - len(ordered),
+            'unique_count': unique_count,
+            'sorted': ordered,
+        }
+    return {
+        'n_rows': n_rows,
+        'null_count': int(series.isna().sum()),
+        'unique_count': series.nunique(),
+        'sorted': None,
+    }
+
+def duplicate_count(profile):
+    """Equivalent of `Series.duplicated().sum()`: every repeat after the first, NaN included."""
+    has_null = profile['null_count'] > 0
+    return profile['n_rows'] - profile['unique_count'] - int(has_null)
+
+def describe_from_profile(series, profile):
+    """
+    `Series.describe()` statistics from a column's sorted non-null values.
+
+    Quantiles use the same linear interpolation as `np.percentile`, applied to the two order
+    statistics around each virtual index, so they match `describe()` exactly. Mean and std
+    are pandas' own vectorized reductions, so they also keep its summation order.
+    """
+    ordered = profile['sorted']
+    n = len(ordered)
+    stats = {'count': float(n), 'mean': np.nan, 'std': np.nan, 'min': np.nan}
+    stats.update({f"{q:.0%}": np.nan for q in DESCRIBE_PERCENTILES})
+    stats['max'] = np.nan
+    if n == 0:
+        return stats
+
+    stats['mean'] = series.mean()
+    stats['std'] = series.std()
+    stats['min'] = float(ordered[0])
+    stats['max'] = float(ordered[-1])
+    for q in DESCRIBE_PERCENTILES:
+        position = (n - 1) * q
+        below = int(np.floor(position))
+        above = min(below + 1, n - 1)
+        stats[f"{q:.0%}"] = float(np.quantile(ordered[[below, above]], position - below))
+    return stats
+
+def profile_numeric_metadata(df, numeric_features, column_info):
+    """`compute_numeric_metadata` with one pass per column (see `profile_column`)."""
+    metadata_list = []
+
+    for feature in numeric_features:
+        if feature not in df.columns:
+            continue
+
+        series = df[feature]
+        data_type = column_info.get(feature, str(series.dtype))
+        profile = profile_column(series)
+        describable = profile['sorted'] is not None and profile['sorted'].dtype.kind in 'iuf'
+        metadata = {
+            'feature_name': feature,
+            'data_type': data_type,
+            'description': generate_business_description(feature, data_type),
+            'null_count': profile['null_count'],
+            'unique_count': profile['unique_count']
+        }
+        if describable:
+            metadata.update(describe_from_profile(series, profile))
+
+        metadata_list.append(metadata)
+
+    if not metadata_list:
+        return pd.DataFrame(columns=['feature_name', 'data_type', 'description', 'null_count',
+                                    'unique_count', 'count', 'mean', 'std', 'min',
+                                    '25%', '50%', '75%', 'max'])
+
+    return pd.DataFrame(metadata_list)
+
+def profile_categorical_metadata(df, categorical_features, column_info):
+    """`compute_categorical_metadata` with one pass per column (see `profile_column`)."""
+    metadata_list = []
+
+    for feature in categorical_features:
+        if feature not in df.columns:
+            continue
+
+        series = df[feature]
+        data_type = column_info.get(feature, str(series.dtype))
+        profile = profile_column(series)
+        metadata = {
+            'feature_name': feature,
+            'data_type': data_type,
+            'description': generate_business_description(feature, data_type),
+            'null_count': profile['null_count'],
+            'unique_count': profile['unique_count']
+        }
+
+        if is_object_like(series):
+            metadata['other_categories_count'] = max(profile['unique_count'] - TOP_CATEGORIES, 0)
+        elif profile['unique_count'] > 0:
+            if profile['sorted'] is not None:
+                min_value, max_value = profile['sorted'][0], profile['sorted'][-1]
+            else:
+                min_value, max_value = series.min(), series.max()
+            is_datetime = pd.api.types.is_datetime64_any_dtype(series)
+            if is_datetime:
+                min_value, max_value = pd.Timestamp(min_value), pd.Timestamp(max_value)
+            metadata['min_value'] = min_value
+            metadata['max_value'] = max_value
+            if is_datetime:
+                metadata['date_range_days'] = (max_value - min_value).days
+            else:
+                metadata['value_range'] = float(np.subtract(max_value, min_value, dtype=np.float64))
+
+        metadata_list.append(metadata)
+
+    if not metadata_list:
+        return pd.DataFrame(columns=['feature_name', 'data_type', 'description',    'null_count', 'unique_count', 'min_value', 'max_value'])
+
+    return pd.DataFrame(metadata_list)
+
+def profile_identifier_metadata(df, identifier_features, column_info):
+    """`compute_identifier_metadata` with one hash of each column (see `profile_column`)."""
+    metadata_list = []
+
+    for feature in identifier_features:
+        if feature not in df.columns:
+            continue
+
+        series = df[feature]
+        data_type = column_info.get(feature, str(series.dtype))
+        profile = profile_column(series)
+        metadata = {
+            'feature_name': feature,
+            'data_type': data_type,
+            'description': generate_business_description(feature, data_type),
+            'null_count': profile['null_count'],
+            'unique_count': profile['unique_count'],
+            'total_count': len(df),
+            'uniqueness_ratio': profile['unique_count'] / len(df) if len(df) > 0 else 0
+        }
+
+        metadata['duplicate_count'] = duplicate_count(profile)
+        metadata['is_primary_key'] = metadata['duplicate_count'] == 0 and metadata['null_count'] == 0
+
+        metadata_list.append(metadata)
+
+    if not metadata_list:
+        return pd.DataFrame(columns=['feature_name', 'data_type', 'description', 'null_count',
+                                    'unique_count', 'total_count', 'uniqueness_ratio',
+                                    'duplicate_count', 'is_primary_key'])
+
+    return pd.DataFrame(metadata_list)
+
+def compare_data_dictionaries(expected, actual, rtol=1e-9):
+    """
+    Checks that two data dictionaries agree: identical columns and row order, exact values
+    for every non-float column and `rtol` for the float statistics.
+
+    Raises:
+        AssertionError: Naming the first column that differs.
+    """
+    if list(expected.columns) != list(actual.columns):
+        raise AssertionError(f"Columns differ: {list(expected.columns)} vs {list(actual.columns)}")
+    if len(expected) != len(actual):
+        raise AssertionError(f"Row counts differ: {len(expected)} vs {len(actual)}")
+    for column in expected.columns:
+        left, right = expected[column], actual[column]
+        if pd.api.types.is_float_dtype(left) and pd.api.types.is_float_dtype(right):
+            matches = np.isclose(left, right, rtol=rtol, atol=0, equal_nan=True).all()
+        else:
+            matches = left.astype(str).equals(right.astype(str))
+        if not matches:
+            raise AssertionError(f"Column '{column}' differs between the data dictionaries")
+
+def benchmark_data_dictionary(df):
+    """
+    Times the per-metric `compute_*_metadata` functions against the single-pass `profile_*`
+    versions on `df` and checks that both produce the same dictionaries.
+
+    Returns:
+        pd.DataFrame: Seconds per dictionary for each implementation, with the speed-up.
+    """
+    column_info = {col: str(df[col].dtype) for col in df.columns}
+    numeric_features, categorical_features, identifier_features = partition_features(column_info)
+    pairs = [
+        ('numeric', compute_numeric_metadata, profile_numeric_metadata, numeric_features),
+        ('categorical', compute_categorical_metadata, profile_categorical_metadata, categorical_features),
+        ('identifier', compute_identifier_metadata, profile_identifier_metadata, identifier_features),
+    ]
+
+    rows = []
+    for name, legacy, single_pass, features in pairs:
+        start = time.perf_counter()
+        expected = legacy(df, features, column_info)
+        legacy_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = single_pass(df, features, column_info)
+        single_pass_seconds = time.perf_counter() - start
+        compare_data_dictionaries(expected, actual)
+        rows.append({
+            'dictionary': name,
+            'features': len(features),
+            'legacy_seconds': legacy_seconds,
+            'single_pass_seconds': single_pass_seconds,
+            'speedup': legacy_seconds / single_pass_seconds,
+        })
+    return pd.DataFrame(rows)
+
+# --- Sketch Mode ---
+
+class ColumnSketch:
+    """
+    Bounded-memory, mergeable summary of one column for the sketch-mode dictionaries.
+
+    Row and null counts are exact and `unique_count` comes from a HyperLogLog. The `kind`
+    decides what else is kept:
+        numeric: exact moments, min and max plus a KLL sketch for the quartiles.
+        ordered: exact min and max (numeric, boolean or datetime categoricals).
+        text: Misra-Gries counters for the most frequent categories.
+        identifier: nothing else.
+    """
+
+    def __init__(self, kind, precision=14, k=2048):
+        self.kind = kind
+        self.n_rows = 0
+        self.null_count = 0
+        self.distinct = HyperLogLog(precision)
+        self.moments = Moments() if kind == 'numeric' else None
+        self.quartiles = KLLSketch(k) if kind == 'numeric' else None
+        self.frequent = FrequentItems() if kind == 'text' else None
+        self.min_value = None
+        self.max_value = None
+
+    def update(self, series):
+        non_null = series.dropna()
+        self.n_rows += len(series)
+        self.null_count += len(series) - len(non_null)
+        if len(non_null) == 0:
+            return
+
+        values = non_null.to_numpy()
+        if self.kind in ('numeric', 'ordered') and values.dtype.kind != 'M':
+            # Batches of an integer column turn float when they contain nulls; hash one form.
+            hashed = values.astype(np.float64)
+        else:
+            hashed = values
+        self.distinct.add_hashes(hash_values(hashed, categorize=self.kind != 'identifier'))
+
+        if self.kind == 'numeric':
+            self.moments.update(hashed)
+            self.quartiles.update(hashed)
+        if self.kind in ('numeric', 'ordered'):
+            self._extend_range(values.min(), values.max())
+        if self.kind == 'text':
+            self.frequent.update(non_null)
+
+    def merge(self, other):
+        self.n_rows += other.n_rows
+        self.null_count += other.null_count
+        self.distinct.merge(other.distinct)
+        if self.moments is not None:
+            self.moments.merge(other.moments)
+            self.quartiles.merge(other.quartiles)
+        if self.frequent is not None:
+            self.frequent.merge(other.frequent)
+        if other.min_value is not None:
+            self._extend_range(other.min_value, other.max_value)
+        return self
+
+    def _extend_range(self, low, high):
+        self.min_value = low if self.min_value is None else min(self.min_value, low)
+        self.max_value = high if self.max_value is None else max(self.max_value, high)
+
+    @property
+    def unique_count(self):
+        """HyperLogLog estimate, capped at the number of non-null values."""
+        return round(min(self.distinct.estimate(), self.n_rows - self.null_count))
+
+def sketch_kinds(numeric_features, categorical_features, identifier_features, column_info):
+    """Maps each dictionary feature to the `ColumnSketch` kind its metrics need."""
+    kinds = {}
+    for feature in numeric_features:
+        dtype = pd.api.types.pandas_dtype(column_info[feature])
+        describable = pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+        kinds[feature] = 'numeric' if describable else 'identifier'
+    for feature in categorical_features:
+        dtype = pd.api.types.pandas_dtype(column_info[feature])
+        text = pd.api.types.is_object_dtype(dtype) or isinstance(dtype, (pd.StringDtype, pd.CategoricalDtype))
+        kinds[feature] = 'text' if text else 'ordered'
+    for feature in identifier_features:
+        kinds[feature] = 'identifier'
+    return kinds
+
+def sketch_frames(frames, kinds, precision=14, k=2048):
+    """Folds an iterable of DataFrames into one `ColumnSketch` per feature."""
+    sketches = {feature: ColumnSketch(kind, precision, k) for feature, kind in kinds.items()}
+    for frame in frames:
+        for feature, sketch in sketches.items():
+            sketch.update(frame[feature])
+    return sketches
+
+def sketch_parquet_chunk(pieces, kinds, batch_size=DEFAULT_BATCH_SIZE, precision=14, k=2048):
+    """Sketches one worker's row groups, holding at most one record batch in memory."""
+    frames = iter_piece_frames(pieces, list(kinds), batch_size)
+    return sketch_frames(frames, kinds, precision, k)
+
+def merge_sketches(parts):
+    """Merges per-worker {feature: ColumnSketch} results into the first one."""
+    merged = parts[0]
+    for part in parts[1:]:
+        for feature, sketch in part.items():
+            merged[feature].merge(sketch)
+    return merged
+
+def sketch_parquet(path, kinds, n_jobs=-1, batch_size=DEFAULT_BATCH_SIZE, precision=14, k=2048):
+    """
+    Streams the row groups of a parquet file (or directory of them) through one
+    `ColumnSketch` per feature in a process pool and merges the partial sketches.
+    """
+    chunks = split_pieces(parquet_pieces(Path(path)), n_jobs)
+    parts = Parallel(n_jobs=n_jobs)(
+        delayed(sketch_parquet_chunk)(chunk, kinds, batch_size, precision, k) for chunk in chunks
+    )
+    return merge_sketches(parts)
+
+def sketch_data_dictionaries(sketches, numeric_features, categorical_features, identifier_features, column_info, top_n=TOP_CATEGORIES):
+    """
+    Builds the numeric, categorical and identifier dictionaries from column sketches, in
+    the same layout as the exact dictionaries, plus a table of each text feature's most
+    frequent categories.
+
+    Counts, nulls, min, max, mean and std are exact. unique_count (and the duplicate and
+    other-category counts derived from it) is a HyperLogLog estimate, the quartiles come
+    from a KLL sketch and the top-category counts are Misra-Gries lower bounds. An
+    identifier is reported as a primary key when it has no nulls and its estimated
+    duplicates are within three standard errors of the distinct-count sketch.
+
+    Returns:
+        tuple: (numeric_df, categorical_df, identifier_df, top_categories_df)
+    """
+    def base_metadata(feature, sketch):
+        data_type = column_info[feature]
+        return {
+            'feature_name': feature,
+            'data_type': data_type,
+            'description': generate_business_description(feature, data_type),
+            'null_count': sketch.null_count,
+            'unique_count': sketch.unique_count
+        }
+
+    numeric_list = []
+    for feature in numeric_features:
+        if feature not in sketches:
+            continue
+        sketch = sketches[feature]
+        metadata = base_metadata(feature, sketch)
+        if sketch.kind == 'numeric':
+            moments = sketch.moments
+            quartiles = sketch.quartiles.quantiles(DESCRIBE_PERCENTILES)
+            metadata.update({'count': float(moments.count), 'mean': moments.mean if moments.count else np.nan, 'std': moments.std, 'min': moments.min})
+            metadata.update({f"{q:.0%}": float(value) for q, value in zip(DESCRIBE_PERCENTILES, quartiles)})
+            metadata['max'] = moments.max
+        numeric_list.append(metadata)
+
+    categorical_list, top_rows = [], []
+    for feature in categorical_features:
+        if feature not in sketches:
+            continue
+        sketch = sketches[feature]
+        metadata = base_metadata(feature, sketch)
+        if sketch.kind == 'text':
+            metadata['other_categories_count'] = max(sketch.unique_count - top_n, 0)
+            for rank, (category, count) in enumerate(sketch.frequent.top(top_n).items(), start=1):
+                top_rows.append({'feature_name': feature, 'rank': rank, 'category': category, 'count_lower_bound': count})
+        elif sketch.min_value is not None:
+            min_value, max_value = sketch.min_value, sketch.max_value
+            if pd.api.types.is_datetime64_any_dtype(pd.api.types.pandas_dtype(column_info[feature])):
+                min_value, max_value = pd.Timestamp(min_value), pd.Timestamp(max_value)
+                metadata.update({'min_value': min_value, 'max_value': max_value})
+                metadata['date_range_days'] = (max_value - min_value).days
+            else:
+                metadata.update({'min_value': min_value, 'max_value': max_value})
+                metadata['value_range'] = float(np.subtract(max_value, min_value, dtype=np.float64))
+        categorical_list.append(metadata)
+
+    identifier_list = []
+    for feature in identifier_features:
+        if feature not in sketches:
+            continue
+        sketch = sketches[feature]
+        metadata = base_metadata(feature, sketch)
+        n_rows = sketch.n_rows
+        metadata['total_count'] = n_rows
+        metadata['uniqueness_ratio'] = metadata['unique_count'] / n_rows if n_rows > 0 else 0
+        duplicates = n_rows - metadata['unique_count'] - int(sketch.null_count > 0)
+        metadata['duplicate_count'] = duplicates
+        tolerance = 3 * sketch.distinct.standard_error * (n_rows - sketch.null_count)
+        metadata['is_primary_key'] = sketch.null_count == 0 and duplicates <= tolerance
+        identifier_list.append(metadata)
+
+    numeric_df = pd.DataFrame(numeric_list) if numeric_list else pd.DataFrame(columns=['feature_name', 'data_type', 'description', 'null_count', 'unique_count', 'count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+    categorical_df = pd.DataFrame(categorical_list) if categorical_list else pd.DataFrame(columns=['feature_name', 'data_type', 'description', 'null_count', 'unique_count', 'min_value', 'max_value'])
+    identifier_df = pd.DataFrame(identifier_list) if identifier_list else pd.DataFrame(columns=['feature_name', 'data_type', 'description', 'null_count', 'unique_count', 'total_count', 'uniqueness_ratio', 'duplicate_count', 'is_primary_key'])
+    top_categories_df = pd.DataFrame(top_rows, columns=['feature_name', 'rank', 'category', 'count_lower_bound'])
+    return numeric_df, categorical_df, identifier_df, top_categories_df
+
 def export_data_dictionaries(numeric_df, categorical_df, identifier_df, output_base_path):
     """Export data dictionaries as CSV files to a specified base path."""
     output_base_path.mkdir(parents=True, exist_ok=True)
@@ -375,24 +792,61 @@ def export_data_dictionaries(numeric_df, categorical_df, identifier_df, output_b
 
 # --- Main Pipeline Function ---
 
-def run_data_dictionary_pipeline(df: pd.DataFrame, output_dir_name: str = "data_dictionaries"):
+def run_data_dictionary_pipeline(df, output_dir_name: str = "data_dictionaries", single_pass: bool = True, sketch: bool = False, n_jobs: int = -1, schema_path: Path | None = FEATURE_SCHEMA):
     """
     Runs the data dictionary generation pipeline.
 
     Args:
-        df (pd.DataFrame): The input DataFrame.
+        df (pd.DataFrame | Path): The input DataFrame. In sketch mode this may instead be a
+                                  parquet file or directory, streamed by row group.
         output_dir_name (str): The name of the directory to save the data dictionaries.
                                 This directory will be created relative to the project root.
+        single_pass (bool): Use the single-pass `profile_*` statistics (default) instead of
+                            the per-metric `compute_*` functions.
+        sketch (bool): Use bounded-memory sketches (see `sketch_data_dictionaries`) and also
+                       export categorical_top_categories.csv.
+        n_jobs (int): Worker processes when sketching a parquet input; -1 uses every core.
+        schema_path (Path | None): Persisted feature schema. When it exists the input dtypes
+                                   are validated against it and its roles are reused;
+                                   otherwise (or with None) every column is classified
+                                   afresh. The schema is only read here; it is written by
+                                   `python -m bank_fraud.utils.feature_schema build`.
     Returns:
         Path: The path to the directory where data dictionaries were exported.
     """
-    column_info = {col: str(df[col].dtype) for col in df.columns}
-
-    numeric_features, categorical_features, identifier_features = partition_features(column_info)
-
-    numeric_df = compute_numeric_metadata(df, numeric_features, column_info)
-    categorical_df = compute_categorical_metadata(df, categorical_features, column_info)
-    identifier_df = compute_identifier_metadata(df, identifier_features, column_info)
+    if isinstance(df, (str, Path)):
+        if not sketch:
+            raise ValueError("Parquet inputs are only streamed in sketch mode; load them first.")
+        column_info = parquet_dtypes(Path(df))
+    else:
+        column_info = {col: str(df[col].dtype) for col in df.columns}
+
+    schema = None
+    if schema_path is not None and schema_path.exists():
+        schema = FeatureSchema.load(schema_path)
+        schema.validate(column_info, columns=[col for col in column_info if col in schema])
+
+    numeric_features, categorical_features, identifier_features = partition_features(column_info, schema)
+
+    top_categories_df = None
+    if sketch:
+        kinds = sketch_kinds(numeric_features, categorical_features, identifier_features, column_info)
+        if isinstance(df, (str, Path)):
+            sketches = sketch_parquet(df, kinds, n_jobs=n_jobs)
+        else:
+            batches = (df.iloc[start:start + DEFAULT_BATCH_SIZE] for start in range(0, len(df), DEFAULT_BATCH_SIZE))
+            sketches = sketch_frames(batches, kinds)
+        numeric_df, categorical_df, identifier_df, top_categories_df = sketch_data_dictionaries(
+            sketches, numeric_features, categorical_features, identifier_features, column_info
+        )
+    elif single_pass:
+        numeric_df = profile_numeric_metadata(df, numeric_features, column_info)
+        categorical_df = profile_categorical_metadata(df, categorical_features, column_info)
+        identifier_df = profile_identifier_metadata(df, identifier_features, column_info)
+    else:
+        numeric_df = compute_numeric_metadata(df, numeric_features, column_info)
+        categorical_df = compute_categorical_metadata(df, categorical_features, column_info)
+        identifier_df = compute_identifier_metadata(df, identifier_features, column_info)
 
     # Determine project root dynamically relative to this script's location
     # Assuming this utility is in 'project_root/notebooks/to_be_deleted/'
@@ -402,5 +856,23 @@ def run_data_dictionary_pipeline(df: pd.DataFrame, output_dir_name: str = "data_
     output_path = project_root / output_dir_name
 
     exported_path = export_data_dictionaries(numeric_df, categorical_df, identifier_df, output_path)
+    if top_categories_df is not None:
+        top_categories_df.to_csv(output_path / "categorical_top_categories.csv", index=False)
 
     return exported_path
+
+@app.command()
+def benchmark(input_path: Path):
+    """Benchmarks and cross-checks the single-pass statistics on a parquet file."""
+    df = pd.read_parquet(input_path)
+    print(benchmark_data_dictionary(df).to_string(index=False))
+
+@app.command()
+def sketch(input_path: Path, output_dir_name: str = "references", n_jobs: int = -1):
+    """Regenerates the data dictionaries from a parquet extract in sketch mode."""
+    start = time.perf_counter()
+    exported_path = run_data_dictionary_pipeline(input_path, output_dir_name, sketch=True, n_jobs=n_jobs)
+    print(f"Sketched data dictionaries written to {exported_path} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,302 @@
+from datetime import datetime, timezone
+from functools import cache
+import hashlib
+import json
+from pathlib import Path
+import re
+
+from loguru import logger
+import pandas as pd
+import typer
+
+from bank_fraud.config import FEATURE_SCHEMA, FEATURE_SELECTION_DATASET, TARGET_COL
+from bank_fraud.utils.parquet_chunks import parquet_dtypes
+
+app = typer.Typer()
+
+# Bump when the layout of the persisted schema changes.
+FEATURE_SCHEMA_VERSION = 1
+
+ROLE_NUMERIC = "numeric"
+ROLE_CATEGORICAL = "categorical"
+ROLE_IDENTIFIER = "identifier"
+
+IDENTIFIER_PATTERNS = [
+    "id",
+    "account_no",
+    "account_number",
+    "source_account_number",
+    "destination_account_number",
+    "full_name",
+    "username",
+    "cellphone",
+    "gr_card_no",
+]
+
+BINARY_FLAG_PATTERNS = [
+    "flag_",
+    "_flag",
+    "_status",
+    "carded_status",
+    "card_type",
+    "origination_type",
+    "origination_sub_type",
+    "orig_channel",
+    "orig_os",
+    "athena_fraud_tag",
+    "final_tag",
+    "dna_final_tag",
+    "fraud_types",
+    "fraud_channel_source",
+    "matching_level",
+    "imputed",
+    "_imputed",
+]
+
+CATEGORICAL_PATTERNS = [
+    "date_",
+    "datetime_",
+    "_date",
+    "_datetime",
+    "ticket_no",
+    "ops_comments",
+    "orig_",
+    "kiosk_",
+    "fila_",
+    "acc_mgmt_channel",
+]
+
+EXPLICIT_NUMERIC_FEATURES = ["age_of_person", "survival_days", "account_age"]
+
+# Only these dtypes make an otherwise unmatched column numeric.
+NUMERIC_DTYPES = ("int64", "float64")
+
+
+def _contains_any(patterns: list[str]) -> str:
+    return "(?=.*?(?:" + "|".join(re.escape(p) for p in patterns) + "))"
+
+
+# One anchored regex over the lower-cased name. Each alternative is a lookahead over the
+# whole name and they are tried in rule order, so the first rule class with a substring hit
+# wins (as the original if/elif chain did), not the leftmost hit in the name. Flag and
+# categorical patterns share an alternative because both always mean categorical.
+NAME_RULES = re.compile(
+    f"^(?:{_contains_any(IDENTIFIER_PATTERNS)}(?P<{ROLE_IDENTIFIER}>)"
+    f"|{_contains_any(BINARY_FLAG_PATTERNS + CATEGORICAL_PATTERNS)}(?P<{ROLE_CATEGORICAL}>))"
+)
+
+# Fingerprint of the rules above; a persisted schema built under other rules is stale.
+RULES_FINGERPRINT = hashlib.sha256(
+    json.dumps(
+        [
+            IDENTIFIER_PATTERNS,
+            BINARY_FLAG_PATTERNS,
+            CATEGORICAL_PATTERNS,
+            EXPLICIT_NUMERIC_FEATURES,
+            NUMERIC_DTYPES,
+        ]
+    ).encode()
+).hexdigest()[:16]
+
+
+@cache
+def classify_feature(name: str, dtype: str) -> str:
+    """Dictionary role of one column: numeric, categorical or identifier."""
+    if name in EXPLICIT_NUMERIC_FEATURES:
+        return ROLE_NUMERIC
+    match = NAME_RULES.match(name.lower())
+    if match:
+        return match.lastgroup
+    return ROLE_NUMERIC if dtype in NUMERIC_DTYPES else ROLE_CATEGORICAL
+
+
+def dtype_family(dtype) -> str:
+    """
+    Coarse dtype class used for validation: numeric, bool, datetime or text.
+
+    Variations that readers introduce on their own (int vs float when nulls appear, datetime
+    units, object vs pandas string) stay within one family.
+    """
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    if (
+        pd.api.types.is_object_dtype(dtype)
+        or pd.api.types.is_string_dtype(dtype)
+        or isinstance(dtype, pd.CategoricalDtype)
+    ):
+        return "text"
+    return str(dtype)
+
+
+class FeatureSchema:
+    """
+    Versioned column -> (dtype, role) map shared by the dictionary generator, training and
+    scoring, so the column split is computed once and every entry point can check its
+    input against it.
+
+    Attributes:
+        columns (dict[str, dict]): {column: {"dtype": str, "role": str}} in column order.
+        rules_fingerprint (str): RULES_FINGERPRINT of the rules the roles came from.
+    """
+
+    def __init__(
+        self,
+        columns: dict[str, dict],
+        rules_fingerprint: str = RULES_FINGERPRINT,
+        created_at: str | None = None,
+    ):
+        self.columns = columns
+        self.rules_fingerprint = rules_fingerprint
+        self.created_at = created_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    @classmethod
+    def from_dtypes(cls, column_info: dict[str, str]) -> "FeatureSchema":
+        """Classifies every column of a {column: dtype name} map."""
+        return cls(
+            {
+                column: {"dtype": dtype, "role": classify_feature(column, dtype)}
+                for column, dtype in column_info.items()
+            }
+        )
+
+    @classmethod
+    def load(cls, path: Path = FEATURE_SCHEMA) -> "FeatureSchema":
+        payload = json.loads(path.read_text())
+        version = payload.get("schema_version")
+        if version != FEATURE_SCHEMA_VERSION:
+            raise ValueError(
+                f"{path} has feature schema version {version}; expected {FEATURE_SCHEMA_VERSION}."
+            )
+        schema = cls(payload["columns"], payload["rules_fingerprint"], payload["created_at"])
+        if schema.rules_fingerprint != RULES_FINGERPRINT:
+            logger.warning(
+                f"{path} was built with different partition rules; rebuild it with "
+                "`python -m bank_fraud.utils.feature_schema build`."
+            )
+        return schema
+
+    def save(self, path: Path = FEATURE_SCHEMA) -> None:
+        payload = {
+            "schema_version": FEATURE_SCHEMA_VERSION,
+            "rules_fingerprint": self.rules_fingerprint,
+            "created_at": self.created_at,
+            "columns": self.columns,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload, indent=2) + "\n")
+        logger.info(f"Saved feature schema for {len(self.columns)} columns to {path}")
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def role(self, column: str) -> str:
+        return self.columns[column]["role"]
+
+    def partition(self, columns=None) -> tuple[list[str], list[str], list[str]]:
+        """
+        (numeric, categorical, identifier) column lists, in the order of `columns`
+        (default: every schema column). Columns missing from the schema are skipped.
+        """
+        groups = {ROLE_NUMERIC: [], ROLE_CATEGORICAL: [], ROLE_IDENTIFIER: []}
+        for column in self.columns if columns is None else columns:
+            if column in self.columns:
+                groups[self.role(column)].append(column)
+        return groups[ROLE_NUMERIC], groups[ROLE_CATEGORICAL], groups[ROLE_IDENTIFIER]
+
+    def model_feature_split(
+        self, columns=None, target_col: str = TARGET_COL
+    ) -> tuple[list[str], list[str], list[str]]:
+        """
+        (numerical, categorical, passthrough) model inputs as split in notebook 5.0:
+        identifiers and the target are dropped, then numeric dtypes go to the scaler, text
+        dtypes to the one-hot encoder and bool columns pass through unchanged.
+
+        Raises:
+            ValueError: If a column is of any other dtype family (e.g. datetime), which the
+                model cannot take.
+        """
+        groups = {"numeric": [], "text": [], "bool": []}
+        unsupported = []
+        for column in self.columns if columns is None else columns:
+            if column == target_col or column not in self or self.role(column) == ROLE_IDENTIFIER:
+                continue
+            family = dtype_family(self.columns[column]["dtype"])
+            if family in groups:
+                groups[family].append(column)
+            else:
+                unsupported.append(f"{column} ({family})")
+        if unsupported:
+            raise ValueError(
+                "Columns that are neither numeric, text nor bool cannot be model inputs: "
+                + ", ".join(unsupported)
+            )
+        return groups["numeric"], groups["text"], groups["bool"]
+
+    def dtype_mismatches(self, column_info: dict[str, str], columns=None) -> list[str]:
+        """Human-readable problems between `column_info` and the schema for `columns`."""
+        problems = []
+        for column in column_info if columns is None else columns:
+            if column not in self.columns:
+                problems.append(f"{column}: not in the feature schema")
+            elif column not in column_info:
+                problems.append(f"{column}: missing from the input")
+            else:
+                expected = self.columns[column]["dtype"]
+                actual = column_info[column]
+                if dtype_family(expected) != dtype_family(actual):
+                    problems.append(f"{column}: dtype {actual}, schema has {expected}")
+        return problems
+
+    def validate(self, column_info: dict[str, str], columns=None) -> None:
+        """
+        Checks input dtypes against the schema. Only dtype metadata is compared, so this is
+        cheap enough to run at every entry point's start-up.
+
+        Raises:
+            ValueError: Listing every missing, unknown or mismatched column.
+        """
+        problems = self.dtype_mismatches(column_info, columns)
+        if problems:
+            raise ValueError(
+                "Input does not match the feature schema:\n  " + "\n  ".join(problems)
+            )
+
+
+def frame_dtypes(df: pd.DataFrame) -> dict[str, str]:
+    return {column: str(dtype) for column, dtype in df.dtypes.items()}
+
+
+def load_feature_schema(path: Path = FEATURE_SCHEMA) -> FeatureSchema | None:
+    """The persisted schema, or None (with a warning) when it has not been built yet."""
+    if not path.exists():
+        logger.warning(f"No feature schema at {path}; input dtypes will not be validated.")
+        return None
+    return FeatureSchema.load(path)
+
+
+@app.command()
+def build(input_path: Path = FEATURE_SELECTION_DATASET, schema_path: Path = FEATURE_SCHEMA):
+    """Classifies every column of a parquet table and saves the feature schema."""
+    schema = FeatureSchema.from_dtypes(parquet_dtypes(input_path))
+    schema.save(schema_path)
+    numeric, categorical, identifier = schema.partition()
+    logger.success(
+        f"{len(numeric)} numeric, {len(categorical)} categorical, {len(identifier)} identifier"
+    )
+
+
+@app.command()
+def validate(input_path: Path, schema_path: Path = FEATURE_SCHEMA):
+    """Checks a parquet table's dtypes against the feature schema."""
+    column_info = parquet_dtypes(input_path)
+    FeatureSchema.load(schema_path).validate(column_info)
+    logger.success(f"{len(column_info)} columns match the feature schema.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,527 @@
+from pathlib import Path
+import time
+
+from joblib import Parallel, delayed
+from loguru import logger
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import typer
+
+from bank_fraud.config import FEATURE_SELECTION_DATASET, IV_DETAILS_DIR, IV_STORE, TARGET_COL
+from bank_fraud.utils.binning import CompiledBins
+from bank_fraud.utils.iv_store import export_csvs, write_iv_store
+from bank_fraud.utils.mask_iv_details import mask_iv_categories
+from bank_fraud.utils.numerical_binning_definitions import BINNING_DEFINITIONS
+from bank_fraud.utils.parquet_chunks import (
+    DEFAULT_BATCH_SIZE,
+    iter_piece_frames,
+    parquet_pieces,
+    split_pieces,
+)
+
+# Categorical features screened with the zero-safe WoE formula in notebook 3.0.
+CATEGORICAL_IV_FEATURES = [
+    "orig_channel",
+    "orig_os",
+    "origination_type",
+    "origination_sub_type",
+    "carded_status",
+    "card_type",
+    "orig_primary_source_of_funds",
+    "orig_industry",
+    "orig_occupation",
+    "athena_fraud_tag",
+    "acc_mgmt_channel",
+    "first_kiosk_interaction_organisation_site_name",
+    "first_kiosk_interaction_organisation_presence_category",
+    "first_kiosk_interaction_organisation_name",
+    "first_kiosk_interaction_kiosk_interaction_type",
+    "latest_kiosk_interaction_organisation_site_name",
+    "latest_kiosk_interaction_organisation_presence_category",
+    "latest_kiosk_interaction_organisation_name",
+    "latest_kiosk_interaction_kiosk_interaction_type",
+    "first_fila_bank_code",
+    "final_tag",
+    "dna_final_tag",
+    "fraud_types",
+    "fraud_channel_source",
+    "matching_level",
+    "change_email_flag",
+    "change_mob_num_flag",
+    "flag_txn_dropoff_after_wk1",
+]
+
+app = typer.Typer()
+
+# Notebook 2.0's output has no binary target; notebook 3.0 derives it from the final tag.
+TARGET_SOURCE_COL = "dna_final_tag"
+FRAUD_TAG = "CONFIRMED_FRAUD"
+
+# Numerical bins replace empty percentages with this epsilon before taking the log.
+NUMERICAL_EPSILON = 1e-6
+
+IV_DETAIL_COLUMNS = [
+    "Category",
+    "CONFIRMED_FRAUD",
+    "NON_FRAUD",
+    "Grand Total",
+    "Share",
+    "PercentBad",
+    "PercentGood",
+    "WoE",
+    "IV",
+]
+
+
+def get_predictive_power(iv: float) -> str:
+    """Rule-of-thumb strength bucket for a feature's total IV."""
+    if iv < 0.02:
+        return "INSIGNIFICANT - Not Useful"
+    elif iv < 0.1:
+        return "Weak"
+    elif iv < 0.3:
+        return "Medium"
+    elif iv < 0.5:
+        return "Strong"
+    else:
+        return "Suspicious - Too good to be true"
+
+
+def categorical_codes(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Integer codes and sorted categories for a categorical column.
+
+    Missing values get code -1 and are left out of the counts, as `pd.crosstab` drops them.
+    """
+    codes, categories = pd.factorize(values, sort=True)
+    return codes, np.asarray(categories)
+
+
+def numerical_codes(values: pd.Series, rules: list) -> tuple[np.ndarray, np.ndarray]:
+    """Integer codes and labels for a numerical column binned with its compiled rules."""
+    bins = CompiledBins(rules)
+    codes = bins.codes(values.to_numpy(dtype=np.float64, na_value=np.nan))
+    return codes.astype(np.intp), np.asarray(bins.labels, dtype=object)
+
+
+def bin_counts(
+    codes: np.ndarray, is_bad: np.ndarray, n_categories: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Row and fraud counts per code with two `np.bincount` calls; code -1 is skipped."""
+    observed = codes >= 0
+    totals = np.bincount(codes[observed], minlength=n_categories)
+    bad = np.bincount(codes[observed & is_bad], minlength=n_categories)
+    return totals, bad
+
+
+def woe_iv_from_counts(
+    categories: np.ndarray,
+    totals: np.ndarray,
+    bad: np.ndarray,
+    total_good: int,
+    total_bad: int,
+    n_rows: int,
+    numerical: bool,
+) -> pd.DataFrame:
+    """
+    Builds one feature's WoE/IV detail table from per-category row and fraud counts.
+
+    Rows follow `pd.crosstab` conventions: only observed categories, sorted by category.
+    Categorical tables use WoE = 0 when either share is 0; numerical tables replace empty
+    shares with NUMERICAL_EPSILON, as in notebook 3.0.
+    """
+    keep = np.flatnonzero(totals)
+    if numerical:
+        keep = keep[np.argsort(categories[keep].astype(str), kind="stable")]
+    bad, totals, categories = bad[keep], totals[keep], categories[keep]
+    good = totals - bad
+
+    pct_good = good / total_good
+    pct_bad = bad / total_bad
+    if numerical:
+        pct_good = np.where(pct_good == 0, NUMERICAL_EPSILON, pct_good)
+        pct_bad = np.where(pct_bad == 0, NUMERICAL_EPSILON, pct_bad)
+        woe = np.log(pct_good / pct_bad)
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            woe = np.where((pct_good == 0) | (pct_bad == 0), 0, np.log(pct_good / pct_bad))
+    iv = (pct_good - pct_bad) * woe
+
+    return pd.DataFrame(
+        {
+            "Category": categories,
+            "CONFIRMED_FRAUD": bad,
+            "NON_FRAUD": good,
+            "Grand Total": totals,
+            "Share": totals / n_rows,
+            "PercentBad": pct_bad,
+            "PercentGood": pct_good,
+            "WoE": woe,
+            "IV": iv,
+        }
+    )
+
+
+def woe_iv_table(
+    codes: np.ndarray,
+    categories: np.ndarray,
+    is_bad: np.ndarray,
+    total_good: int,
+    total_bad: int,
+    n_rows: int,
+    numerical: bool,
+) -> pd.DataFrame:
+    """Builds one feature's WoE/IV detail table from integer codes (see `woe_iv_from_counts`)."""
+    totals, bad = bin_counts(codes, is_bad, len(categories))
+    return woe_iv_from_counts(categories, totals, bad, total_good, total_bad, n_rows, numerical)
+
+
+def format_iv_details(table: pd.DataFrame) -> pd.DataFrame:
+    """Appends the 'Grand Total' row and applies the CSV rounding used in references/."""
+    grand_total = {
+        "Category": "Grand Total",
+        "CONFIRMED_FRAUD": table["CONFIRMED_FRAUD"].sum(),
+        "NON_FRAUD": table["NON_FRAUD"].sum(),
+        "Grand Total": table["Grand Total"].sum(),
+        "Share": table["Share"].sum(),
+        "PercentBad": 1,
+        "PercentGood": 1,
+        "WoE": 0,
+        "IV": table["IV"].sum(),
+    }
+    formatted = pd.concat([table, pd.DataFrame([grand_total])], ignore_index=True)
+    formatted["IV"] = formatted["IV"].round(2)
+    formatted["WoE"] = formatted["WoE"].round(2)
+    formatted["Share"] = formatted["Share"].round(4)
+    formatted["PercentBad"] = formatted["PercentBad"].round(4)
+    formatted["PercentGood"] = formatted["PercentGood"].round(4)
+    return formatted[IV_DETAIL_COLUMNS]
+
+
+def calculate_iv(
+    df: pd.DataFrame,
+    target_col: str,
+    categorical_features: list[str] | None = None,
+    binning_definitions: dict | None = None,
+) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+    """
+    Computes WoE/IV for categorical and binned numerical features in one sweep.
+
+    Each feature is reduced once to integer codes (`pd.factorize` for categoricals, the
+    compiled BINNING_DEFINITIONS for numericals) and its fraud / non-fraud counts come from
+    `np.bincount`, replacing the per-feature `pd.crosstab` and `apply` of notebook 3.0 while
+    producing the same Category/WoE/IV tables.
+
+    Args:
+        df: The input DataFrame.
+        target_col: Binary target column (1 = CONFIRMED_FRAUD, 0 = NON_FRAUD).
+        categorical_features: Categorical columns to screen. Defaults to
+            CATEGORICAL_IV_FEATURES.
+        binning_definitions: {feature: parsed rules} for numerical columns. Defaults to
+            BINNING_DEFINITIONS.
+
+    Returns:
+        A tuple containing:
+        - iv_summary: Feature, IV (rounded) and Predictive Power, sorted by IV.
+        - iv_details: {feature: detail table with the 'Grand Total' row, CSV-rounded}.
+    """
+    if categorical_features is None:
+        categorical_features = CATEGORICAL_IV_FEATURES
+    if binning_definitions is None:
+        binning_definitions = BINNING_DEFINITIONS
+
+    target = df[target_col].to_numpy()
+    if not np.isin(target, [0, 1]).all():
+        raise ValueError("Target column must contain only 0s and 1s.")
+    is_bad = target == 1
+    total_bad = int(is_bad.sum())
+    total_good = len(target) - total_bad
+    if total_good == 0 or total_bad == 0:
+        logger.warning("The target variable contains only one class. IV cannot be calculated.")
+        return pd.DataFrame(), {}
+
+    jobs = [(feature, False, None) for feature in categorical_features if feature in df.columns]
+    jobs += [
+        (feature, True, rules) for feature, rules in binning_definitions.items() if feature in df
+    ]
+    skipped = [f for f in list(categorical_features) + list(binning_definitions) if f not in df]
+    if skipped:
+        logger.info(f"Features skipped (not in DataFrame): {', '.join(skipped)}")
+
+    tables = {}
+    for feature, numerical, rules in jobs:
+        if numerical:
+            codes, categories = numerical_codes(df[feature], rules)
+        else:
+            codes, categories = categorical_codes(df[feature])
+        tables[feature] = woe_iv_table(
+            codes, categories, is_bad, total_good, total_bad, len(df), numerical
+        )
+    return summarize_iv(tables)
+
+
+def summarize_iv(tables: dict[str, pd.DataFrame]) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+    """Ranks features by total IV and formats each detail table for the CSVs."""
+    summary = [{"Feature": feature, "IV": table["IV"].sum()} for feature, table in tables.items()]
+    iv_summary = pd.DataFrame(summary).sort_values(by="IV", ascending=False)
+    iv_summary = iv_summary.reset_index(drop=True)
+    iv_summary["Predictive Power"] = iv_summary["IV"].apply(get_predictive_power)
+    iv_summary["IV"] = iv_summary["IV"].round(2)
+    return iv_summary, {feature: format_iv_details(table) for feature, table in tables.items()}
+
+
+def add_target(df: pd.DataFrame, target_col: str = TARGET_COL) -> pd.DataFrame:
+    """
+    Adds notebook 3.0's binary target (1 where `dna_final_tag` is CONFIRMED_FRAUD, else 0)
+    as `target_col`. Frames that already carry `target_col` are returned unchanged.
+
+    Raises:
+        KeyError: If neither `target_col` nor `dna_final_tag` is present.
+    """
+    if target_col in df.columns:
+        return df
+    if TARGET_SOURCE_COL not in df.columns:
+        raise KeyError(
+            f"Neither '{target_col}' nor '{TARGET_SOURCE_COL}' is present to derive the target."
+        )
+    return df.assign(**{target_col: (df[TARGET_SOURCE_COL] == FRAUD_TAG).astype(np.int64)})
+
+
+def combine_category_counts(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """Sums category-indexed total/bad count frames; the result is sorted by category."""
+    if not parts:
+        return pd.DataFrame({"total": [], "bad": []}, dtype=np.int64)
+    return pd.concat(parts).groupby(level=0, sort=True).sum()
+
+
+def count_chunk(
+    pieces: list[tuple[Path, int]],
+    target_col: str,
+    categorical_features: list[str],
+    binning_definitions: dict,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    derive_target: bool = False,
+) -> dict:
+    """
+    Good/bad count tables for one chunk of row groups.
+
+    The chunk is streamed in `batch_size` record batches of only the screened columns, so a
+    worker never holds more than one batch. Numerical counts are arrays over the fixed
+    compiled bin labels; categorical counts are indexed by category value because each
+    batch observes its own set of categories. With `derive_target` the target is built
+    from `dna_final_tag` in each batch (see `add_target`).
+
+    Returns:
+        dict: n_rows, n_bad, categorical {feature: DataFrame[total, bad]} and numerical
+        {feature: (totals, bad)}.
+    """
+    compiled = {feature: CompiledBins(rules) for feature, rules in binning_definitions.items()}
+    target_source = TARGET_SOURCE_COL if derive_target else target_col
+    columns = list(dict.fromkeys([target_source, *categorical_features, *compiled]))
+    n_rows = n_bad = 0
+    categorical = {feature: [] for feature in categorical_features}
+    numerical = {
+        feature: np.zeros((2, len(bins.labels)), dtype=np.int64)
+        for feature, bins in compiled.items()
+    }
+
+    for frame in iter_piece_frames(pieces, columns, batch_size):
+        if derive_target:
+            frame = add_target(frame, target_col)
+        target = frame[target_col].to_numpy()
+        if not np.isin(target, [0, 1]).all():
+            raise ValueError("Target column must contain only 0s and 1s.")
+        is_bad = target == 1
+        n_rows += len(target)
+        n_bad += int(is_bad.sum())
+
+        for feature in categorical_features:
+            codes, categories = categorical_codes(frame[feature])
+            totals, bad = bin_counts(codes, is_bad, len(categories))
+            categorical[feature].append(
+                pd.DataFrame({"total": totals, "bad": bad}, index=categories)
+            )
+        for feature, bins in compiled.items():
+            values = frame[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+            codes = bins.codes(values).astype(np.intp)
+            numerical[feature] += np.stack(bin_counts(codes, is_bad, len(bins.labels)))
+
+    return {
+        "n_rows": n_rows,
+        "n_bad": n_bad,
+        "categorical": {f: combine_category_counts(parts) for f, parts in categorical.items()},
+        "numerical": {f: (counts[0], counts[1]) for f, counts in numerical.items()},
+    }
+
+
+def merge_chunk_counts(chunks: list[dict]) -> dict:
+    """Adds up `count_chunk` results; every count is additive across row chunks."""
+    first = chunks[0]
+    return {
+        "n_rows": sum(chunk["n_rows"] for chunk in chunks),
+        "n_bad": sum(chunk["n_bad"] for chunk in chunks),
+        "categorical": {
+            feature: combine_category_counts([chunk["categorical"][feature] for chunk in chunks])
+            for feature in first["categorical"]
+        },
+        "numerical": {
+            feature: (
+                sum(chunk["numerical"][feature][0] for chunk in chunks),
+                sum(chunk["numerical"][feature][1] for chunk in chunks),
+            )
+            for feature in first["numerical"]
+        },
+    }
+
+
+def calculate_iv_chunked(
+    path: Path,
+    target_col: str,
+    categorical_features: list[str] | None = None,
+    binning_definitions: dict | None = None,
+    n_jobs: int = -1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+    """
+    `calculate_iv` for parquet tables too large for one process.
+
+    The row groups of `path` (a parquet file or a directory of them) are dealt round-robin
+    into one chunk per worker, each worker streams its chunk through `count_chunk`, and the
+    additive good/bad counts are merged before the WoE/IV tables are built. Results are the
+    same as `calculate_iv` on the full frame. Without a `target_col` column the target is
+    derived from `dna_final_tag` as in `add_target`.
+    """
+    if categorical_features is None:
+        categorical_features = CATEGORICAL_IV_FEATURES
+    if binning_definitions is None:
+        binning_definitions = BINNING_DEFINITIONS
+
+    pieces = parquet_pieces(path)
+    available = set(pq.read_schema(pieces[0][0]).names)
+    derive_target = target_col not in available
+    if derive_target and TARGET_SOURCE_COL not in available:
+        raise KeyError(
+            f"Neither '{target_col}' nor '{TARGET_SOURCE_COL}' is present to derive the target."
+        )
+    skipped = [
+        f for f in list(categorical_features) + list(binning_definitions) if f not in available
+    ]
+    if skipped:
+        logger.info(f"Features skipped (not in DataFrame): {', '.join(skipped)}")
+    categorical_features = [f for f in categorical_features if f in available]
+    binning_definitions = {f: r for f, r in binning_definitions.items() if f in available}
+
+    chunks = split_pieces(pieces, n_jobs)
+    logger.info(f"Counting {len(pieces)} row groups in {len(chunks)} chunks")
+    counts = merge_chunk_counts(
+        Parallel(n_jobs=n_jobs)(
+            delayed(count_chunk)(
+                chunk,
+                target_col,
+                categorical_features,
+                binning_definitions,
+                batch_size,
+                derive_target,
+            )
+            for chunk in chunks
+        )
+    )
+
+    n_rows, total_bad = counts["n_rows"], counts["n_bad"]
+    total_good = n_rows - total_bad
+    if total_good == 0 or total_bad == 0:
+        logger.warning("The target variable contains only one class. IV cannot be calculated.")
+        return pd.DataFrame(), {}
+
+    tables = {}
+    for feature, table in counts["categorical"].items():
+        tables[feature] = woe_iv_from_counts(
+            np.asarray(table.index, dtype=object),
+            table["total"].to_numpy(),
+            table["bad"].to_numpy(),
+            total_good,
+            total_bad,
+            n_rows,
+            numerical=False,
+        )
+    for feature, (totals, bad) in counts["numerical"].items():
+        labels = np.asarray(CompiledBins(binning_definitions[feature]).labels, dtype=object)
+        tables[feature] = woe_iv_from_counts(
+            labels, totals, bad, total_good, total_bad, n_rows, numerical=True
+        )
+    return summarize_iv(tables)
+
+
+def write_iv_details(
+    iv_details: dict[str, pd.DataFrame],
+    store_path: Path = IV_STORE,
+    csv_dir: Path | None = IV_DETAILS_DIR,
+    mask: bool = True,
+) -> None:
+    """
+    Writes the detail tables to the consolidated IV store, masking the category names of
+    the sensitive features first unless `mask` is False, then re-exports the per-feature
+    CSVs in `csv_dir` (read by notebook 4.0) from the store so they never go stale. Pass
+    `csv_dir=None` to write the store only.
+    """
+    if mask:
+        iv_details = {feature: mask_iv_categories(t, feature) for feature, t in iv_details.items()}
+    write_iv_store(iv_details, store_path)
+    if csv_dir is not None:
+        export_csvs(store_path, csv_dir)
+
+
+def run_iv_sweep(
+    df: pd.DataFrame,
+    target_col: str,
+    store_path: Path = IV_STORE,
+    csv_dir: Path | None = IV_DETAILS_DIR,
+):
+    """
+    Full IV refresh: computes every table, writes the store and its CSV export and returns
+    the summary.
+    """
+    start = time.perf_counter()
+    iv_summary, iv_details = calculate_iv(df, target_col)
+    logger.info(
+        f"IV sweep over {len(iv_details)} features took {time.perf_counter() - start:.2f}s"
+    )
+    write_iv_details(iv_details, store_path, csv_dir)
+    return iv_summary
+
+
+@app.command()
+def main(
+    input_path: Path = FEATURE_SELECTION_DATASET,
+    store_path: Path = IV_STORE,
+    csv_dir: Path = IV_DETAILS_DIR,
+    chunked: bool = typer.Option(
+        False, help="Count parquet row groups in a process pool instead of loading the table."
+    ),
+    n_jobs: int = typer.Option(-1, help="Worker processes for --chunked; -1 uses every core."),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+):
+    """
+    Refreshes the IV store (references/iv_details.arrow) and the per-feature CSVs in
+    references/iv_details from the notebook 2.0 output, deriving fraud_status from
+    dna_final_tag as notebook 3.0 does.
+    """
+    if chunked:
+        start = time.perf_counter()
+        iv_summary, iv_details = calculate_iv_chunked(
+            input_path, TARGET_COL, n_jobs=n_jobs, batch_size=batch_size
+        )
+        logger.info(
+            f"Chunked IV over {len(iv_details)} features took {time.perf_counter() - start:.2f}s"
+        )
+        write_iv_details(iv_details, store_path, csv_dir)
+    else:
+        iv_summary = run_iv_sweep(
+            add_target(pd.read_parquet(input_path)), TARGET_COL, store_path, csv_dir
+        )
+    logger.info(f"IV summary:\n{iv_summary.to_string(index=False)}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,159 @@
+import json
+import os
+from pathlib import Path
+
+from loguru import logger
+import pandas as pd
+import pyarrow as pa
+import typer
+
+from bank_fraud.config import IV_DETAILS_DIR, IV_STORE
+
+app = typer.Typer()
+
+# Every feature's detail table shares this layout; categories are stored as text, as they
+# appear in the CSVs.
+IV_STORE_SCHEMA = pa.schema(
+    [
+        ("Category", pa.string()),
+        ("CONFIRMED_FRAUD", pa.int64()),
+        ("NON_FRAUD", pa.int64()),
+        ("Grand Total", pa.int64()),
+        ("Share", pa.float64()),
+        ("PercentBad", pa.float64()),
+        ("PercentGood", pa.float64()),
+        ("WoE", pa.float64()),
+        ("IV", pa.float64()),
+    ]
+)
+
+# Schema metadata key holding the feature names in record batch order.
+FEATURE_INDEX_KEY = b"iv_store.features"
+
+
+def iv_table_to_batch(table: pd.DataFrame) -> pa.RecordBatch:
+    """Converts one feature's detail table to a record batch with IV_STORE_SCHEMA."""
+    table = table[IV_STORE_SCHEMA.names].assign(Category=table["Category"].astype(str))
+    arrow_table = pa.Table.from_pandas(table, schema=IV_STORE_SCHEMA, preserve_index=False)
+    return arrow_table.combine_chunks().to_batches()[0]
+
+
+def write_iv_store(iv_details: dict[str, pd.DataFrame], path: Path = IV_STORE) -> None:
+    """
+    Writes every feature's IV table into one Arrow IPC file, one record batch per feature.
+
+    The file is written next to `path` and renamed over it, so readers that have the old
+    store memory-mapped keep a consistent view.
+    """
+    features = list(iv_details)
+    schema = IV_STORE_SCHEMA.with_metadata({FEATURE_INDEX_KEY: json.dumps(features)})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for feature in features:
+            writer.write_batch(iv_table_to_batch(iv_details[feature]))
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote IV tables for {len(features)} features to {path}")
+
+
+class IVStore:
+    """
+    Read access to the consolidated IV store.
+
+    The Arrow file is memory-mapped and only its footer and feature index are read on open;
+    `table(feature)` materialises that one feature's record batch without touching the
+    others.
+
+    Attributes:
+        features (list[str]): Feature names in store order.
+    """
+
+    def __init__(self, path: Path = IV_STORE):
+        self.path = path
+        self._source = pa.memory_map(str(path), "r")
+        self._reader = pa.ipc.open_file(self._source)
+        self.features = json.loads(self._reader.schema.metadata[FEATURE_INDEX_KEY])
+        self._batch_index = {feature: i for i, feature in enumerate(self.features)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, feature: str) -> bool:
+        return feature in self._batch_index
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def close(self) -> None:
+        self._source.close()
+
+    def batch(self, feature: str) -> pa.RecordBatch:
+        """Zero-copy view of one feature's table, backed by the memory map."""
+        if feature not in self._batch_index:
+            raise KeyError(f"No IV details for feature '{feature}' in {self.path}")
+        return self._reader.get_batch(self._batch_index[feature])
+
+    def table(self, feature: str) -> pd.DataFrame:
+        """One feature's detail table, in the `<feature>_iv_details.csv` layout."""
+        return self.batch(feature).to_pandas()
+
+    def tables(self) -> dict[str, pd.DataFrame]:
+        return {feature: self.table(feature) for feature in self.features}
+
+    def summary(self) -> pd.DataFrame:
+        """Feature and total IV (the 'Grand Total' row) for every feature, sorted by IV."""
+        totals = []
+        for feature in self.features:
+            batch = self.batch(feature)
+            categories = batch.column("Category").to_pylist()
+            iv = batch.column("IV").to_pylist()
+            total = iv[categories.index("Grand Total")] if "Grand Total" in categories else None
+            totals.append({"Feature": feature, "IV": total})
+        summary = pd.DataFrame(totals).sort_values(by="IV", ascending=False)
+        return summary.reset_index(drop=True)
+
+
+def load_iv_details(feature: str, path: Path = IV_STORE) -> pd.DataFrame:
+    """Loads one feature's IV detail table from the store."""
+    with IVStore(path) as store:
+        return store.table(feature)
+
+
+def read_iv_csvs(csv_dir: Path = IV_DETAILS_DIR) -> dict[str, pd.DataFrame]:
+    """Reads a directory of legacy `<feature>_iv_details.csv` files."""
+    return {
+        file.name.removesuffix("_iv_details.csv"): pd.read_csv(file, dtype={"Category": str})
+        for file in sorted(csv_dir.glob("*_iv_details.csv"))
+    }
+
+
+@app.command()
+def import_csvs(csv_dir: Path = IV_DETAILS_DIR, store_path: Path = IV_STORE):
+    """Consolidates the per-feature IV CSVs into the store."""
+    iv_details = read_iv_csvs(csv_dir)
+    if not iv_details:
+        raise typer.BadParameter(f"No *_iv_details.csv files in {csv_dir}")
+    write_iv_store(iv_details, store_path)
+
+
+@app.command()
+def export_csvs(store_path: Path = IV_STORE, csv_dir: Path = IV_DETAILS_DIR):
+    """Writes one `<feature>_iv_details.csv` per feature for tools that still read them."""
+    csv_dir.mkdir(parents=True, exist_ok=True)
+    with IVStore(store_path) as store:
+        for feature in store.features:
+            store.table(feature).to_csv(csv_dir / f"{feature}_iv_details.csv", index=False)
+    logger.success(f"Exported {len(store)} IV tables to {csv_dir}")
+
+
+@app.command()
+def show(feature: str, store_path: Path = IV_STORE):
+    """Prints one feature's IV details."""
+    print(load_iv_details(feature, store_path).to_string(index=False))
+
+
+if __name__ == "__main__":
+    app()
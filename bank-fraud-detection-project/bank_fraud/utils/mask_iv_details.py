@@ -1,55 +1,84 @@
 import pandas as pd
 from pathlib import Path
 
-def mask_sensitive_iv_details(project_root: Path):
+from bank_fraud.utils.iv_store import IVStore, write_iv_store
+
+# Features whose category names identify partner organisations, sites or customers.
+SENSITIVE_IV_FEATURES = [
+    'first_fila_bank_code',
+    'first_kiosk_interaction_organisation_name',
+    'first_kiosk_interaction_organisation_site_name',
+    'latest_kiosk_interaction_organisation_name',
+    'latest_kiosk_interaction_organisation_site_name',
+    'orig_industry',
+    'orig_occupation',
+    'first_kiosk_interaction_organisation_presence_category',
+    'latest_kiosk_interaction_organisation_presence_category',
+]
+
+# Rows that keep their name when a feature is masked.
+UNMASKED_CATEGORIES = ['Grand Total', 'No Kiosk Interaction']
+
+
+def masking_prefix(feature_name: str) -> str:
+    """Prefix of the generic category names used for a sensitive feature."""
+    if 'site_name' in feature_name:
+        return 'Site_'
+    if 'bank_code' in feature_name:
+        return 'Bank_'
+    if 'orig_industry' in feature_name:
+        return 'Industry_'
+    if 'orig_occupation' in feature_name:
+        return 'Occupation_'
+    if 'organisation_presence_category' in feature_name:
+        return 'PresenceCat_'
+    return 'Org_'
+
+
+def mask_iv_categories(df: pd.DataFrame, feature_name: str) -> pd.DataFrame:
     """
-    Masks sensitive category names in IV details CSV files.
-    This script is intended to be run locally and should be in .gitignore.
+    Returns a copy of one feature's IV table with its categories replaced by numbered
+    generic names (e.g. 'Site_01') in row order. Non-sensitive features are returned as is.
     """
-    iv_details_dir = project_root / 'references' / 'iv_details'
+    if feature_name not in SENSITIVE_IV_FEATURES:
+        return df
+    prefix = masking_prefix(feature_name)
+    unique_categories = [cat for cat in df['Category'].unique() if cat not in UNMASKED_CATEGORIES]
+    dynamic_mask_map = {cat: f"{prefix}{i:02d}" for i, cat in enumerate(unique_categories, start=1)}
+    masked = df.copy()
+    masked['Category'] = masked['Category'].replace(dynamic_mask_map)
+    return masked
+
 
-    # List of files to process
-    files_to_mask = [
-        'first_fila_bank_code_iv_details.csv',
-        'first_kiosk_interaction_organisation_name_iv_details.csv',
-        'first_kiosk_interaction_organisation_site_name_iv_details.csv',
-        'latest_kiosk_interaction_organisation_name_iv_details.csv',
-        'latest_kiosk_interaction_organisation_site_name_iv_details.csv',
-        'orig_industry_iv_details.csv',
-        'orig_occupation_iv_details.csv',
-        'first_kiosk_interaction_organisation_presence_category_iv_details.csv',
-        'latest_kiosk_interaction_organisation_presence_category_iv_details.csv',
-    ]
+def mask_iv_store(store_path: Path):
+    """Masks the sensitive features of a consolidated IV store in place."""
+    with IVStore(store_path) as store:
+        iv_details = store.tables()
+    write_iv_store(
+        {feature: mask_iv_categories(table, feature) for feature, table in iv_details.items()},
+        store_path,
+    )
+    print(f"Masking complete for {store_path.name}")
 
-    for filename in files_to_mask:
-        file_path = iv_details_dir / filename
+
+def mask_sensitive_iv_details(project_root: Path):
+    """
+    Masks sensitive category names in the IV store and in any per-feature IV details CSV
+    files. This script is intended to be run locally and should be in .gitignore.
+    """
+    store_path = project_root / 'references' / 'iv_details.arrow'
+    if store_path.exists():
+        mask_iv_store(store_path)
+
+    iv_details_dir = project_root / 'references' / 'iv_details'
+    for feature_name in SENSITIVE_IV_FEATURES:
+        file_path = iv_details_dir / f'{feature_name}_iv_details.csv'
         if not file_path.exists():
-            print(f"Warning: File not found: {file_path.relative_to(project_root)}")
             continue
 
         print(f"Processing {file_path.relative_to(project_root)}...")
         df = pd.read_csv(file_path)
-
-        feature_name = filename.replace('_iv_details.csv', '')
-
-        # Apply generic masking for all identified sensitive features
-        if 'kiosk_interaction' in feature_name or 'organisation_name' in feature_name or 'organisation_site_name' in feature_name or 'bank_code' in feature_name or 'orig_industry' in feature_name or 'orig_occupation' in feature_name or 'organisation_presence_category' in feature_name:
-            unique_categories = df['Category'].unique()
-            masking_prefix = 'Site_' if 'site_name' in feature_name else \
-                             ('Bank_' if 'bank_code' in feature_name else \
-                             ('Industry_' if 'orig_industry' in feature_name else \
-                             ('Occupation_' if 'orig_occupation' in feature_name else \
-                             ('PresenceCat_' if 'organisation_presence_category' in feature_name else 'Org_'))))
-            category_counter = 1
-            dynamic_mask_map = {}
-            for cat in unique_categories:
-                # Exclude 'Grand Total' and 'No Kiosk Interaction' from generic masking
-                if cat not in ['Grand Total', 'No Kiosk Interaction']:
-                    dynamic_mask_map[cat] = f"{masking_prefix}{category_counter:02d}"
-                    category_counter += 1
-            df['Category'] = df['Category'].replace(dynamic_mask_map)
-
-        df.to_csv(file_path, index=False)
+        mask_iv_categories(df, feature_name).to_csv(file_path, index=False)
         print(f"Masking complete for {file_path.relative_to(project_root)}")
 
 if __name__ == "__main__":
@@ -62,4 +91,4 @@ if __name__ == "__main__":
             raise Exception("Project root 'bank-fraud-detection-project' not found.")
         project_root = project_root.parent
     
-    mask_sensitive_iv_details(project_root)
\ No newline at end of file
+    mask_sensitive_iv_details(project_root)
@@ -0,0 +1,46 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+from joblib import effective_n_jobs
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Rows per record batch a chunked worker holds in memory at once.
+DEFAULT_BATCH_SIZE = 250_000
+
+
+def parquet_pieces(path: Path) -> list[tuple[Path, int]]:
+    """(file, row group) pairs of a parquet file, or of every parquet file in a directory."""
+    files = sorted(path.glob("*.parquet")) if path.is_dir() else [path]
+    pieces = [(file, i) for file in files for i in range(pq.ParquetFile(file).num_row_groups)]
+    if not pieces:
+        raise FileNotFoundError(f"No parquet row groups found under {path}")
+    return pieces
+
+
+def split_pieces(pieces: list[tuple[Path, int]], n_jobs: int) -> list[list[tuple[Path, int]]]:
+    """Deals row groups round-robin into one chunk per worker."""
+    n_chunks = min(len(pieces), effective_n_jobs(n_jobs))
+    return [pieces[i::n_chunks] for i in range(n_chunks)]
+
+
+def iter_piece_frames(
+    pieces: list[tuple[Path, int]], columns: list[str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Streams `columns` of a chunk's row groups as DataFrames of at most `batch_size` rows."""
+    row_groups = {}
+    for file, row_group in pieces:
+        row_groups.setdefault(file, []).append(row_group)
+    for file, groups in row_groups.items():
+        batches = pq.ParquetFile(file).iter_batches(
+            batch_size=batch_size, row_groups=groups, columns=columns
+        )
+        for batch in batches:
+            yield batch.to_pandas()
+
+
+def parquet_dtypes(path: Path) -> dict[str, str]:
+    """Pandas dtype name of every column, read from the schema without loading any rows."""
+    schema = pq.read_schema(parquet_pieces(path)[0][0])
+    empty = schema.empty_table().to_pandas()
+    return {column: str(dtype) for column, dtype in empty.dtypes.items()}
@@ -7,7 +7,8 @@ import io
 project_root = Path(__file__).resolve().parents[2]
 sys.path.append(str(project_root))
 
-from bank_fraud.config import REFERENCES_DIR
+from bank_fraud.config import IV_STORE, REFERENCES_DIR
+from bank_fraud.utils.iv_store import IVStore
 
 def parse_and_save_to_excel(file_path, writer, file_type):
     """
@@ -59,9 +60,23 @@ def parse_and_save_to_excel(file_path, writer, file_type):
         df_block.to_excel(writer, sheet_name=safe_sheet_name, index=False)
         print(f"  - Saved feature '{feature_name}' to sheet '{safe_sheet_name}'")
 
+def save_store_to_excel(store_path, writer):
+    """
+    Writes each feature of the consolidated IV store to a separate sheet in an Excel file.
+    """
+    with IVStore(store_path) as store:
+        print(f"Processing {len(store)} features from {store_path.name}...")
+        for feature_name in store.features:
+            df_feature = store.table(feature_name)
+            df_feature['IV'] = df_feature['IV'].abs()
+            safe_sheet_name = feature_name[:31]
+            df_feature.to_excel(writer, sheet_name=safe_sheet_name, index=False)
+            print(f"  - Saved feature '{feature_name}' to sheet '{safe_sheet_name}'")
+
 def main():
     """
-    Main function to execute the preprocessing.
+    Main function to execute the preprocessing. Reads the IV store when it exists and
+    falls back to the legacy block-format files otherwise.
     """
     categorical_file = REFERENCES_DIR / 'categorical_iv_details.csv'
     numerical_file = REFERENCES_DIR / 'numerical_iv_details.csv'
@@ -69,8 +84,11 @@ def main():
 
     with pd.ExcelWriter(output_excel_file, engine='openpyxl') as writer:
         print(f"Creating processed Excel file at: {output_excel_file}")
-        parse_and_save_to_excel(categorical_file, writer, 'Categorical')
-        parse_and_save_to_excel(numerical_file, writer, 'Numerical')
+        if IV_STORE.exists():
+            save_store_to_excel(IV_STORE, writer)
+        else:
+            parse_and_save_to_excel(categorical_file, writer, 'Categorical')
+            parse_and_save_to_excel(numerical_file, writer, 'Numerical')
 
     print("\nProcessing complete.")
 
@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values: np.ndarray, categorize: bool = True) -> np.ndarray:
+    """
+    Stable 64-bit hashes of non-null values, identical across processes and batches.
+
+    Floats are normalised so that -0.0 and 0.0 (equal under `nunique`) hash alike.
+    `categorize` hashes each distinct value once, which pays off for low-cardinality
+    columns and costs an extra factorize for identifiers.
+    """
+    if values.dtype.kind == "f":
+        values = values + 0.0
+    elif values.dtype.kind == "M":
+        values = values.view(np.int64)
+    return pd.util.hash_array(values, categorize=categorize)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch over 64-bit hashes.
+
+    The top `precision` bits of a hash pick one of 2**precision registers, which keeps the
+    longest run of leading zeros seen in the remaining bits. Registers merge with an
+    element-wise max, so sketches built on separate row chunks combine losslessly. The
+    relative standard error is about 1.04 / sqrt(2**precision) (0.8% at the default 14).
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 11 <= precision <= 18:
+            raise ValueError("precision must be between 11 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def standard_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        tail_bits = 64 - self.precision
+        index = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        # tail < 2**50 is exact in float64, so log2 gives the position of its highest set bit.
+        with np.errstate(divide="ignore"):
+            highest_bit = np.floor(np.log2(tail.astype(np.float64)))
+        rank = np.where(tail == 0, tail_bits + 1, tail_bits - highest_bit).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and empty > 0:
+            return m * np.log(m / empty)
+        return float(raw)
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch built from KLL-style compactors.
+
+    Level i holds items that each stand for 2**i original values. When a level grows past
+    `k` items it is sorted and every other item (from a random offset) is promoted to the
+    next level, halving its size. Merging concatenates matching levels and compacts again.
+    Memory stays at about `k` items per level and the rank error is roughly 1/k of n.
+    """
+
+    def __init__(self, k: int = 2048, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels: list[np.ndarray] = []
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self._add(0, values)
+        self._compact()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        self.n += other.n
+        for level, items in enumerate(other.levels):
+            self._add(level, items)
+        self._compact()
+        return self
+
+    def _add(self, level: int, items: np.ndarray) -> None:
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0, dtype=np.float64))
+        self.levels[level] = np.concatenate([self.levels[level], items])
+
+    def _compact(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item out stays behind so the promoted pairs are complete.
+                keep = items[:1] if len(items) % 2 else items[:0]
+                paired = items[len(keep) :]
+                self._add(level + 1, paired[self._rng.integers(2) :: 2])
+                self.levels[level] = keep
+            level += 1
+
+    def quantiles(self, qs) -> np.ndarray:
+        """Approximate values at each rank fraction in `qs` (NaN when the sketch is empty)."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(level), 2.0**i) for i, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side="left")
+        return items[order][np.minimum(positions, len(items) - 1)]
+
+
+class FrequentItems:
+    """
+    Misra-Gries frequent-items summary, the mergeable form of space-saving.
+
+    Keeps at most `capacity` counters. When an update or merge leaves more, the
+    (capacity + 1)-th largest count is subtracted from every counter and the non-positive
+    ones are dropped. Each kept count undercounts the truth by at most n / (capacity + 1),
+    so any item more frequent than that is guaranteed to be present.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+
+    def update(self, values: pd.Series) -> None:
+        self._combine(values.value_counts(dropna=True))
+
+    def merge(self, other: "FrequentItems") -> "FrequentItems":
+        self._combine(other.counts)
+        return self
+
+    def _combine(self, counts: pd.Series) -> None:
+        if len(self.counts):
+            counts = pd.concat([self.counts, counts]).groupby(level=0, sort=False).sum()
+        if len(counts) > self.capacity:
+            threshold = np.partition(counts.to_numpy(), -(self.capacity + 1))[-(self.capacity + 1)]
+            counts = counts[counts > threshold] - threshold
+        self.counts = counts.astype(np.int64)
+
+    def top(self, k: int = 10) -> pd.Series:
+        """The `k` most frequent items with their (lower-bound) counts."""
+        return self.counts.sort_values(ascending=False, kind="stable").head(k)
+
+
+class Moments:
+    """Exact count, min, max, mean and sum of squared deviations, merged with Chan's formula."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        batch = Moments()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(np.sum((values - batch.mean) ** 2))
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "Moments") -> "Moments":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
@@ -0,0 +1,115 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+import pandas as pd
+import pytest
+from scipy import sparse
+from sklearn.pipeline import Pipeline
+from xgboost import XGBClassifier
+
+from bank_fraud.modeling.fused import FusedPreprocessor, verify_fused_transform
+from bank_fraud.modeling.train import build_preprocessor
+
+NUMERICAL = ["amount", "balance"]
+CATEGORICAL = ["channel", "region", "segment"]
+PASSTHROUGH = ["flag"]
+
+
+def make_frame(n_rows: int, n_categories: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "amount": rng.lognormal(size=n_rows),
+            # Half exact zeros, so a sparse output has implicit zeros in the scaled block.
+            "balance": np.where(rng.random(n_rows) < 0.5, 0.0, rng.normal(size=n_rows)),
+            "flag": rng.integers(0, 2, n_rows).astype(float),
+        }
+    )
+    for column in CATEGORICAL:
+        df[column] = rng.choice([f"{column}_{i}" for i in range(n_categories)], n_rows)
+    df.loc[df.sample(frac=0.1, random_state=seed).index, "amount"] = np.nan
+    df.loc[df.sample(frac=0.1, random_state=seed + 1).index, "channel"] = None
+    return df
+
+
+def fit_pipeline(df: pd.DataFrame) -> Pipeline:
+    y = ((df["balance"] > 0.2) | (df["channel"] == "channel_0")).astype(int)
+    model = Pipeline(
+        [
+            ("preprocessor", build_preprocessor(NUMERICAL, CATEGORICAL)),
+            ("classifier", XGBClassifier(n_estimators=20, max_depth=3, random_state=0)),
+        ]
+    )
+    return model.fit(df[NUMERICAL + CATEGORICAL + PASSTHROUGH], y)
+
+
+def scoring_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Fresh rows with unseen categories and missing values mixed in."""
+    df = df.copy()
+    df.loc[df.index[:5], "region"] = "__unseen__"
+    df.loc[df.index[5:10], "segment"] = None
+    df.loc[df.index[10:15], "balance"] = np.nan
+    return df
+
+
+# Few categories give a dense output; many give a sparse one under sklearn's default
+# sparse_threshold.
+@pytest.fixture(params=[3, 40], ids=["dense", "sparse"])
+def fitted(request):
+    model = fit_pipeline(make_frame(2000, request.param, seed=0))
+    return model, scoring_frame(make_frame(500, request.param, seed=1))
+
+
+def test_output_type_follows_preprocessor(fitted):
+    model, df = fitted
+    preprocessor = model.named_steps["preprocessor"]
+    actual = FusedPreprocessor(preprocessor).transform(df)
+    assert sparse.issparse(actual) == preprocessor.sparse_output_
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_transform_matches_sklearn(fitted, dtype):
+    model, df = fitted
+    preprocessor = model.named_steps["preprocessor"]
+    expected = preprocessor.transform(df[preprocessor.feature_names_in_])
+    actual = FusedPreprocessor(preprocessor).transform(df, dtype=dtype)
+    if sparse.issparse(expected):
+        expected = sparse.csr_matrix(expected, dtype=dtype)
+        assert_array_equal(actual.indptr, expected.indptr)
+        assert_array_equal(actual.indices, expected.indices)
+        assert_array_equal(actual.data, expected.data)
+    else:
+        assert_array_equal(actual, expected.astype(dtype))
+
+
+def test_predict_proba_matches_pipeline(fitted):
+    model, df = fitted
+    preprocessor, classifier = model.named_steps["preprocessor"], model.named_steps["classifier"]
+    fused = FusedPreprocessor(preprocessor).transform(df, dtype=np.float64)
+    assert_array_equal(
+        classifier.predict_proba(fused), model.predict_proba(df[preprocessor.feature_names_in_])
+    )
+    verify_fused_transform(model, df)
+
+
+def test_verify_rejects_dense_output_for_sparse_preprocessor():
+    model = fit_pipeline(make_frame(2000, 40, seed=0))
+    df = scoring_frame(make_frame(500, 40, seed=1))
+    original = FusedPreprocessor.transform
+
+    def dense_transform(self, df, dtype=np.float32, out=None):
+        X = original(self, df, dtype, out)
+        return X.toarray() if sparse.issparse(X) else X
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(FusedPreprocessor, "transform", dense_transform)
+        with pytest.raises(AssertionError, match="Matrix type mismatch"):
+            verify_fused_transform(model, df)
+
+
+def test_bool_passthrough_block_is_fused():
+    df = make_frame(500, 3, seed=0).assign(active=lambda d: d["amount"] > 1)
+    preprocessor = build_preprocessor(NUMERICAL, CATEGORICAL, ["active"])
+    preprocessor.fit(df[NUMERICAL + CATEGORICAL + ["active"] + PASSTHROUGH])
+    expected = preprocessor.transform(df[preprocessor.feature_names_in_])
+    actual = FusedPreprocessor(preprocessor).transform(df, dtype=np.float64)
+    assert_array_equal(actual, expected)